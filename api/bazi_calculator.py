@@ -2,6 +2,8 @@
 """
 八字命理核心计算模块
 提供完整的八字分析功能
+
+旧版模块：未接入 API 路由，依赖 lunar_python（已不在 requirements.txt 中，使用前需另行安装）
 """
 
 from lunar_python import Solar, Lunar
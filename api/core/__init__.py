@@ -4,6 +4,8 @@
 """
 
 from .constants import *
+from .solar_terms import *
+from .calendar_table import *
 from .lunar import *
 from .bazi_engine import *
 from .fortune_engine import *
\ No newline at end of file
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+命盘分析预计算表
+旺衰分析与用神推导只取决于四柱，而合法四柱只有 60 年 × 12 月 × 60 日 × 12 时 = 518,400 种
+（月干由年干五虎遁定，时干由日干五鼠遁定）。构建步骤把每种四柱的 analyze_bazi_enhanced
+结果压成定长记录写入二进制文件，运行时以 mmap 只读映射：查一张命盘只是一次偏移计算加几次
+字节读取，冷启动后无需预热。
+
+文件布局（小端）:
+    文件头   HEADER：魔数、版本、记录长度、记录数、字符串条目数、条目表偏移
+    记录区   RECORD × 518,400，按 chart_index 排列
+    条目表   ENTRY × N：(分数, 文本偏移, 文本字节数)，旺衰等级、用神策略、五维明细共用
+    文本区   UTF-8 文本
+
+记录字段:
+    旺衰总分 × 100、旺衰等级条目号、用神序列（每个五行 3 位，保留优先级顺序）、
+    喜神位掩码、忌神位掩码、3 个用神策略条目号、5 个旺衰明细条目号（分数 + 说明）
+
+构建（约 30 秒，生成 api/data/analysis_table.bin，输出逐字节确定）:
+    python -m api.core.analysis_table [输出路径]
+
+表文件随仓库提交并打进函数包（vercel.json 的 includeFiles），部署时不再构建；
+分析逻辑或记录格式有变化时需重新构建并提交（test_analysis_table 会比对表与实时分析）。
+文件不存在时 lookup_analysis 返回 None，由调用方回退到实时分析，并在 stderr 提示一次；
+路径可用环境变量 ANALYSIS_TABLE_PATH 指定，设为空字符串则停用。
+"""
+
+import mmap
+import os
+import struct
+import sys
+import threading
+
+from .constants import TIAN_GAN, DI_ZHI, WU_XING_MAP
+from .calendar_table import JIA_ZI, jia_zi_index
+
+
+DEFAULT_TABLE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'analysis_table.bin'
+)
+
+TABLE_MAGIC = b'BZAT'
+TABLE_VERSION = 1
+
+HEADER = struct.Struct('<4sHHIII')
+RECORD = struct.Struct('<HHHBB3H5H')
+ENTRY = struct.Struct('<dIH')
+
+CHART_COUNT = 60 * 12 * 60 * 12
+
+# 记录中的空位：未生成的记录（总分字段）与缺省的策略条目号
+_MISSING = 0xFFFF
+
+ELEMENTS = ('木', '火', '土', '金', '水')
+_ELEMENT_INDEX = {e: i for i, e in enumerate(ELEMENTS)}
+_GAN_INDEX = {g: i for i, g in enumerate(TIAN_GAN)}
+_ZHI_INDEX = {z: i for i, z in enumerate(DI_ZHI)}
+
+# 旺衰明细的五个维度（与 EnhancedStrengthAnalyzer.analyze 的输出顺序一致）
+DETAIL_KEYS = ('yue_ling', 'gen', 'tou_gan', 'he_hua', 'xing_chong')
+MAX_STRATEGIES = 3
+
+# 五虎遁：年干 → 寅月月干；五鼠遁：日干 → 子时时干
+_MONTH_GAN_STARTS = (2, 4, 6, 8, 0)
+_HOUR_GAN_STARTS = (0, 2, 4, 6, 8)
+
+
+def chart_index(year_idx, month_zhi_idx, day_idx, hour_zhi_idx):
+    """四柱在表中的记录序号（年柱、日柱为六十甲子序号，月、时取地支序号；月份从寅月起排）"""
+    return ((year_idx * 12 + (month_zhi_idx - 2) % 12) * 60 + day_idx) * 12 + hour_zhi_idx
+
+
+def chart_index_for_bazi(bazi):
+    """
+    命盘对应的记录序号
+
+    月干、时干与五虎遁/五鼠遁不符（非正常排盘）时返回 None
+    """
+    year_gan = _GAN_INDEX[bazi['year_gan']]
+    day_gan = _GAN_INDEX[bazi['day_gan']]
+    month_zhi = _ZHI_INDEX[bazi['month_zhi']]
+    hour_zhi = _ZHI_INDEX[bazi['time_zhi']]
+    if _GAN_INDEX[bazi['month_gan']] != (_MONTH_GAN_STARTS[year_gan % 5] + (month_zhi - 2) % 12) % 10:
+        return None
+    if _GAN_INDEX[bazi['time_gan']] != (_HOUR_GAN_STARTS[day_gan % 5] + hour_zhi) % 10:
+        return None
+    year_idx = jia_zi_index(year_gan, _ZHI_INDEX[bazi['year_zhi']])
+    day_idx = jia_zi_index(day_gan, _ZHI_INDEX[bazi['day_zhi']])
+    return chart_index(year_idx, month_zhi, day_idx, hour_zhi)
+
+
+def _bazi_for_index(year_idx, month_offset, day_idx, hour_zhi_idx):
+    """由记录各维序号还原命盘 dict（month_offset：0=寅月 ... 11=丑月）"""
+    year_gz = JIA_ZI[year_idx]
+    day_gz = JIA_ZI[day_idx]
+    month_zhi = (month_offset + 2) % 12
+    month_gan = (_MONTH_GAN_STARTS[_GAN_INDEX[year_gz[0]] % 5] + month_offset) % 10
+    hour_gan = (_HOUR_GAN_STARTS[_GAN_INDEX[day_gz[0]] % 5] + hour_zhi_idx) % 10
+    return {
+        'year_gan': year_gz[0], 'year_zhi': year_gz[1],
+        'month_gan': TIAN_GAN[month_gan], 'month_zhi': DI_ZHI[month_zhi],
+        'day_gan': day_gz[0], 'day_zhi': day_gz[1],
+        'time_gan': TIAN_GAN[hour_gan], 'time_zhi': DI_ZHI[hour_zhi_idx],
+    }
+
+
+def _encode_sequence(elements):
+    """有序五行列表 → 每项 3 位（1~5），低位在前"""
+    code = 0
+    for i, element in enumerate(elements):
+        code |= (_ELEMENT_INDEX[element] + 1) << (3 * i)
+    return code
+
+
+def _decode_sequence(code):
+    """_encode_sequence 的逆运算"""
+    elements = []
+    while code:
+        elements.append(ELEMENTS[(code & 7) - 1])
+        code >>= 3
+    return elements
+
+
+def _encode_mask(elements):
+    """五行列表 → 位掩码（顺序按木火土金水，与喜忌推导的遍历顺序一致）"""
+    mask = 0
+    for element in elements:
+        mask |= 1 << _ELEMENT_INDEX[element]
+    return mask
+
+
+def _decode_mask(mask):
+    """位掩码 → 五行列表（木火土金水顺序）"""
+    return [e for i, e in enumerate(ELEMENTS) if mask >> i & 1]
+
+
+# ==================== 构建 ====================
+
+def build_analysis_table(path=None, year_indices=None):
+    """
+    生成预计算表文件
+
+    参数:
+        path: 输出路径，默认 DEFAULT_TABLE_PATH
+        year_indices: 只生成这些年柱的记录（测试用），其余记录留空，查表时回退实时分析
+
+    返回:
+        写入的记录数
+    """
+    from .bazi_engine import analyze_bazi_enhanced
+
+    path = path or DEFAULT_TABLE_PATH
+    years = range(60) if year_indices is None else sorted(set(year_indices))
+
+    entries = {}
+    texts = []
+
+    def intern(text, score=0.0):
+        key = (score, text)
+        entry_id = entries.get(key)
+        if entry_id is None:
+            entry_id = len(texts)
+            if entry_id >= _MISSING:
+                raise ValueError("字符串条目超过 65535 条，记录格式无法容纳")
+            entries[key] = entry_id
+            texts.append(key)
+        return entry_id
+
+    # 未生成的记录：总分字段置为空位
+    empty = RECORD.pack(_MISSING, 0, 0, 0, 0, *([_MISSING] * MAX_STRATEGIES), *([0] * len(DETAIL_KEYS)))
+    records = bytearray(empty * CHART_COUNT)
+
+    written = 0
+    for year_idx in years:
+        for month_offset in range(12):
+            for day_idx in range(60):
+                for hour_zhi in range(12):
+                    bazi = _bazi_for_index(year_idx, month_offset, day_idx, hour_zhi)
+                    result = analyze_bazi_enhanced(bazi)
+                    strength, yong_shen = result['strength'], result['yong_shen']
+
+                    strategies = [intern(s) for s in yong_shen['strategies']]
+                    if len(strategies) > MAX_STRATEGIES:
+                        raise ValueError(f"用神策略超过 {MAX_STRATEGIES} 条，记录格式无法容纳")
+                    strategies += [_MISSING] * (MAX_STRATEGIES - len(strategies))
+                    details = [intern(strength['details'][k]['detail'], float(strength['details'][k]['score']))
+                               for k in DETAIL_KEYS]
+
+                    RECORD.pack_into(
+                        records, chart_index(year_idx, (month_offset + 2) % 12, day_idx, hour_zhi) * RECORD.size,
+                        round(strength['score'] * 100),
+                        intern(strength['level']),
+                        _encode_sequence(yong_shen['favorable']),
+                        _encode_mask(yong_shen['xi_shen']),
+                        _encode_mask(yong_shen['ji_shen']),
+                        *strategies, *details
+                    )
+                    written += 1
+
+    blob = bytearray()
+    entry_bytes = bytearray()
+    for score, text in texts:
+        encoded = text.encode('utf-8')
+        entry_bytes += ENTRY.pack(score, len(blob), len(encoded))
+        blob += encoded
+
+    entry_offset = HEADER.size + len(records)
+    header = HEADER.pack(TABLE_MAGIC, TABLE_VERSION, RECORD.size, CHART_COUNT, len(texts), entry_offset)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # 先写临时文件再替换，避免进程读到写了一半的表
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(records)
+        f.write(entry_bytes)
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return written
+
+
+# ==================== 查表 ====================
+
+class AnalysisTable:
+    """以 mmap 只读映射的预计算表"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, record_count, entry_count, entry_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION or record_size != RECORD.size \
+                or record_count != CHART_COUNT:
+            self._mm.close()
+            raise ValueError(f"预计算表格式不符: {path}")
+        self._entry_offset = entry_offset
+        self._entry_count = entry_count
+        self._blob_offset = entry_offset + entry_count * ENTRY.size
+        self._entries = {}
+
+    def close(self):
+        self._mm.close()
+
+    def _entry(self, entry_id):
+        """读取字符串条目 (分数, 文本)，解码结果按条目号缓存"""
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            score, offset, length = ENTRY.unpack_from(self._mm, self._entry_offset + entry_id * ENTRY.size)
+            start = self._blob_offset + offset
+            entry = (score, self._mm[start:start + length].decode('utf-8'))
+            self._entries[entry_id] = entry
+        return entry
+
+    def lookup(self, index, day_element):
+        """
+        按记录序号解码分析结果（与 analyze_bazi_enhanced 输出结构相同，每次新建）
+
+        参数:
+            index: chart_index 序号
+            day_element: 日主五行（用神为空时 primary 取日主五行，与推导逻辑一致）
+
+        返回:
+            {'strength': ..., 'yong_shen': ...}；记录未生成时返回 None
+        """
+        fields = RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)
+        score_centi, level_id, favorable_code, xi_mask, ji_mask = fields[:5]
+        if score_centi == _MISSING:
+            return None
+        strategy_ids = fields[5:5 + MAX_STRATEGIES]
+        detail_ids = fields[5 + MAX_STRATEGIES:]
+
+        details = {}
+        for key, entry_id in zip(DETAIL_KEYS, detail_ids):
+            score, text = self._entry(entry_id)
+            details[key] = {'score': score, 'detail': text}
+
+        favorable = _decode_sequence(favorable_code)
+        ji_shen = _decode_mask(ji_mask)
+        return {
+            'strength': {
+                'score': score_centi / 100,
+                'level': self._entry(level_id)[1],
+                'details': details
+            },
+            'yong_shen': {
+                'primary': favorable[0] if favorable else day_element,
+                'secondary': favorable[1:3] if len(favorable) > 1 else [],
+                'favorable': favorable,
+                'xi_shen': _decode_mask(xi_mask),
+                'ji_shen': ji_shen,
+                'unfavorable': list(ji_shen),
+                'strategies': [self._entry(i)[1] for i in strategy_ids if i != _MISSING]
+            }
+        }
+
+
+_table_path = os.environ.get('ANALYSIS_TABLE_PATH', DEFAULT_TABLE_PATH)
+_table = None
+_table_checked = False
+_table_lock = threading.Lock()
+
+
+def get_analysis_table():
+    """取得预计算表（首次调用时映射文件；文件不存在或停用时返回 None）"""
+    global _table, _table_checked
+    if not _table_checked:
+        with _table_lock:
+            if not _table_checked:
+                if _table_path and os.path.exists(_table_path):
+                    try:
+                        _table = AnalysisTable(_table_path)
+                    except (OSError, ValueError) as e:
+                        print(f"预计算表加载失败，回退实时分析: {e}", file=sys.stderr)
+                        _table = None
+                elif _table_path:
+                    # 每个路径只检查一次，缺表的提示不会逐请求重复
+                    print(f"[WARNING] 预计算表不存在，命盘分析回退实时计算: {_table_path}"
+                          f"（构建：python -m api.core.analysis_table）", file=sys.stderr)
+                _table_checked = True
+    return _table
+
+
+def use_analysis_table(path):
+    """
+    切换预计算表文件（None 或空字符串为停用），下次查表时重新映射
+
+    返回:
+        切换前的路径
+    """
+    global _table, _table_path, _table_checked
+    with _table_lock:
+        if _table is not None:
+            _table.close()
+        previous = _table_path
+        _table = None
+        _table_path = path
+        _table_checked = False
+    return previous
+
+
+def lookup_analysis(bazi):
+    """
+    从预计算表读取命盘分析
+
+    返回:
+        {'strength': ..., 'yong_shen': ...}；未启用预计算表、非正常排盘或记录未生成时返回 None
+    """
+    table = get_analysis_table()
+    if table is None:
+        return None
+    index = chart_index_for_bazi(bazi)
+    if index is None:
+        return None
+    return table.lookup(index, WU_XING_MAP[bazi['day_gan']])
+
+
+if __name__ == '__main__':
+    import time
+
+    output = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TABLE_PATH
+    start = time.perf_counter()
+    count = build_analysis_table(output)
+    print(f"已生成 {count} 条记录 → {output}（{os.path.getsize(output) / 1024 / 1024:.1f} MB，"
+          f"{time.perf_counter() - start:.1f} 秒）")
@@ -396,54 +396,98 @@ def calculate_ten_god(day_gan, target_gan):
 from functools import lru_cache
 import hashlib
 
+# 分析缓存容量：以不同命盘（四柱）计，每条约数 KB
+ANALYSIS_CACHE_SIZE = 8192
+
+
+def bazi_pillar_key(bazi):
+    """命盘的规范键：(年柱, 月柱, 日柱, 时柱)，旺衰与用神分析只取决于这八个字"""
+    return (
+        bazi['year_gan'] + bazi['year_zhi'],
+        bazi['month_gan'] + bazi['month_zhi'],
+        bazi['day_gan'] + bazi['day_zhi'],
+        bazi['time_gan'] + bazi['time_zhi'],
+    )
+
+
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def _analyze_pillars(pillar_key):
+    """按四柱分析（带LRU缓存，相同四柱的不同出生输入共用一条）"""
+    year_gz, month_gz, day_gz, time_gz = pillar_key
+    bazi = {
+        'year_gan': year_gz[0], 'year_zhi': year_gz[1],
+        'month_gan': month_gz[0], 'month_zhi': month_gz[1],
+        'day_gan': day_gz[0], 'day_zhi': day_gz[1],
+        'time_gan': time_gz[0], 'time_zhi': time_gz[1],
+    }
+    return analyze_bazi_enhanced(bazi)
+
+
+def analyze_bazi_for_chart(bazi):
+    """
+    带缓存的八字分析（以四柱为键）
+
+    优先从预计算表读取（见 analysis_table），表不可用时走 LRU 缓存的实时分析
+
+    返回:
+        {'strength_result': ..., 'yong_shen_result': ...}（外层 dict 每次新建，可安全替换其中的项）
+    """
+    # 延迟导入：analysis_table 可作为构建脚本以 -m 运行，不在包导入时加载
+    from .analysis_table import lookup_analysis
+
+    result = lookup_analysis(bazi)
+    if result is None:
+        result = _analyze_pillars(bazi_pillar_key(bazi))
+    return {
+        'strength_result': result['strength'],
+        'yong_shen_result': result['yong_shen']
+    }
+
+
+def get_analysis_cache_stats():
+    """分析缓存统计：命中、未命中、当前条目数、容量与命中率"""
+    info = _analyze_pillars.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+        'hit_rate': round(info.hits / lookups, 4) if lookups else 0.0
+    }
+
+
+def clear_analysis_cache():
+    """清空分析缓存（统计一并归零）"""
+    _analyze_pillars.cache_clear()
+
 
 def generate_bazi_cache_key(birth_date_str, birth_time_str, longitude):
-    """生成八字分析的缓存键"""
+    """生成出生输入的摘要（兼容旧调用；分析缓存已改为按四柱取键，见 bazi_pillar_key）"""
     key_str = f"{birth_date_str}_{birth_time_str}_{longitude}"
     return hashlib.md5(key_str.encode('utf-8')).hexdigest()
 
 
-@lru_cache(maxsize=100)
-def _analyze_bazi_internal(cache_key, birth_date_str, birth_time_str, longitude):
-    """内部八字分析函数（带LRU缓存）"""
-    # 延迟导入避免循环依赖
-    try:
-        from ..utils.date_utils import parse_datetime
-        from ..core.lunar import calculate_bazi
-    except ImportError:
-        from utils.date_utils import parse_datetime
-        from core.lunar import calculate_bazi
-    
-    birth_dt = parse_datetime(birth_date_str, birth_time_str)
-    bazi = calculate_bazi(birth_dt, longitude)
-    return analyze_bazi_enhanced(bazi)
-
+def analyze_bazi_cached(cache_key, birth_date_str, birth_time_str, longitude, bazi=None):
+    """
+    带缓存的八字分析（兼容旧接口）
 
-def analyze_bazi_cached(cache_key, birth_date_str, birth_time_str, longitude):
-    """带缓存的八字分析"""
-    try:
-        result = _analyze_bazi_internal(cache_key, birth_date_str, birth_time_str, longitude)
-        return {
-            'strength_result': result['strength'],
-            'yong_shen_result': result['yong_shen']
-        }
-    except Exception as e:
-        print(f"[ERROR] analyze_bazi_cached 失败: {e}")
-        # 降级处理：不使用缓存
+    参数:
+        cache_key: 已不参与缓存，仅为兼容保留
+        bazi: 已排好的命盘；不传时按出生输入排盘
+    """
+    if bazi is None:
+        # 延迟导入避免循环依赖
         try:
             from ..utils.date_utils import parse_datetime
             from ..core.lunar import calculate_bazi
         except ImportError:
             from utils.date_utils import parse_datetime
             from core.lunar import calculate_bazi
-        
+
         birth_dt = parse_datetime(birth_date_str, birth_time_str)
         bazi = calculate_bazi(birth_dt, longitude)
-        result = analyze_bazi_enhanced(bazi)
-        return {
-            'strength_result': result['strength'],
-            'yong_shen_result': result['yong_shen']
-        }
+    return analyze_bazi_for_chart(bazi)
 
 
 def _create_custom_yongshen(custom_yongshen, bazi):
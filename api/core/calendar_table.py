@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+干支万年历表
+1900-01-01 ~ 2100-12-31 每日的年柱、月柱、日柱（六十甲子序号，各占 1 字节）
+
+按年分块：某年首次被查询时只计算当年 24 节气并生成当年各日，之后为 O(1) 查表，
+冷启动的单日请求不必生成整张 1900-2100 表；供流年/流月/流日与八字排盘使用，
+避免重复的节气扫描与字符串拼接。
+"""
+
+import datetime
+from functools import lru_cache
+
+from .constants import TIAN_GAN, DI_ZHI
+from .solar_terms import get_term_ordinals
+
+
+# 六十甲子表：序号 0=甲子 ... 59=癸亥
+JIA_ZI = [TIAN_GAN[i % 10] + DI_ZHI[i % 12] for i in range(60)]
+
+TABLE_START = datetime.date(1900, 1, 1)
+TABLE_END = datetime.date(2100, 12, 31)
+TABLE_START_ORDINAL = TABLE_START.toordinal()
+
+# 每日 3 字节：年柱、月柱、日柱
+_STRIDE = 3
+
+# 五虎遁：年干 → 寅月月干起点（丙戊庚壬甲）
+_MONTH_GAN_STARTS = [2, 4, 6, 8, 0]
+
+
+def jia_zi_index(gan_index, zhi_index):
+    """由干、支序号求六十甲子序号（中国剩余定理：i≡g mod 10, i≡z mod 12）"""
+    return (6 * gan_index - 5 * zhi_index) % 60
+
+
+def year_index_for(calc_year):
+    """节气年（立春换年后）对应的年柱序号，1984 为甲子"""
+    return (calc_year - 1984) % 60
+
+
+def day_index_for_ordinal(ordinal):
+    """日柱序号，基准 1900-01-01 为甲戌（序号 10）"""
+    return (10 + ordinal - TABLE_START_ORDINAL) % 60
+
+
+def month_index_for(year_index, term_index):
+    """由年柱序号与节气索引推月柱序号（节气月定支，五虎遁定干，寅月起排至次年丑月）"""
+    month_zhi_index = (term_index // 2 + 1) % 12
+    month_gan_base = _MONTH_GAN_STARTS[(year_index % 10) % 5]
+    month_gan_index = (month_gan_base + (month_zhi_index - 2) % 12) % 10
+    return jia_zi_index(month_gan_index, month_zhi_index)
+
+
+@lru_cache(maxsize=None)
+def get_year_table(year):
+    """
+    某年的干支表（首次访问时生成并缓存）：只取一次当年 24 节气日期，再顺序扫描当年每一天
+
+    返回:
+        bytes，第 n 天（自 1 月 1 日起，0 开始）的年、月、日柱序号位于 [3n, 3n + 3)
+    """
+    term_ordinals = get_term_ordinals(year)
+    lichun_ordinal = term_ordinals[2]
+    prev_year_index = year_index_for(year - 1)
+    this_year_index = year_index_for(year)
+
+    first = datetime.date(year, 1, 1).toordinal()
+    last = datetime.date(year, 12, 31).toordinal()
+    table = bytearray((last - first + 1) * _STRIDE)
+    pos = 0
+    term_index = 23  # 当年小寒之前仍属上一年冬至
+    next_term = 0
+    for ordinal in range(first, last + 1):
+        while next_term < 24 and ordinal >= term_ordinals[next_term]:
+            term_index = next_term
+            next_term += 1
+        y_idx = prev_year_index if ordinal < lichun_ordinal else this_year_index
+        table[pos] = y_idx
+        table[pos + 1] = month_index_for(y_idx, term_index)
+        table[pos + 2] = day_index_for_ordinal(ordinal)
+        pos += _STRIDE
+    return bytes(table)
+
+
+def lookup_pillar_indices(ordinal):
+    """
+    按日序查询当日年、月、日柱序号
+
+    返回:
+        (年柱序号, 月柱序号, 日柱序号)；超出表范围时返回 None
+    """
+    day = datetime.date.fromordinal(ordinal)
+    if not TABLE_START.year <= day.year <= TABLE_END.year:
+        return None
+    table = get_year_table(day.year)
+    pos = (day.timetuple().tm_yday - 1) * _STRIDE
+    return table[pos], table[pos + 1], table[pos + 2]
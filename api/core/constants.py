@@ -17,44 +17,7 @@ SOLAR_TERMS = [
     "寒露", "霜降", "立冬", "小雪", "大雪", "冬至"
 ]
 
-SOLAR_TERM_TABLE = {
-    2025: [
-        (1, 5), (1, 20), (2, 3), (2, 18), (3, 5), (3, 20),
-        (4, 4), (4, 19), (5, 5), (5, 20), (6, 5), (6, 21),
-        (7, 6), (7, 22), (8, 7), (8, 23), (9, 7), (9, 22),
-        (10, 8), (10, 23), (11, 7), (11, 22), (12, 7), (12, 21)
-    ],
-    2026: [
-        (1, 5), (1, 20), (2, 4), (2, 18), (3, 5), (3, 20),
-        (4, 5), (4, 20), (5, 5), (5, 21), (6, 5), (6, 21),
-        (7, 7), (7, 22), (8, 7), (8, 23), (9, 7), (9, 23),
-        (10, 8), (10, 23), (11, 7), (11, 22), (12, 7), (12, 21)
-    ],
-    2027: [
-        (1, 5), (1, 20), (2, 3), (2, 18), (3, 5), (3, 21),
-        (4, 5), (4, 20), (5, 5), (5, 21), (6, 5), (6, 21),
-        (7, 7), (7, 22), (8, 7), (8, 23), (9, 7), (9, 23),
-        (10, 8), (10, 23), (11, 7), (11, 22), (12, 7), (12, 22)
-    ],
-    2028: [
-        (1, 6), (1, 20), (2, 4), (2, 19), (3, 5), (3, 20),
-        (4, 4), (4, 19), (5, 5), (5, 20), (6, 5), (6, 21),
-        (7, 6), (7, 22), (8, 7), (8, 22), (9, 7), (9, 22),
-        (10, 8), (10, 22), (11, 7), (11, 21), (12, 7), (12, 21)
-    ],
-    2029: [
-        (1, 5), (1, 20), (2, 3), (2, 18), (3, 5), (3, 20),
-        (4, 4), (4, 19), (5, 5), (5, 20), (6, 5), (6, 21),
-        (7, 6), (7, 22), (8, 7), (8, 23), (9, 7), (9, 22),
-        (10, 8), (10, 23), (11, 7), (11, 22), (12, 7), (12, 21)
-    ],
-    2030: [
-        (1, 5), (1, 20), (2, 4), (2, 18), (3, 5), (3, 20),
-        (4, 5), (4, 20), (5, 5), (5, 21), (6, 5), (6, 21),
-        (7, 7), (7, 22), (8, 7), (8, 23), (9, 7), (9, 23),
-        (10, 8), (10, 23), (11, 7), (11, 22), (12, 7), (12, 22)
-    ],
-}
+# 节气交节时刻由 solar_terms 模块按太阳视黄经实时计算（按年缓存）
 
 LUNAR_MONTH_NAMES = [
     "正月", "二月", "三月", "四月", "五月", "六月",
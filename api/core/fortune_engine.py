@@ -11,13 +11,92 @@
 包含：V5.0 算法、六大维度计算、主题生成
 """
 
+import importlib.util
 import random
+from array import array
+from functools import lru_cache
+
 from .constants import (
+    TIAN_GAN, DI_ZHI,
     WU_XING_MAP, WU_XING_SHENG, WU_XING_KE, FORTUNE_WEIGHTS_V5, TEN_GOD_INFLUENCE_V5,
     TEN_GOD_THEMES, DIMENSION_MAPPING, DIZHI_INTERACTIONS,
     SHEN_SHA_COMPLETE
 )
 from .bazi_engine import calculate_ten_god
+from .calendar_table import JIA_ZI, jia_zi_index
+from .lunar import get_hour_gan_zhi
+
+# 引擎版本：参与运势响应 ETag 的计算。排盘、评分、文案或响应结构任一有变化时递增，
+# 使客户端与 CDN 缓存的旧结果全部失效（test_conditional 中的输出指纹会提示漏改）
+ENGINE_VERSION = "5.2"
+
+# NumPy 可选：存在时批量评分返回 ndarray，否则返回 array('i')（按需导入，不影响冷启动）
+NUMPY_AVAILABLE = importlib.util.find_spec('numpy') is not None
+
+# 六十甲子对应的流年/流月/流日干支（评分函数只读取 gan、zhi）
+_PILLARS = tuple({'gan': gz[0], 'zhi': gz[1]} for gz in JIA_ZI)
+
+_GAN_INDEX = {gan: i for i, gan in enumerate(TIAN_GAN)}
+_ZHI_INDEX = {zhi: i for i, zhi in enumerate(DI_ZHI)}
+
+
+# ==================== 确定性扰动 ====================
+# 评分中的小幅波动由 "命盘 + 干支序号" 的整数哈希按计数器取值，
+# 不依赖全局 random 状态与字符串 hash()（后者随 PYTHONHASHSEED 变化），
+# 因此多线程并发评分互不干扰，不同进程/实例对同一输入给出相同分数
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+# 各评分分量的扰动键标签
+_JITTER_LIUNIAN = 1
+_JITTER_LIUYUE = 2
+_JITTER_LIURI = 3
+
+
+def _mix64(x):
+    """SplitMix64 终混函数：64 位整数 → 均匀分布的 64 位整数"""
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def make_jitter_key(*parts):
+    """由若干非负整数依次混合出扰动键"""
+    key = 0
+    for part in parts:
+        key = _mix64((key + part + _GOLDEN_GAMMA) & _MASK64)
+    return key
+
+
+def _jitter(key, counter, low, high):
+    """扰动键下第 counter 个扰动值，取 [low, high] 内整数"""
+    return low + _mix64((key + counter * _GOLDEN_GAMMA) & _MASK64) % (high - low + 1)
+
+
+def _pillar_index(pillar):
+    """干支 dict（含 gan、zhi）→ 六十甲子序号"""
+    return jia_zi_index(_GAN_INDEX[pillar['gan']], _ZHI_INDEX[pillar['zhi']])
+
+
+def chart_jitter_key(bazi):
+    """命盘扰动键（日柱、年干、月支）"""
+    return make_jitter_key(
+        _GAN_INDEX[bazi['day_gan']], _ZHI_INDEX[bazi['day_zhi']],
+        _GAN_INDEX[bazi['year_gan']], _ZHI_INDEX[bazi['month_zhi']]
+    )
+
+
+def _calculate_dayun_adjust(dayun, yongshen):
+    """大运修正分（大运天干为喜用加分，为忌神减分）"""
+    if not dayun:
+        return 0
+    dayun_gan_element = WU_XING_MAP.get(dayun.get('current_gan'))
+    if dayun_gan_element in yongshen.get('favorable', []):
+        return FORTUNE_WEIGHTS_V5['dayun_adjust']['favorable']
+    if dayun_gan_element in yongshen.get('unfavorable', []):
+        return FORTUNE_WEIGHTS_V5['dayun_adjust']['unfavorable']
+    return 0
 
 
 def calculate_fortune_score_v5(bazi, element_analysis, yongshen,
@@ -25,39 +104,28 @@ def calculate_fortune_score_v5(bazi, element_analysis, yongshen,
     """
     Celestial-Quant V5.0 完整算法
     """
-    # 改进随机种子：结合用户八字和流日，增加个性化波动
-    # 使用独立的 Random 实例，避免全局状态影响
-    seed_str = f"{bazi['day_gan']}{bazi['day_zhi']}{bazi['year_gan']}{bazi['month_zhi']}{liu_ri['gan']}{liu_ri['zhi']}"
-    rng = random.Random(hash(seed_str))
-    
-    # 为了向后兼容，也设置全局随机种子（但优先使用 rng）
-    random.seed(hash(seed_str))
+    # 流年、流月、流日分量由命盘分数表查得（含确定性个性化扰动）
+    table = get_chart_score_table(bazi, element_analysis, yongshen)
+    year_idx, month_idx, day_idx = _pillar_index(liu_nian), _pillar_index(liu_yue), _pillar_index(liu_ri)
+    is_weak = element_analysis.get('pattern') in ['Weak', 'Follower']
 
     # 基础分（大运修正）
     base_score = FORTUNE_WEIGHTS_V5['base_score']
-    dayun_adjust = 0
-
-    if dayun:
-        dayun_gan_element = WU_XING_MAP.get(dayun.get('current_gan'))
-        if dayun_gan_element in yongshen.get('favorable', []):
-            dayun_adjust = FORTUNE_WEIGHTS_V5['dayun_adjust']['favorable']
-        elif dayun_gan_element in yongshen.get('unfavorable', []):
-            dayun_adjust = FORTUNE_WEIGHTS_V5['dayun_adjust']['unfavorable']
-        base_score += dayun_adjust
+    dayun_adjust = _calculate_dayun_adjust(dayun, yongshen)
+    base_score += dayun_adjust
 
     # 流年影响（10%）
-    liunian_score = _calculate_liunian_score(liu_nian, yongshen)
+    liunian_score = table.liunian[year_idx]
 
     # 流月影响（20%）
-    liuyue_score = _calculate_liuyue_score(liu_yue, yongshen)
+    liuyue_score = table.liuyue[month_idx]
 
     # 流日影响（70%）
-    liuri_score = _calculate_liuri_score(liu_ri, yongshen)
+    liuri_score = table.liuri[day_idx]
 
     # 天干互动
     tiangan_score, tiangan_desc = _check_tiangan_interaction(
-        bazi['day_gan'], liu_ri['gan'], yongshen,
-        element_analysis.get('pattern') in ['Weak', 'Follower']
+        bazi['day_gan'], liu_ri['gan'], yongshen, is_weak
     )
 
     # 地支互动
@@ -72,20 +140,10 @@ def calculate_fortune_score_v5(bazi, element_analysis, yongshen,
 
     # 十神影响
     ten_god = calculate_ten_god(bazi['day_gan'], liu_ri['gan'])
-    ten_god_config = TEN_GOD_INFLUENCE_V5.get(ten_god, {})
-    ten_god_score = 0
+    ten_god_score = _ten_god_bonus(ten_god, is_weak)
 
-    if element_analysis.get('pattern') in ['Weak', 'Follower']:
-        ten_god_score = ten_god_config.get('weak_bonus', ten_god_config.get('bonus', 0))
-    else:
-        ten_god_score = ten_god_config.get('strong_bonus', ten_god_config.get('bonus', 0))
-
-    # 综合计算
-    total = (base_score + liunian_score + liuyue_score + liuri_score +
-             tiangan_score + dizhi_score + shensha_score + ten_god_score)
-
-    # 优化分数范围：扩大波动空间，允许更极端的分数
-    final_score = max(20, min(100, int(total)))
+    # 综合计算（分数表已按同样顺序合计流日相关各项，并限定在 20-100）
+    final_score = table.score(year_idx, month_idx, day_idx, dayun_adjust)
 
     # 收集所有因素
     all_factors = []
@@ -120,6 +178,147 @@ def calculate_fortune_score_v5(bazi, element_analysis, yongshen,
     }
 
 
+class ChartScoreTable:
+    """
+    一张命盘在六十甲子上的分量分数表（3 × 60）
+
+    扰动确定后，流年、流月分量只取决于命盘与对应干支；流日分量连同天干互动、地支互动、
+    神煞、十神只取决于命盘与流日干支。预先算好后，任一日期的总分只需三次查表加大运修正
+    """
+
+    __slots__ = ('liunian', 'liuyue', 'liuri', 'day_total')
+
+    def __init__(self, liunian, liuyue, liuri, day_total):
+        """
+        参数:
+            liunian, liuyue, liuri: 流年、流月、流日分量（各 60 项）
+            day_total: 流日分量 + 天干 + 地支 + 神煞 + 十神（60 项）
+        """
+        self.liunian = array('d', liunian)
+        self.liuyue = array('d', liuyue)
+        self.liuri = array('d', liuri)
+        self.day_total = array('d', day_total)
+
+    def score(self, year_idx, month_idx, day_idx, dayun_adjust=0):
+        """单日 V5.0 总分"""
+        total = (FORTUNE_WEIGHTS_V5['base_score'] + dayun_adjust + self.liunian[year_idx] +
+                 self.liuyue[month_idx] + self.day_total[day_idx])
+        return max(20, min(100, int(total)))
+
+
+def _chart_table_key(bazi, element_analysis, yongshen):
+    """分数表缓存键：四柱 + 强弱 + 用神喜忌（评分只用到这些字段）"""
+    return (
+        bazi['year_gan'] + bazi['year_zhi'], bazi['month_gan'] + bazi['month_zhi'],
+        bazi['day_gan'] + bazi['day_zhi'], bazi['time_gan'] + bazi['time_zhi'],
+        element_analysis.get('pattern') in ['Weak', 'Follower'],
+        yongshen.get('primary'),
+        tuple(yongshen.get('favorable', [])),
+        tuple(yongshen.get('unfavorable', [])),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _build_chart_score_table(key):
+    """按缓存键生成分数表（LRU 淘汰）"""
+    year_gz, month_gz, day_gz, time_gz, is_weak, primary, favorable, unfavorable = key
+    bazi = {
+        'year_gan': year_gz[0], 'year_zhi': year_gz[1],
+        'month_gan': month_gz[0], 'month_zhi': month_gz[1],
+        'day_gan': day_gz[0], 'day_zhi': day_gz[1],
+        'time_gan': time_gz[0], 'time_zhi': time_gz[1],
+    }
+    yongshen = {'primary': primary, 'favorable': list(favorable), 'unfavorable': list(unfavorable)}
+    bazi_zhis = [bazi['year_zhi'], bazi['month_zhi'], bazi['day_zhi'], bazi['time_zhi']]
+    chart_key = chart_jitter_key(bazi)
+
+    liunian, liuyue, liuri, day_total = [], [], [], []
+    for i, pillar in enumerate(_PILLARS):
+        liunian.append(_calculate_liunian_score(pillar, yongshen, make_jitter_key(chart_key, _JITTER_LIUNIAN, i)))
+        liuyue.append(_calculate_liuyue_score(pillar, yongshen, make_jitter_key(chart_key, _JITTER_LIUYUE, i)))
+        liuri_score = _calculate_liuri_score(pillar, yongshen, make_jitter_key(chart_key, _JITTER_LIURI, i))
+        liuri.append(liuri_score)
+
+        tiangan_score, _ = _check_tiangan_interaction(bazi['day_gan'], pillar['gan'], yongshen, is_weak)
+        dizhi_score, _ = _check_dizhi_interaction(bazi_zhis, pillar['zhi'], bazi['day_zhi'], yongshen)
+        shensha_score = _shensha_result_for_mask(_shensha_mask(
+            _GAN_INDEX[bazi['day_gan']], _ZHI_INDEX[bazi['month_zhi']],
+            _ZHI_INDEX[bazi['year_zhi']], _ZHI_INDEX[bazi['day_zhi']],
+            _GAN_INDEX[pillar['gan']], _ZHI_INDEX[pillar['zhi']]
+        ))[0]
+        ten_god_score = _ten_god_bonus(calculate_ten_god(bazi['day_gan'], pillar['gan']), is_weak)
+        day_total.append(liuri_score + tiangan_score + dizhi_score + shensha_score + ten_god_score)
+    return ChartScoreTable(liunian, liuyue, liuri, day_total)
+
+
+def get_chart_score_table(bazi, element_analysis, yongshen):
+    """
+    获取（必要时生成）命盘分数表
+
+    以四柱与用神喜忌为键缓存，同一用户的后续请求直接复用
+    """
+    return _build_chart_score_table(_chart_table_key(bazi, element_analysis, yongshen))
+
+
+def _ten_god_bonus(ten_god, is_weak):
+    """十神加减分（身弱取 weak_bonus，否则取 strong_bonus）"""
+    ten_god_config = TEN_GOD_INFLUENCE_V5.get(ten_god, {})
+    if is_weak:
+        return ten_god_config.get('weak_bonus', ten_god_config.get('bonus', 0))
+    return ten_god_config.get('strong_bonus', ten_god_config.get('bonus', 0))
+
+
+def _sum_scores_numpy(table, base_scores, year_indices, month_indices, day_indices):
+    """NumPy 向量化查表求和（加法顺序与 ChartScoreTable.score 一致，逐元素结果相同）"""
+    import numpy
+    total = numpy.asarray(base_scores, dtype=numpy.float64)
+    total = total + numpy.frombuffer(table.liunian, dtype=numpy.float64)[numpy.asarray(year_indices, dtype=numpy.intp)]
+    total = total + numpy.frombuffer(table.liuyue, dtype=numpy.float64)[numpy.asarray(month_indices, dtype=numpy.intp)]
+    total = total + numpy.frombuffer(table.day_total, dtype=numpy.float64)[numpy.asarray(day_indices, dtype=numpy.intp)]
+    return numpy.clip(numpy.trunc(total), 20, 100).astype(numpy.int32)
+
+
+def calculate_fortune_score_v5_batch(bazi, element_analysis, yongshen,
+                                     year_indices, month_indices, day_indices, dayun=None):
+    """
+    批量计算 V5.0 总分（与 calculate_fortune_score_v5 的 total_score 逐一相同）
+
+    只计算总分，不构建 breakdown、描述与神煞明细；每天只是在命盘分数表上三次查表
+    加大运修正（安装 NumPy 时整段向量化）
+
+    参数:
+        bazi, element_analysis, yongshen: 同 calculate_fortune_score_v5
+        year_indices, month_indices, day_indices: 等长序列，每天的流年/流月/流日六十甲子序号
+            （流年与 calculate_liu_nian 一致按公历年取，即 year_index_for(year)）
+        dayun: 大运 dict（对所有日期生效），或与日期等长的大运序列（元素可为 None）
+
+    返回:
+        每天的总分；安装 NumPy 时为 int32 ndarray，否则为 array('i')
+    """
+    count = len(day_indices)
+    if not (len(year_indices) == len(month_indices) == count):
+        raise ValueError("year_indices、month_indices、day_indices 长度必须一致")
+
+    base_score = FORTUNE_WEIGHTS_V5['base_score']
+    if dayun is None or isinstance(dayun, dict):
+        base_scores = [base_score + _calculate_dayun_adjust(dayun, yongshen)] * count
+    else:
+        if len(dayun) != count:
+            raise ValueError("dayun 序列长度必须与日期数一致")
+        base_scores = [base_score + _calculate_dayun_adjust(d, yongshen) for d in dayun]
+
+    table = get_chart_score_table(bazi, element_analysis, yongshen)
+    if NUMPY_AVAILABLE:
+        return _sum_scores_numpy(table, base_scores, year_indices, month_indices, day_indices)
+
+    liunian, liuyue, day_total = table.liunian, table.liuyue, table.day_total
+    scores = array('i', [0]) * count
+    for i in range(count):
+        total = base_scores[i] + liunian[year_indices[i]] + liuyue[month_indices[i]] + day_total[day_indices[i]]
+        scores[i] = max(20, min(100, int(total)))
+    return scores
+
+
 def calculate_fortune_score_year(bazi, element_analysis, yongshen,
                                  liu_nian, liu_yue, liu_ri, dayun=None):
     """
@@ -127,21 +326,13 @@ def calculate_fortune_score_year(bazi, element_analysis, yongshen,
     权重：流年 50%、大运 30%、流月 20%，流日忽略
     确保每年分数有显著差异
     """
-    # 固定种子，减少随机波动
-    seed_str = f"year_{bazi['day_gan']}{bazi['year_gan']}{liu_nian['gan']}{liu_nian['zhi']}"
-    random.seed(hash(seed_str))
+    table = get_chart_score_table(bazi, element_analysis, yongshen)
 
     base_score = FORTUNE_WEIGHTS_V5['base_score']
-    dayun_adjust = 0
-    if dayun:
-        dayun_gan_element = WU_XING_MAP.get(dayun.get('current_gan'))
-        if dayun_gan_element in yongshen.get('favorable', []):
-            dayun_adjust = FORTUNE_WEIGHTS_V5['dayun_adjust']['favorable']
-        elif dayun_gan_element in yongshen.get('unfavorable', []):
-            dayun_adjust = FORTUNE_WEIGHTS_V5['dayun_adjust']['unfavorable']
+    dayun_adjust = _calculate_dayun_adjust(dayun, yongshen)
 
-    liunian_score = _calculate_liunian_score(liu_nian, yongshen)
-    liuyue_score = _calculate_liuyue_score(liu_yue, yongshen)
+    liunian_score = table.liunian[_pillar_index(liu_nian)]
+    liuyue_score = table.liuyue[_pillar_index(liu_yue)]
 
     # 年运势权重：流年 50%、大运 30%、流月 20%
     # 原权重下 liunian*0.2, liuyue*0.25，放大流年、缩小流日影响
@@ -154,31 +345,52 @@ def calculate_fortune_score_year(bazi, element_analysis, yongshen,
     return final_score
 
 
+def calculate_fortune_score_year_batch(bazi, element_analysis, yongshen,
+                                       year_indices, month_indices, dayun=None):
+    """
+    批量计算年运势总分（与 calculate_fortune_score_year 逐一相同），用于多年趋势
+
+    参数:
+        bazi, element_analysis, yongshen: 同 calculate_fortune_score_year
+        year_indices, month_indices: 等长序列，每年代表日（立春）的流年/流月六十甲子序号
+        dayun: 大运 dict（对所有年份生效），或与年份等长的大运序列（元素可为 None）
+
+    返回:
+        每年的总分列表
+    """
+    count = len(year_indices)
+    if len(month_indices) != count:
+        raise ValueError("year_indices、month_indices 长度必须一致")
+    if dayun is None or isinstance(dayun, dict):
+        dayun = [dayun] * count
+    elif len(dayun) != count:
+        raise ValueError("dayun 序列长度必须与年份数一致")
+
+    table = get_chart_score_table(bazi, element_analysis, yongshen)
+    base_score = FORTUNE_WEIGHTS_V5['base_score']
+    scores = []
+    for year_idx, month_idx, year_dayun in zip(year_indices, month_indices, dayun):
+        # 权重与加法顺序同 calculate_fortune_score_year
+        total = (base_score + _calculate_dayun_adjust(year_dayun, yongshen) * 1.5
+                 + table.liunian[year_idx] * 2.5 + table.liuyue[month_idx] * 0.8)
+        scores.append(max(20, min(100, int(total))))
+    return scores
+
+
 def calculate_fortune_score_month(bazi, element_analysis, yongshen,
                                 liu_nian, liu_yue, liu_ri, dayun=None):
     """
     月运势评分 - 用于月度总览（以月中代表日流月流日为主）
     权重：流月为主、流日次之，流年与大运辅助
     """
-    seed_str = (
-        f"month_{bazi['day_gan']}{bazi['day_zhi']}"
-        f"{liu_nian['gan']}{liu_nian['zhi']}{liu_yue['gan']}{liu_yue['zhi']}"
-        f"{liu_ri['gan']}{liu_ri['zhi']}"
-    )
-    random.seed(hash(seed_str))
+    table = get_chart_score_table(bazi, element_analysis, yongshen)
 
     base_score = FORTUNE_WEIGHTS_V5['base_score']
-    dayun_adjust = 0
-    if dayun:
-        dayun_gan_element = WU_XING_MAP.get(dayun.get('current_gan'))
-        if dayun_gan_element in yongshen.get('favorable', []):
-            dayun_adjust = FORTUNE_WEIGHTS_V5['dayun_adjust']['favorable']
-        elif dayun_gan_element in yongshen.get('unfavorable', []):
-            dayun_adjust = FORTUNE_WEIGHTS_V5['dayun_adjust']['unfavorable']
-
-    liunian_score = _calculate_liunian_score(liu_nian, yongshen)
-    liuyue_score = _calculate_liuyue_score(liu_yue, yongshen)
-    liuri_score = _calculate_liuri_score(liu_ri, yongshen)
+    dayun_adjust = _calculate_dayun_adjust(dayun, yongshen)
+
+    liunian_score = table.liunian[_pillar_index(liu_nian)]
+    liuyue_score = table.liuyue[_pillar_index(liu_yue)]
+    liuri_score = table.liuri[_pillar_index(liu_ri)]
 
     # 流月约 40%、流日约 35%、流年约 15%、大运约 10%（通过系数缩放叠加到 base 体系）
     liuyue_weighted = liuyue_score * 1.35
@@ -190,7 +402,52 @@ def calculate_fortune_score_month(bazi, element_analysis, yongshen,
     return max(20, min(100, int(total)))
 
 
-def _calculate_liunian_score(liu_nian, yongshen):
+# 十二时辰：地支、取时柱用的代表小时（子时取 0 点，避免 23 点跨日）、时段
+SHICHEN = tuple(
+    (zhi, 0 if i == 0 else 2 * i - 1, f"{(2 * i + 23) % 24:02d}:00-{(2 * i + 1) % 24:02d}:00")
+    for i, zhi in enumerate(DI_ZHI)
+)
+# 时柱（按流日同样的方式评估：流日分量 + 天干/地支互动 + 神煞 + 十神）叠加到当日总分的比例
+SHICHEN_WEIGHT = 0.5
+
+
+def calculate_shichen_scores_v5(bazi, element_analysis, yongshen,
+                                year_idx, month_idx, day_idx, dayun=None):
+    """
+    批量计算当日十二时辰评分
+
+    日级分量（基础分、大运、流年、流月、流日合计）只算一次；各时辰由日干推出时柱
+    （get_hour_gan_zhi），在命盘分数表的流日合计项中查得时柱分量，按 SHICHEN_WEIGHT 叠加
+
+    参数:
+        bazi, element_analysis, yongshen: 同 calculate_fortune_score_v5
+        year_idx, month_idx, day_idx: 当日的流年/流月/流日六十甲子序号
+        dayun: 大运 dict 或 None
+
+    返回:
+        12 项列表（子时起），每项 {'zhi', 'ganZhi', 'timeRange', 'score', 'level'}
+    """
+    table = get_chart_score_table(bazi, element_analysis, yongshen)
+    day_total = (FORTUNE_WEIGHTS_V5['base_score'] + _calculate_dayun_adjust(dayun, yongshen) +
+                 table.liunian[year_idx] + table.liuyue[month_idx] + table.day_total[day_idx])
+    day_gan = JIA_ZI[day_idx][0]
+
+    results = []
+    for zhi, hour, time_range in SHICHEN:
+        gan_zhi = get_hour_gan_zhi(day_gan, hour)
+        hour_idx = jia_zi_index(_GAN_INDEX[gan_zhi[0]], _ZHI_INDEX[gan_zhi[1]])
+        score = max(20, min(100, int(day_total + table.day_total[hour_idx] * SHICHEN_WEIGHT)))
+        results.append({
+            'zhi': zhi,
+            'ganZhi': gan_zhi,
+            'timeRange': time_range,
+            'score': score,
+            'level': _get_level_from_score(score),
+        })
+    return results
+
+
+def _calculate_liunian_score(liu_nian, yongshen, jitter_key):
     """计算流年影响（滴天髓：用神为纲，流年干支五行与用神关系）"""
     liunian_weight = FORTUNE_WEIGHTS_V5['liunian']['weight']
     stem_ratio = FORTUNE_WEIGHTS_V5['liunian']['stem_ratio']
@@ -205,32 +462,33 @@ def _calculate_liunian_score(liu_nian, yongshen):
     primary = yongshen.get('primary')
 
     if nian_gan_element == primary:
-        nian_gan_bonus = 9 + random.randint(-1, 1)  # 减少随机范围
+        nian_gan_bonus = 9 + _jitter(jitter_key, 0, -1, 1)  # 减少随机范围
     elif nian_gan_element in favorable_list:
-        nian_gan_bonus = 6 + random.randint(-1, 1)
+        nian_gan_bonus = 6 + _jitter(jitter_key, 0, -1, 1)
     elif nian_gan_element in unfavorable_list:
-        nian_gan_bonus = -7 + random.randint(-1, 0)
+        nian_gan_bonus = -7 + _jitter(jitter_key, 0, -1, 0)
     else:
-        nian_gan_bonus = random.randint(-2, 2)
+        nian_gan_bonus = _jitter(jitter_key, 0, -2, 2)
 
     nian_zhi_element = WU_XING_MAP.get(liu_nian['zhi'])
     nian_zhi_bonus = 0
 
     if nian_zhi_element == primary:
-        nian_zhi_bonus = 6 + random.randint(-1, 1)
+        nian_zhi_bonus = 6 + _jitter(jitter_key, 1, -1, 1)
     elif nian_zhi_element in favorable_list:
-        nian_zhi_bonus = 4 + random.randint(0, 1)
+        nian_zhi_bonus = 4 + _jitter(jitter_key, 1, 0, 1)
     elif nian_zhi_element in unfavorable_list:
-        nian_zhi_bonus = -5 + random.randint(-1, 0)
+        nian_zhi_bonus = -5 + _jitter(jitter_key, 1, -1, 0)
     else:
-        nian_zhi_bonus = random.randint(-1, 1)
+        nian_zhi_bonus = _jitter(jitter_key, 1, -1, 1)
 
     base_score = nian_gan_bonus * stem_ratio + nian_zhi_bonus * branch_ratio
     return base_score * liunian_weight * 6  # 权重乘数 10→6，与流月流日一致
 
 
-def _calculate_liuyue_score(liu_yue, yongshen):
+def _calculate_liuyue_score(liu_yue, yongshen, jitter_key):
     """计算流月影响（滴天髓：用神为纲，流月干支五行与用神关系）"""
+
     liuyue_weight = FORTUNE_WEIGHTS_V5['liuyue']['weight']
     # 如果配置了 stem_ratio 和 branch_ratio，使用它们；否则只使用天干
     stem_ratio = FORTUNE_WEIGHTS_V5['liuyue'].get('stem_ratio', 1.0)
@@ -245,33 +503,34 @@ def _calculate_liuyue_score(liu_yue, yongshen):
 
     # 天干计算
     if yue_gan_element == primary:
-        yue_gan_bonus = 13 + random.randint(-2, 2)
+        yue_gan_bonus = 13 + _jitter(jitter_key, 0, -2, 2)
     elif yue_gan_element in favorable_list:
-        yue_gan_bonus = 8 + random.randint(-1, 1)
+        yue_gan_bonus = 8 + _jitter(jitter_key, 0, -1, 1)
     elif yue_gan_element in unfavorable_list:
-        yue_gan_bonus = -9 + random.randint(-1, 1)
+        yue_gan_bonus = -9 + _jitter(jitter_key, 0, -1, 1)
     else:
-        yue_gan_bonus = random.randint(-2, 2)
+        yue_gan_bonus = _jitter(jitter_key, 0, -2, 2)
 
     # 地支计算
     yue_zhi_bonus = 0
     if branch_ratio > 0:
         if yue_zhi_element == primary:
-            yue_zhi_bonus = 9 + random.randint(-1, 1)
+            yue_zhi_bonus = 9 + _jitter(jitter_key, 1, -1, 1)
         elif yue_zhi_element in favorable_list:
-            yue_zhi_bonus = 6 + random.randint(-1, 1)
+            yue_zhi_bonus = 6 + _jitter(jitter_key, 1, -1, 1)
         elif yue_zhi_element in unfavorable_list:
-            yue_zhi_bonus = -7 + random.randint(-1, 0)
+            yue_zhi_bonus = -7 + _jitter(jitter_key, 1, -1, 0)
         else:
-            yue_zhi_bonus = random.randint(-2, 2)
+            yue_zhi_bonus = _jitter(jitter_key, 1, -2, 2)
 
     base_score = yue_gan_bonus * stem_ratio + yue_zhi_bonus * branch_ratio
     raw = base_score * liuyue_weight * 6  # 权重乘数 10→6
     return raw * 0.6  # 约 60% 缩放，使流月贡献更温和
 
 
-def _calculate_liuri_score(liu_ri, yongshen):
+def _calculate_liuri_score(liu_ri, yongshen, jitter_key):
     """计算流日影响（滴天髓：用神为纲，流日干支五行与用神关系）"""
+
     liuri_weight = FORTUNE_WEIGHTS_V5['liuri']['weight']
     stem_ratio = FORTUNE_WEIGHTS_V5['liuri']['stem_ratio']
     branch_ratio = FORTUNE_WEIGHTS_V5['liuri']['branch_ratio']
@@ -285,25 +544,25 @@ def _calculate_liuri_score(liu_ri, yongshen):
 
     # 系数约 45% 缩放，避免总分轻易破百（理论不变，仅调数值）
     if ri_gan_element == primary:
-        ri_gan_bonus = 18 + random.randint(-2, 2)
+        ri_gan_bonus = 18 + _jitter(jitter_key, 0, -2, 2)
     elif ri_gan_element in favorable_list:
-        ri_gan_bonus = 10 + random.randint(-1, 1)
+        ri_gan_bonus = 10 + _jitter(jitter_key, 0, -1, 1)
     elif ri_gan_element in unfavorable_list:
-        ri_gan_bonus = -10 + random.randint(-1, 1)
+        ri_gan_bonus = -10 + _jitter(jitter_key, 0, -1, 1)
     else:
-        ri_gan_bonus = random.randint(-2, 2)
+        ri_gan_bonus = _jitter(jitter_key, 0, -2, 2)
 
     ri_zhi_element = WU_XING_MAP.get(liu_ri['zhi'])
     ri_zhi_bonus = 0
 
     if ri_zhi_element == primary:
-        ri_zhi_bonus = 13 + random.randint(-1, 1)
+        ri_zhi_bonus = 13 + _jitter(jitter_key, 1, -1, 1)
     elif ri_zhi_element in favorable_list:
-        ri_zhi_bonus = 8 + random.randint(-1, 1)
+        ri_zhi_bonus = 8 + _jitter(jitter_key, 1, -1, 1)
     elif ri_zhi_element in unfavorable_list:
-        ri_zhi_bonus = -7 + random.randint(-1, 0)
+        ri_zhi_bonus = -7 + _jitter(jitter_key, 1, -1, 0)
     else:
-        ri_zhi_bonus = random.randint(-2, 2)
+        ri_zhi_bonus = _jitter(jitter_key, 1, -2, 2)
 
     base_score = ri_gan_bonus * stem_ratio + ri_zhi_bonus * branch_ratio
     return base_score * liuri_weight * 6  # 权重乘数 10→6，使流日贡献约 60 分封顶
@@ -411,51 +670,131 @@ def _check_dizhi_interaction(bazi_zhis, liu_ri_zhi, day_zhi, yongshen):
     return score, descriptions
 
 
-def _calculate_shensha(bazi, liu_ri):
-    """计算神煞影响"""
-    total_score = 0
-    details = []
-    dimension_boosts = {}
+# ==================== 神煞查表 ====================
+# 导入时把 SHEN_SHA_COMPLETE 编译成按干支序号索引的位掩码表，每颗神煞占一位：
+# - stem_based：日干 × 流日地支
+# - month_based：命盘月支（寅=正月）× 流日天干 / 流日地支
+#   （黄历的 calculate_day_shensha 查同一张表，但月支取当日月柱，与命盘无关）
+# - branch_based：命盘年支、日支所在三合/三会组 × 流日地支
+# 单日判定只需几次查表并按位或
+
+_SHENSHA_NAMES = tuple(SHEN_SHA_COMPLETE)
+
+# month_based 神煞表按农历月序书写，正月建寅
+_SHENSHA_MONTH_KEYS = ['正月', '二月', '三月', '四月', '五月', '六月',
+                       '七月', '八月', '九月', '十月', '十一月', '十二月']
+
+
+def _compile_shensha_tables():
+    """编译神煞位掩码表"""
+    stem_branch = [[0] * 12 for _ in range(10)]
+    month_stem = [[0] * 10 for _ in range(12)]
+    month_branch = [[0] * 12 for _ in range(12)]
+    natal_branch = [[0] * 12 for _ in range(12)]
+
+    for bit, name in enumerate(_SHENSHA_NAMES):
+        config = SHEN_SHA_COMPLETE[name]
+        flag = 1 << bit
+        method = config['calc_method']
+        for key, values in config['table'].items():
+            if isinstance(values, str):
+                values = [values]
+            if method == 'stem_based':
+                for zhi in values:
+                    stem_branch[_GAN_INDEX[key]][_ZHI_INDEX[zhi]] |= flag
+            elif method == 'month_based':
+                month_zhi = (_SHENSHA_MONTH_KEYS.index(key) + 2) % 12
+                for value in values:
+                    if value in _GAN_INDEX:
+                        month_stem[month_zhi][_GAN_INDEX[value]] |= flag
+                    else:
+                        month_branch[month_zhi][_ZHI_INDEX[value]] |= flag
+            elif method == 'branch_based':
+                for natal_zhi in key:
+                    for zhi in values:
+                        natal_branch[_ZHI_INDEX[natal_zhi]][_ZHI_INDEX[zhi]] |= flag
+
+    return (
+        tuple(tuple(row) for row in stem_branch),
+        tuple(tuple(row) for row in month_stem),
+        tuple(tuple(row) for row in month_branch),
+        tuple(tuple(row) for row in natal_branch),
+    )
 
-    day_gan = bazi['day_gan']
-    liu_ri_zhi = liu_ri['zhi']
 
-    for sha_name, sha_config in SHEN_SHA_COMPLETE.items():
-        triggered = False
+(_SHENSHA_STEM_BRANCH, _SHENSHA_MONTH_STEM,
+ _SHENSHA_MONTH_BRANCH, _SHENSHA_NATAL_BRANCH) = _compile_shensha_tables()
 
-        if sha_config['calc_method'] == 'stem_based':
-            table = sha_config['table']
-            valid_zhis = table.get(day_gan, [])
-            if isinstance(valid_zhis, list):
-                if liu_ri_zhi in valid_zhis:
-                    triggered = True
-            else:
-                if liu_ri_zhi == valid_zhis:
-                    triggered = True
-
-        if triggered:
-            total_score += sha_config['score']
-            details.append({
-                'name': sha_name,
-                'score': sha_config['score'],
-                'desc': sha_config['desc'],
-                'type': 'auspicious' if sha_config['score'] > 0 else 'inauspicious'
-            })
-
-            if 'dimension_boost' in sha_config:
-                for dim, boost in sha_config['dimension_boost'].items():
-                    dimension_boosts[dim] = dimension_boosts.get(dim, 0) + boost
+
+def _shensha_mask(day_gan_idx, month_zhi_idx, year_zhi_idx, day_zhi_idx, liu_gan_idx, liu_zhi_idx):
+    """命盘（日干、月支、年支、日支）与流日干支对应的神煞位掩码"""
+    return (_SHENSHA_STEM_BRANCH[day_gan_idx][liu_zhi_idx]
+            | _SHENSHA_MONTH_STEM[month_zhi_idx][liu_gan_idx]
+            | _SHENSHA_MONTH_BRANCH[month_zhi_idx][liu_zhi_idx]
+            | _SHENSHA_NATAL_BRANCH[year_zhi_idx][liu_zhi_idx]
+            | _SHENSHA_NATAL_BRANCH[day_zhi_idx][liu_zhi_idx])
+
+
+@lru_cache(maxsize=None)
+def _shensha_result_for_mask(mask):
+    """由位掩码汇总神煞分数、明细与维度加成（按 SHEN_SHA_COMPLETE 顺序）"""
+    total_score = 0
+    details = []
+    dimension_boosts = {}
+    for bit, name in enumerate(_SHENSHA_NAMES):
+        if not mask >> bit & 1:
+            continue
+        sha_config = SHEN_SHA_COMPLETE[name]
+        total_score += sha_config['score']
+        details.append({
+            'name': name,
+            'score': sha_config['score'],
+            'desc': sha_config['desc'],
+            'type': 'auspicious' if sha_config['score'] > 0 else 'inauspicious'
+        })
+        for dim, boost in sha_config.get('dimension_boost', {}).items():
+            dimension_boosts[dim] = dimension_boosts.get(dim, 0) + boost
 
     # 优化：限制神煞影响范围，使其更合理
     total_score = max(-20, min(20, total_score))  # 缩小影响范围，使评分更稳定
+    return total_score, tuple(details), tuple(dimension_boosts.items())
+
 
+def _calculate_shensha(bazi, liu_ri):
+    """计算神煞影响（日干、月令、年支/日支三合各类神煞查表判定）"""
+    mask = _shensha_mask(
+        _GAN_INDEX[bazi['day_gan']], _ZHI_INDEX[bazi['month_zhi']],
+        _ZHI_INDEX[bazi['year_zhi']], _ZHI_INDEX[bazi['day_zhi']],
+        _GAN_INDEX[liu_ri['gan']], _ZHI_INDEX[liu_ri['zhi']]
+    )
+    total_score, details, dimension_boosts = _shensha_result_for_mask(mask)
     return {
         'total_score': total_score,
-        'details': details,
-        'dimension_boosts': dimension_boosts
+        'details': [dict(d) for d in details],
+        'dimension_boosts': dict(dimension_boosts)
     }
 
 
+def calculate_day_shensha(month_zhi, day_gan, day_zhi):
+    """
+    与命盘无关的当日神煞：只按月令判定的天德、月德等（calc_method 为 month_based）
+
+    供黄历使用，月令取当日自身的月柱地支；个人运势的 _calculate_shensha 对同一批神煞
+    改用命盘（出生）月支判定，因此同一天黄历与运势列出的月令神煞可能不同，属有意区分
+
+    参数:
+        month_zhi: 当日月柱地支（不是命盘月支）
+        day_gan, day_zhi: 当日日柱干支
+
+    返回:
+        神煞明细列表（每项 {'name', 'score', 'desc', 'type'}）
+    """
+    month_idx = _ZHI_INDEX[month_zhi]
+    mask = (_SHENSHA_MONTH_STEM[month_idx][_GAN_INDEX[day_gan]]
+            | _SHENSHA_MONTH_BRANCH[month_idx][_ZHI_INDEX[day_zhi]])
+    return [dict(d) for d in _shensha_result_for_mask(mask)[1]]
+
+
 def _get_level_from_score(score):
     """根据分数获取等级"""
     if score >= 80:
@@ -542,85 +881,91 @@ def _get_inference_from_score(score, dimension, ten_god=None):
         return dim_inferences.get("low", "运势欠佳")
 
 
+# 六大维度（前端使用 academic 表示学业）
+DIMENSION_KEYS = ('career', 'wealth', 'romance', 'health', 'academic', 'travel')
+
+
+def _dimension_bonuses(bazi, liu_ri_gan, liu_ri_zhi, dimension_boosts, ten_god):
+    """
+    六大维度相对总分的加减分（按 DIMENSION_KEYS 顺序）
+
+    事业、财运、学业看十神；情感看流日地支与日支六合/六冲；出行看神煞加成；健康取总分
+    """
+    career = 10 if ten_god in DIMENSION_MAPPING['career']['core_shishen'] else 0
+    wealth = 12 if ten_god in DIMENSION_MAPPING['wealth']['core_shishen'] else 0
+    if DIZHI_INTERACTIONS['liu_he'].get(liu_ri_zhi) == bazi['day_zhi']:
+        romance = 12
+    elif DIZHI_INTERACTIONS['liu_chong'].get(liu_ri_zhi) == bazi['day_zhi']:
+        romance = -15
+    else:
+        romance = 0
+    academic = 10 if ten_god in DIMENSION_MAPPING['studies']['core_shishen'] else 0
+    travel = dimension_boosts.get('travel', 0)
+    return career, wealth, romance, 0, academic, travel
+
+
 def calculate_dimensions_v5(bazi, liu_ri, overall_score, yongshen,
                              element_analysis, shensha_result):
     """计算六大维度分数（返回完整对象）"""
     dimensions = {}
-    base_dim_score = overall_score
     ten_god = calculate_ten_god(bazi['day_gan'], liu_ri['gan'])
+    bonuses = _dimension_bonuses(bazi, liu_ri['gan'], liu_ri['zhi'],
+                                 shensha_result.get('dimension_boosts', {}), ten_god)
+
+    for dimension, bonus in zip(DIMENSION_KEYS, bonuses):
+        score = max(0, min(100, int(overall_score + bonus)))
+        dimensions[dimension] = {
+            'score': score,
+            'level': _get_level_from_score(score),
+            'tag': _get_tag_from_score(score, dimension),
+            'inference': _get_inference_from_score(score, dimension, ten_god)
+        }
 
-    # 事业运
-    career_score = base_dim_score
-    if ten_god in DIMENSION_MAPPING['career']['core_shishen']:
-        career_score += 10
-    career_score = max(0, min(100, int(career_score)))
-    dimensions['career'] = {
-        'score': career_score,
-        'level': _get_level_from_score(career_score),
-        'tag': _get_tag_from_score(career_score, 'career'),
-        'inference': _get_inference_from_score(career_score, 'career', ten_god)
-    }
+    return dimensions
 
-    # 财运
-    wealth_score = base_dim_score
-    if ten_god in DIMENSION_MAPPING['wealth']['core_shishen']:
-        wealth_score += 12
-    wealth_score = max(0, min(100, int(wealth_score)))
-    dimensions['wealth'] = {
-        'score': wealth_score,
-        'level': _get_level_from_score(wealth_score),
-        'tag': _get_tag_from_score(wealth_score, 'wealth'),
-        'inference': _get_inference_from_score(wealth_score, 'wealth', ten_god)
-    }
 
-    # 情感运
-    romance_score = base_dim_score
-    if DIZHI_INTERACTIONS['liu_he'].get(liu_ri['zhi']) == bazi['day_zhi']:
-        romance_score += 12
-    elif DIZHI_INTERACTIONS['liu_chong'].get(liu_ri['zhi']) == bazi['day_zhi']:
-        romance_score -= 15
-    romance_score = max(0, min(100, int(romance_score)))
-    dimensions['romance'] = {
-        'score': romance_score,
-        'level': _get_level_from_score(romance_score),
-        'tag': _get_tag_from_score(romance_score, 'romance'),
-        'inference': _get_inference_from_score(romance_score, 'romance', ten_god)
-    }
+@lru_cache(maxsize=1024)
+def _dimension_bonus_table(day_gan, day_zhi, month_zhi, year_zhi, shensha=True):
+    """
+    命盘在六十甲子流日上的维度加减分表：60 项，每项按 DIMENSION_KEYS 顺序（只取决于这四个字）
 
-    # 健康运
-    health_score = max(0, min(100, int(base_dim_score)))
-    dimensions['health'] = {
-        'score': health_score,
-        'level': _get_level_from_score(health_score),
-        'tag': _get_tag_from_score(health_score, 'health'),
-        'inference': _get_inference_from_score(health_score, 'health', ten_god)
-    }
+    shensha 为 False 时不计神煞加成（同年运传入空神煞结果）
+    """
+    bazi = {'day_gan': day_gan, 'day_zhi': day_zhi, 'month_zhi': month_zhi, 'year_zhi': year_zhi}
+    table = []
+    for pillar in _PILLARS:
+        boosts = _calculate_shensha(bazi, pillar)['dimension_boosts'] if shensha else {}
+        ten_god = calculate_ten_god(day_gan, pillar['gan'])
+        table.append(_dimension_bonuses(bazi, pillar['gan'], pillar['zhi'], boosts, ten_god))
+    return tuple(table)
 
-    # 学业运（前端使用 academic）
-    studies_score = base_dim_score
-    if ten_god in DIMENSION_MAPPING['studies']['core_shishen']:
-        studies_score += 10
-    studies_score = max(0, min(100, int(studies_score)))
-    dimensions['academic'] = {
-        'score': studies_score,
-        'level': _get_level_from_score(studies_score),
-        'tag': _get_tag_from_score(studies_score, 'academic'),
-        'inference': _get_inference_from_score(studies_score, 'academic', ten_god)
-    }
 
-    # 出行运
-    travel_score = base_dim_score
-    if 'travel' in shensha_result.get('dimension_boosts', {}):
-        travel_score += shensha_result['dimension_boosts']['travel']
-    travel_score = max(0, min(100, int(travel_score)))
-    dimensions['travel'] = {
-        'score': travel_score,
-        'level': _get_level_from_score(travel_score),
-        'tag': _get_tag_from_score(travel_score, 'travel'),
-        'inference': _get_inference_from_score(travel_score, 'travel', ten_god)
-    }
+def calculate_dimension_scores_v5_batch(bazi, day_indices, overall_scores, shensha=True):
+    """
+    批量计算六大维度分数（只算分数，不生成等级、标签与推论文案）
 
-    return dimensions
+    与 calculate_dimensions_v5 的各维 score 逐一相同（神煞取流日神煞，与日运一致）
+
+    参数:
+        bazi: 命盘
+        day_indices: 每天的流日六十甲子序号
+        overall_scores: 每天的总分（calculate_fortune_score_v5_batch 的结果）
+        shensha: 是否计神煞加成；年运不计（与 handle_fortune_year_request 一致）
+
+    返回:
+        {维度: 每天的分数列表}，维度按 DIMENSION_KEYS
+    """
+    if len(day_indices) != len(overall_scores):
+        raise ValueError("day_indices 与 overall_scores 长度必须一致")
+    table = _dimension_bonus_table(bazi['day_gan'], bazi['day_zhi'], bazi['month_zhi'], bazi['year_zhi'],
+                                   bool(shensha))
+    columns = {dimension: [] for dimension in DIMENSION_KEYS}
+    appends = [columns[dimension].append for dimension in DIMENSION_KEYS]
+    for day_idx, overall in zip(day_indices, overall_scores):
+        overall = int(overall)
+        for append, bonus in zip(appends, table[day_idx]):
+            append(max(0, min(100, int(overall + bonus))))
+    return columns
 
 
 def generate_main_theme(total_score, day_gan, liu_ri_gan, rng=None):
@@ -639,8 +984,8 @@ def generate_main_theme(total_score, day_gan, liu_ri_gan, rng=None):
     theme_info = TEN_GOD_THEMES.get(ten_god, TEN_GOD_THEMES['食神'])
     descriptions = theme_info['descriptions']
     
-    # 根据流日天干增加变化性
-    gan_index = hash(liu_ri_gan) % len(descriptions) if descriptions else 0
+    # 根据流日天干增加变化性（按天干序号取，跨进程稳定）
+    gan_index = _GAN_INDEX.get(liu_ri_gan, 0) % len(descriptions) if descriptions else 0
 
     if total_score >= 85:
         sub_keyword = '运势极佳'
@@ -741,7 +1086,7 @@ def generate_todo(yong_shen_element, ji_shen_list, liu_ri=None, bazi=None, yongs
     
     # 使用流日天干作为索引，确保不同日期选择不同建议
     if liu_ri:
-        gan_index = hash(liu_ri.get('gan', '')) % len(general_suggestions)
+        gan_index = _GAN_INDEX.get(liu_ri.get('gan', ''), 0) % len(general_suggestions)
         selected = [general_suggestions[gan_index % len(general_suggestions)],
                    general_suggestions[(gan_index + 1) % len(general_suggestions)]]
     else:
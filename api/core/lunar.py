@@ -4,17 +4,30 @@
 包含：农历、节气、真太阳时、干支计算、大运计算
 """
 
+import calendar
 import datetime
+import importlib.util
+import os
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+
 from .constants import (
-    TIAN_GAN, DI_ZHI, SOLAR_TERMS, SOLAR_TERM_TABLE
+    TIAN_GAN, DI_ZHI, SOLAR_TERMS
+)
+from .solar_terms import (
+    datetime_from_minutes, find_term_index, get_term_date, get_term_minutes,
+    minutes_from_datetime
+)
+from .calendar_table import (
+    JIA_ZI, day_index_for_ordinal, lookup_pillar_indices, month_index_for, year_index_for
 )
 
-# 尝试导入 lunar_python，如果不存在则使用备用方案
-try:
-    from lunar_python import Solar, Lunar
-    LUNAR_PYTHON_AVAILABLE = True
-except ImportError:
-    LUNAR_PYTHON_AVAILABLE = False
+# lunar_python 仅作为大运计算的对照验证后端，不在模块加载时导入（减少冷启动耗时与内存）
+LUNAR_PYTHON_AVAILABLE = importlib.util.find_spec('lunar_python') is not None
+
+# 大运计算后端：native（默认，基于本项目节气数据）或 lunar_python（对照验证）
+DAYUN_BACKEND = os.environ.get('DAYUN_BACKEND', 'native')
 
 
 def get_gan_zhi_from_num(num):
@@ -27,6 +40,25 @@ def get_gan_zhi_from_num(num):
     return TIAN_GAN[gan_index] + DI_ZHI[zhi_index]
 
 
+def get_pillar_indices(year, month, day):
+    """
+    获取某日年、月、日柱的六十甲子序号（0=甲子）
+
+    1900-2100 年直接查干支表，范围外按节气实时推算
+
+    返回:
+        (年柱序号, 月柱序号, 日柱序号)
+    """
+    indices = lookup_pillar_indices(datetime.date(year, month, day).toordinal())
+    if indices is not None:
+        return indices
+    return (
+        JIA_ZI.index(get_year_gan_zhi(year, month, day)),
+        JIA_ZI.index(get_month_gan_zhi(year, month, day)),
+        JIA_ZI.index(get_day_gan_zhi(year, month, day)),
+    )
+
+
 def adjust_time_for_longitude(dt, longitude):
     """
     真太阳时校准
@@ -47,7 +79,7 @@ def adjust_time_for_longitude(dt, longitude):
 
 def get_solar_term_for_year(year, term_index):
     """
-    获取某年某个节气的日期
+    获取某年某个节气的日期（按太阳视黄经计算，按年缓存）
 
     参数:
         year: 年份
@@ -56,50 +88,21 @@ def get_solar_term_for_year(year, term_index):
     返回:
         (月, 日)
     """
-    # 如果有精确数据表，使用表
-    if year in SOLAR_TERM_TABLE:
-        month, day = SOLAR_TERM_TABLE[year][term_index]
-        return month, day
-
-    # 否则使用近似算法
-    base_year = 2025
-    if base_year in SOLAR_TERM_TABLE:
-        base_month, base_day = SOLAR_TERM_TABLE[base_year][term_index]
-    else:
-        # 如果连基准年都没有，使用硬编码的大致日期
-        approximate_dates = [
-            (1, 5), (1, 20), (2, 3), (2, 18), (3, 5), (3, 20),
-            (4, 4), (4, 19), (5, 5), (5, 20), (6, 5), (6, 21),
-            (7, 6), (7, 22), (8, 7), (8, 23), (9, 7), (9, 22),
-            (10, 8), (10, 23), (11, 7), (11, 22), (12, 7), (12, 21)
-        ]
-        base_month, base_day = approximate_dates[term_index]
-
-    # 每年节气会有小幅偏移（约±1天）
-    # 简化处理：假设不变（实际应用中可以加入更精确的算法）
-    return base_month, base_day
+    return get_term_date(year, term_index)
 
 
 def get_current_solar_term(date):
     """
     获取指定日期所处的节气
 
+    参数:
+        date: date 对象（交节当日算入新节气），或 datetime 对象（按交节时刻划分）
+
     返回:
         (节气名称, 节气索引)
     """
-    year = date.year
-    month = date.month
-    day = date.day
-
-    # 遍历24个节气，找到最近的前一个
-    for i in range(23, -1, -1):
-        term_month, term_day = get_solar_term_for_year(year, i)
-
-        if month > term_month or (month == term_month and day >= term_day):
-            return SOLAR_TERMS[i], i
-
-    # 如果在当年第一个节气之前，属于上一年的冬至
-    return SOLAR_TERMS[23], 23
+    term_index = find_term_index(date)
+    return SOLAR_TERMS[term_index], term_index
 
 
 def get_year_gan_zhi(year, month, day):
@@ -114,6 +117,10 @@ def get_year_gan_zhi(year, month, day):
     返回:
         年干支字符串，如 "甲子"
     """
+    indices = lookup_pillar_indices(datetime.date(year, month, day).toordinal())
+    if indices is not None:
+        return JIA_ZI[indices[0]]
+
     # 检查是否在立春之前
     lichun_month, lichun_day = get_solar_term_for_year(year, 2)  # 立春是第2个节气（索引2）
 
@@ -136,6 +143,10 @@ def get_month_gan_zhi(year, month, day):
 
     月柱根据节气划分（不是公历月份）
     """
+    indices = lookup_pillar_indices(datetime.date(year, month, day).toordinal())
+    if indices is not None:
+        return JIA_ZI[indices[1]]
+
     # 1. 确定节气月（地支）
     term_name, term_index = get_current_solar_term(datetime.date(year, month, day))
 
@@ -154,9 +165,9 @@ def get_month_gan_zhi(year, month, day):
     month_gan_starts = [2, 4, 6, 8, 0]  # 对应丙戊庚壬甲的索引
     month_gan_base = month_gan_starts[year_gan_index % 5]
 
-    # 寅月(索引2)开始，月干从基数开始
-    # 实际月份地支索引 month_zhi_index，寅月是2
-    month_gan_index = (month_gan_base + (month_zhi_index - 2)) % 10
+    # 寅月(索引2)开始，月干从基数开始，依次排到次年丑月
+    # 实际月份地支索引 month_zhi_index，寅月是2（子、丑月为第 11、12 个月）
+    month_gan_index = (month_gan_base + (month_zhi_index - 2) % 12) % 10
 
     return TIAN_GAN[month_gan_index] + DI_ZHI[month_zhi_index]
 
@@ -168,6 +179,10 @@ def get_day_gan_zhi(year, month, day):
     使用公元纪年推算法
     基准：1900年1月1日 = 甲戌日（六十甲子序号10，从0开始计数）
     """
+    indices = lookup_pillar_indices(datetime.date(year, month, day).toordinal())
+    if indices is not None:
+        return JIA_ZI[indices[2]]
+
     # 使用1900年1月1日作为基准，这一天是甲戌日（序号10）
     base_date = datetime.date(1900, 1, 1)
     target_date = datetime.date(year, month, day)
@@ -215,6 +230,26 @@ def get_hour_gan_zhi(day_gan, hour):
     return TIAN_GAN[time_gan_index] + DI_ZHI[time_zhi_index]
 
 
+def get_exact_pillar_indices(dt):
+    """
+    按交节时刻精确划分的年柱、月柱序号
+
+    与按日查表不同，交节当日交节时刻之前仍属上一节气（立春时刻前仍属上一年）
+
+    参数:
+        dt: datetime 对象（北京时间）
+
+    返回:
+        (年柱序号, 月柱序号, 节气索引)
+    """
+    term_index = find_term_index(dt)
+    calc_year = dt.year
+    if minutes_from_datetime(dt) < get_term_minutes(dt.year)[2]:
+        calc_year -= 1  # 立春交节时刻之前，算上一年
+    year_idx = year_index_for(calc_year)
+    return year_idx, month_index_for(year_idx, term_index), term_index
+
+
 def calculate_bazi(birth_datetime, longitude=120.0):
     """
     计算完整八字
@@ -229,19 +264,18 @@ def calculate_bazi(birth_datetime, longitude=120.0):
     # 1. 真太阳时校准
     adjusted_dt = adjust_time_for_longitude(birth_datetime, longitude)
 
-    year = adjusted_dt.year
-    month = adjusted_dt.month
-    day = adjusted_dt.day
     hour = adjusted_dt.hour
 
-    # 2. 计算四柱干支
-    year_gz = get_year_gan_zhi(year, month, day)
-    month_gz = get_month_gan_zhi(year, month, day)
-    day_gz = get_day_gan_zhi(year, month, day)
-    hour_gz = get_hour_gan_zhi(day_gz[0], hour)
+    # 2. 年柱、月柱按交节时刻精确划分，日柱按日序推算
+    year_idx, month_idx, term_index = get_exact_pillar_indices(adjusted_dt)
+    term_name = SOLAR_TERMS[term_index]
+    day_idx = day_index_for_ordinal(adjusted_dt.toordinal())
 
-    # 3. 获取节气
-    term_name, term_index = get_current_solar_term(adjusted_dt.date())
+    # 3. 四柱干支
+    year_gz = JIA_ZI[year_idx]
+    month_gz = JIA_ZI[month_idx]
+    day_gz = JIA_ZI[day_idx]
+    hour_gz = get_hour_gan_zhi(day_gz[0], hour)
 
     return {
         'year': year_gz,
@@ -266,8 +300,8 @@ def calculate_liu_nian(year):
     """
     计算流年干支
     """
-    # 使用年初日期来获取年干支
-    year_gz = get_year_gan_zhi(year, 2, 4)  # 使用立春后的日期确保正确
+    # 流年即该节气年本身的干支，无需按日期查节气
+    year_gz = JIA_ZI[year_index_for(year)]
 
     return {
         'year': year,
@@ -281,7 +315,7 @@ def calculate_liu_yue(year, month, day):
     """
     计算流月干支
     """
-    month_gz = get_month_gan_zhi(year, month, day)
+    month_gz = JIA_ZI[get_pillar_indices(year, month, day)[1]]
 
     return {
         'year': year,
@@ -296,7 +330,7 @@ def calculate_liu_ri(year, month, day):
     """
     计算流日干支
     """
-    day_gz = get_day_gan_zhi(year, month, day)
+    day_gz = JIA_ZI[get_pillar_indices(year, month, day)[2]]
 
     return {
         'year': year,
@@ -308,16 +342,194 @@ def calculate_liu_ri(year, month, day):
     }
 
 
+class DaYunTimeline:
+    """
+    一张命盘的完整大运时间轴
+
+    各步大运按起始年份升序存放在并列数组中，"某年处于哪步大运" 为一次二分查找
+    """
+
+    __slots__ = ('start_years', 'end_years', 'gan_zhi', 'start_ages')
+
+    def __init__(self, entries):
+        """
+        参数:
+            entries: [(start_year, end_year, gan_zhi, start_age), ...]，按起始年份升序
+        """
+        self.start_years = array('i', (e[0] for e in entries))
+        self.end_years = array('i', (e[1] for e in entries))
+        self.gan_zhi = tuple(e[2] for e in entries)
+        self.start_ages = array('i', (e[3] for e in entries))
+
+    def __len__(self):
+        return len(self.gan_zhi)
+
+    def find(self, target_year):
+        """
+        查找目标年份所在的大运
+
+        返回:
+            与 calculate_dayun 相同格式的 dict，不在任何大运内时返回 None
+        """
+        pos = bisect_right(self.start_years, target_year) - 1
+        if pos < 0 or target_year > self.end_years[pos]:
+            return None
+        gan_zhi = self.gan_zhi[pos]
+        return {
+            'current_gan': gan_zhi[0],
+            'current_zhi': gan_zhi[1],
+            'gan_zhi': gan_zhi,
+            'start_year': self.start_years[pos],
+            'end_year': self.end_years[pos],
+            'age': self.start_ages[pos]
+        }
+
+
+# 大运步数（不含起运前的童限）
+DAYUN_STEPS = 9
+
+
+def _time_zhi_index(dt):
+    """起运计算所用时辰序号：23 点记亥时（11），其余按两小时一个时辰"""
+    return 11 if dt.hour == 23 else (dt.hour + 1) // 2
+
+
+def _jie_minutes_around(year):
+    """year 前后三年的 12 节交节时刻（分钟数，升序）"""
+    minutes = []
+    for y in (year - 1, year, year + 1):
+        minutes.extend(get_term_minutes(y)[0::2])
+    return minutes
+
+
+def _add_years_months_days(dt, years, months, days):
+    """公历日期依次加年、月、日（月末日期按目标月天数截断）"""
+    year = dt.year + years
+    month_total = dt.month - 1 + months
+    year += month_total // 12
+    month = month_total % 12 + 1
+    day = min(dt.day, calendar.monthrange(year, month)[1])
+    return datetime.date(year, month, day) + datetime.timedelta(days=days)
+
+
+def _build_dayun_entries_native(birth_datetime, gender):
+    """
+    基于本项目节气数据排大运
+
+    - 阳年男、阴年女顺排，阴年男、阳年女逆排（年干以立春交节时刻为界）
+    - 顺排数到下一个节，逆排数到上一个节；三天折一年、一天折四个月、一个时辰折十天
+    - 各步大运干支由出生月柱（按交节时刻精确划分）顺/逆推
+    """
+    year_idx, month_idx, _ = get_exact_pillar_indices(birth_datetime)
+    forward = (year_idx % 2 == 0) == (gender == 'male')
+
+    birth_minutes = minutes_from_datetime(birth_datetime)
+    jie_minutes = _jie_minutes_around(birth_datetime.year)
+    pos = bisect_right(jie_minutes, birth_minutes)
+    if forward:
+        start, end = birth_datetime, datetime_from_minutes(jie_minutes[pos])
+    else:
+        start, end = datetime_from_minutes(jie_minutes[pos - 1]), birth_datetime
+
+    hour_diff = _time_zhi_index(end) - _time_zhi_index(start)
+    day_diff = end.toordinal() - start.toordinal()
+    if hour_diff < 0:
+        hour_diff += 12
+        day_diff -= 1
+    month_diff = hour_diff * 10 // 30
+    months = day_diff * 4 + month_diff
+    days = hour_diff * 10 - month_diff * 30
+    years, months = divmod(months, 12)
+
+    first_year = _add_years_months_days(birth_datetime, years, months, days).year
+    step = 1 if forward else -1
+    entries = []
+    for i in range(1, DAYUN_STEPS + 1):
+        start_year = first_year + (i - 1) * 10
+        entries.append((
+            start_year,
+            start_year + 9,
+            JIA_ZI[(month_idx + step * i) % 60],
+            start_year - birth_datetime.year + 1
+        ))
+    return entries
+
+
+def _build_dayun_entries_lunar_python(birth_datetime, gender):
+    """使用 lunar_python 排大运（仅用于对照验证，按需导入）"""
+    from lunar_python import Solar
+
+    # 创建 Solar 对象
+    solar = Solar.fromYmdHms(
+        birth_datetime.year,
+        birth_datetime.month,
+        birth_datetime.day,
+        birth_datetime.hour,
+        birth_datetime.minute,
+        birth_datetime.second
+    )
+
+    # 获取农历和八字
+    eight_char = solar.getLunar().getEightChar()
+
+    # 根据性别获取大运（1=男，2=女）
+    gender_code = 1 if gender == 'male' else 2
+    yun = eight_char.getYun(gender_code)
+
+    entries = []
+    for i, dy in enumerate(yun.getDaYun()):
+        if i == 0:
+            continue  # 跳过大运前的童限
+        gan_zhi = dy.getGanZhi()
+        if len(gan_zhi) >= 2:
+            entries.append((dy.getStartYear(), dy.getEndYear(), gan_zhi, dy.getStartAge()))
+    entries.sort(key=lambda e: e[0])
+    return entries
+
+
+@lru_cache(maxsize=2048)
+def get_dayun_timeline(birth_datetime, gender='male', longitude=120.0, backend=None):
+    """
+    计算并缓存一张命盘的大运时间轴（以出生时刻、性别、经度为键，LRU 淘汰）
+
+    与 calculate_bazi 相同，先按经度校准为真太阳时，再定顺逆、起运岁数与各步干支
+
+    参数:
+        birth_datetime: 出生时间（北京时间）
+        longitude: 出生地东经度数
+        backend: 'native' 或 'lunar_python'，默认取 DAYUN_BACKEND
+
+    返回:
+        DaYunTimeline 对象，无法计算时返回 None
+    """
+    backend = backend or DAYUN_BACKEND
+    solar_dt = adjust_time_for_longitude(birth_datetime, longitude)
+    try:
+        if backend == 'lunar_python':
+            if not LUNAR_PYTHON_AVAILABLE:
+                return None
+            entries = _build_dayun_entries_lunar_python(solar_dt, gender)
+        else:
+            entries = _build_dayun_entries_native(solar_dt, gender)
+        return DaYunTimeline(entries)
+    except Exception as e:
+        # 如果计算失败，返回 None
+        print(f"[WARNING] 大运计算失败: {str(e)}")
+        return None
+
+
 def calculate_dayun(birth_datetime, target_year, gender='male', longitude=120.0):
     """
     计算当前大运
-    
+
+    同一命盘的大运时间轴只计算一次（见 get_dayun_timeline），之后按年份二分查找
+
     参数:
         birth_datetime: datetime 对象，出生时间
         target_year: int，目标年份
         gender: str，性别 ('male' 或 'female')
         longitude: float，出生地经度
-    
+
     返回:
         dict: {
             'current_gan': str, 当前大运天干
@@ -325,54 +537,10 @@ def calculate_dayun(birth_datetime, target_year, gender='male', longitude=120.0)
             'gan_zhi': str, 当前大运干支
             'start_year': int, 大运起始年份
             'end_year': int, 大运结束年份
+            'age': int, 起运年龄
         } 或 None（如果无法计算）
     """
-    if not LUNAR_PYTHON_AVAILABLE:
-        # 如果没有 lunar_python 库，返回 None
-        return None
-    
-    try:
-        # 创建 Solar 对象
-        solar = Solar.fromYmdHms(
-            birth_datetime.year,
-            birth_datetime.month,
-            birth_datetime.day,
-            birth_datetime.hour,
-            birth_datetime.minute,
-            birth_datetime.second
-        )
-        
-        # 获取农历和八字
-        lunar = solar.getLunar()
-        eight_char = lunar.getEightChar()
-        
-        # 根据性别获取大运（1=男，2=女）
-        gender_code = 1 if gender == 'male' else 2
-        yun = eight_char.getYun(gender_code)
-        da_yun_list = yun.getDaYun()
-        
-        # 查找目标年份所在的大运
-        for i, dy in enumerate(da_yun_list):
-            if i == 0:
-                continue  # 跳过大运前的童限
-            
-            start_year = dy.getStartYear()
-            end_year = dy.getEndYear()
-            
-            if start_year <= target_year <= end_year:
-                gan_zhi = dy.getGanZhi()
-                if len(gan_zhi) >= 2:
-                    return {
-                        'current_gan': gan_zhi[0],
-                        'current_zhi': gan_zhi[1],
-                        'gan_zhi': gan_zhi,
-                        'start_year': start_year,
-                        'end_year': end_year,
-                        'age': dy.getStartAge()
-                    }
-        
-        return None
-    except Exception as e:
-        # 如果计算失败，返回 None
-        print(f"[WARNING] 大运计算失败: {str(e)}")
+    timeline = get_dayun_timeline(birth_datetime, gender, float(longitude))
+    if timeline is None:
         return None
+    return timeline.find(target_year)
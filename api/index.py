@@ -4,11 +4,18 @@ Fortune Calendar API - Vercel Python entrypoint
 """
 
 import datetime
+import importlib
 import json
 import os
 import sys
+import zlib
 from http.server import BaseHTTPRequestHandler
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 
 api_dir = os.path.dirname(os.path.abspath(__file__))
@@ -16,6 +23,206 @@ if api_dir not in sys.path:
     sys.path.insert(0, api_dir)
 
 
+class Route:
+    """
+    路由目标：模块与入口（点分属性路径），首次分发时导入并记住
+
+    kind 决定调用与响应方式：
+        route     - fn(path, method, body, headers)，路由层结果
+        service   - fn(body)，运势类服务结果（Server-Timing）
+        conditional - fn(body, not_modified=回调)，运势类服务结果，带 ETag / Cache-Control，
+                    If-None-Match 命中时服务不运行流水线
+        plain     - fn(body)，普通服务结果
+        cacheable - fn(前缀后的路径余部)，带 ETag / Cache-Control
+        ai_chat   - AI 对话（入口为 AIService 类）
+        root      - API 信息（无目标模块）
+        encoder   - 响应编码函数（不参与分发，只借用按需导入）
+    """
+
+    __slots__ = ("module", "attr", "kind", "_target")
+
+    def __init__(self, module, attr, kind):
+        self.module = module
+        self.attr = attr
+        self.kind = kind
+        self._target = None
+
+    def target(self):
+        if self._target is None and self.module:
+            target = importlib.import_module(self.module)
+            for name in self.attr.split("."):
+                target = getattr(target, name)
+            self._target = target
+        return self._target
+
+
+ROOT_ROUTE = Route(None, None, "root")
+AUTH_ROUTE = Route("routes.auth_routes", "handle_auth_request", "route")
+# 整路径精确匹配
+EXACT_ROUTES = {"/": ROOT_ROUTE, "/api": ROOT_ROUTE}
+# 路径前缀（按段匹配，先于后缀）
+PREFIX_ROUTES = {
+    "/api/auth": AUTH_ROUTE,
+    "/api/invite": AUTH_ROUTE,
+    "/api/user": AUTH_ROUTE,
+    "/api/sync": Route("routes.sync_routes", "handle_sync_request", "route"),
+    "/api/almanac": Route("services.almanac_service", "AlmanacService.handle_almanac_request", "cacheable"),
+}
+# 路径末尾若干段匹配（兼容 /fortune、/api/fortune 等写法）
+SUFFIX_ROUTES = {
+    "/date-picker/recommend": Route(
+        "services.date_picker_service", "DatePickerService.handle_recommend_request", "service"),
+    "/lifemap/trends": Route("services.lifemap_service", "LifeMapService.handle_trends_request", "service"),
+    "/fortune": Route("services.fortune_service", "FortuneService.handle_fortune_request", "conditional"),
+    "/fortune-year": Route(
+        "services.fortune_service", "FortuneService.handle_fortune_year_request", "conditional"),
+    "/fortune-month": Route(
+        "services.fortune_service", "FortuneService.handle_fortune_month_request", "conditional"),
+    "/fortune-shichen": Route(
+        "services.fortune_service", "FortuneService.handle_fortune_shichen_request", "conditional"),
+    "/yijing-divination": Route("services.yijing_service", "YijingService.handle_divination_request", "plain"),
+    "/hepan": Route("services.hepan_service", "HepanService.handle_hepan_request", "plain"),
+    "/ai-chat": Route("services.ai_service", "AIService", "ai_chat"),
+}
+# 响应编码同样按需导入：导入 utils 包会连带加载邮件与 KV 客户端
+RESPONSE_ENCODER = Route("utils.json_utils", "dumps_response", "encoder")
+
+
+def _build_prefix_trie(prefixes):
+    """前缀表 → 按路径段的字典树，节点中 None 键存放路由"""
+    trie = {}
+    for prefix, route in prefixes.items():
+        node = trie
+        for segment in prefix.strip("/").split("/"):
+            node = node.setdefault(segment, {})
+        node[None] = route
+    return trie
+
+
+_PREFIX_TRIE = _build_prefix_trie(PREFIX_ROUTES)
+_SUFFIX_DEPTH = max(suffix.count("/") for suffix in SUFFIX_ROUTES)
+
+
+def _match_prefix(segments):
+    """最长前缀匹配，返回 (Route, 匹配段数) 或 (None, 0)"""
+    node, matched, depth = _PREFIX_TRIE, None, 0
+    for i, segment in enumerate(segments):
+        node = node.get(segment)
+        if node is None:
+            break
+        if None in node:
+            matched, depth = node[None], i + 1
+    return matched, depth
+
+
+# 前端实际请求的 /api/<后缀> 直接走精确匹配（被前缀占用的路径除外）
+for _suffix, _route in SUFFIX_ROUTES.items():
+    if _match_prefix(("api" + _suffix).split("/"))[0] is None:
+        EXACT_ROUTES.setdefault("/api" + _suffix, _route)
+
+
+def resolve_route(path):
+    """
+    解析路径：精确匹配 → 最长前缀 → 末尾段
+
+    返回:
+        (Route, 前缀后的路径余部) 或 (None, None)
+    """
+    route = EXACT_ROUTES.get(path)
+    if route is not None:
+        return route, ""
+
+    segments = path.strip("/").split("/")
+    matched, depth = _match_prefix(segments)
+    if matched is not None:
+        return matched, "/".join(segments[depth:])
+
+    for n in range(min(_SUFFIX_DEPTH, len(segments)), 0, -1):
+        route = SUFFIX_ROUTES.get("/" + "/".join(segments[-n:]))
+        if route is not None:
+            return route, ""
+    return None, None
+
+
+def preload_routes():
+    """
+    导入全部路由目标模块、生成当年干支表并映射命盘分析预计算表（冷启动时调用）
+
+    首个请求不再付模块导入与建表开销；预计算表缺失时在此提示
+    """
+    for route in list(PREFIX_ROUTES.values()) + list(SUFFIX_ROUTES.values()) + [RESPONSE_ENCODER]:
+        route.target()
+    from core.analysis_table import get_analysis_table
+    from core.calendar_table import get_year_table
+
+    get_year_table(datetime.date.today().year)
+    get_analysis_table()
+
+
+# 响应压缩：正文不小于 COMPRESS_MIN_BYTES 且 Accept-Encoding 接受时压缩
+COMPRESS_MIN_BYTES = int(os.environ.get("API_COMPRESS_MIN_BYTES", "1024"))
+# gzip 压缩级别（1-9）与 brotli 质量（0-11）
+GZIP_LEVEL = int(os.environ.get("API_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("API_BROTLI_QUALITY", "5"))
+# 只有安全方法带 ETag / Cache-Control 且处理 If-None-Match（命中返回 304）；POST 等照常处理、不缓存
+CONDITIONAL_METHODS = ("GET", "HEAD")
+# 服务端偏好顺序（同权重时靠前者优先）；装有 brotli 时才提供 br
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding):
+    """按 Accept-Encoding（含 q 值与 *）选出压缩方式，都不接受时返回 None"""
+    weights = {}
+    for item in (accept_encoding or "").split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights["gzip" if coding == "x-gzip" else coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress_payload(payload, encoding):
+    """一次压缩整个正文（gzip 头部不含时间戳，相同正文输出相同）"""
+    if encoding == "br":
+        return brotli.compress(payload, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(payload) + compressor.flush()
+
+
+def query_params(query):
+    """GET 查询参数转为请求数据：单值为字符串，重复参数为列表，true / false 转为布尔"""
+    params = {}
+    for name, values in parse_qs(query, keep_blank_values=True).items():
+        values = [{"true": True, "false": False}.get(value, value) for value in values]
+        params[name] = values[0] if len(values) == 1 else values
+    return params
+
+
+def encoded_etag(etag, encoding):
+    """压缩后的表示另有 ETag：在引号内追加 -编码（"abc" → "abc-gzip"）"""
+    return f'{etag[:-1]}-{encoding}"'
+
+
+# API_PRELOAD=1 时在冷启动阶段预加载全部服务模块
+if os.environ.get("API_PRELOAD", "").lower() in ("1", "true", "yes"):
+    preload_routes()
+
+
 class handler(BaseHTTPRequestHandler):
     """Vercel Python handler."""
 
@@ -25,6 +232,10 @@ class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         self._handle_request("GET")
 
+    def do_HEAD(self):
+        # 与 GET 相同地分发与生成响应头（含 Content-Length），只是不写正文
+        self._handle_request("HEAD")
+
     def do_POST(self):
         self._handle_request("POST")
 
@@ -58,36 +269,108 @@ class handler(BaseHTTPRequestHandler):
         except Exception:
             return {}
 
-    def _send_json(self, status_code, data):
-        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
-        content_length = 0 if status_code == 204 else len(payload)
+    def _send_json(self, status_code, data, extra_headers=None):
+        has_body = status_code not in (204, 304)
+        payload = RESPONSE_ENCODER.target()(data) if has_body else b""
+        encoding = None
+        if len(payload) >= COMPRESS_MIN_BYTES:
+            encoding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+        if encoding is not None:
+            payload = compress_payload(payload, encoding)
+
         self.send_response(status_code)
-        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if has_body:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization")
-        self.send_header("Content-Length", str(content_length))
+        self.send_header("Vary", "Accept-Encoding")
+        for name, value in (extra_headers or {}).items():
+            if name == "ETag" and encoding is not None:
+                value = encoded_etag(value, encoding)
+            self.send_header(name, value)
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        if has_body:
+            # 204 / 304 不带正文相关的头
+            self.send_header("Content-Length", str(len(payload)))
         self.end_headers()
-        if status_code != 204:
+        if has_body and self.command != "HEAD":
             self.wfile.write(payload)
 
-    def _send_route_result(self, result_json):
-        try:
-            result_data = json.loads(result_json)
-        except Exception as e:
-            self._send_json(500, {"success": False, "error": f"Invalid route response: {e}"})
+    def _send_route_result(self, result):
+        """发送认证 / 同步路由结果：(状态码, 响应体)，只在此处序列化一次"""
+        status, data = result
+        self._send_json(status, data)
+
+    def _send_service_result(self, result):
+        """发送运势类服务结果：code 作状态码，流水线阶段耗时 timings 放入 Server-Timing 头"""
+        status = result.pop("code", 200)
+        timings = result.pop("timings", None)
+        self._send_json(status, result, {"Server-Timing": timings} if timings else None)
+
+    def _matching_etag(self, etag):
+        """
+        If-None-Match 中与 etag 匹配的值（* 匹配任意 ETag，返回 etag 本身），不匹配返回 None
+
+        按 RFC 7232 §3.2 弱比较：去掉 W/ 前缀后比较（代理可能把强 ETag 改为弱 ETag）；
+        压缩后的表示带 -gzip / -br 后缀的 ETag，客户端带回这些值同样命中
+        """
+        if_none_match = self.headers.get("If-None-Match", "")
+        if if_none_match.strip() == "*":
+            return etag
+        variants = {etag} | {encoded_etag(etag, coding) for coding in ("gzip", "br")}
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag in variants:
+                return tag
+        return None
+
+    def _send_cacheable_result(self, result):
+        """
+        发送带 ETag / Cache-Control 的结果（timings 放入 Server-Timing 头）
+
+        只有 GET / HEAD 带缓存校验头，If-None-Match 命中时返回 304 不带正文；
+        POST 等不可被中间层缓存，不带 ETag，Cache-Control 为 no-store
+        """
+        status = result.pop("code", 200)
+        etag = result.pop("etag", None)
+        cache_control = result.pop("cacheControl", None)
+        timings = result.pop("timings", None)
+        headers = {"Server-Timing": timings} if timings else {}
+        if self.command not in CONDITIONAL_METHODS:
+            headers["Cache-Control"] = "no-store"
+            self._send_json(status, result, headers)
             return
-
-        status = result_data.pop("code", 200 if result_data.get("success") else 400)
-        self._send_json(status, result_data)
+        if status not in (200, 304) or not etag:
+            self._send_json(status, result, headers)
+            return
+        headers["ETag"] = etag
+        if cache_control:
+            headers["Cache-Control"] = cache_control
+        matched = self._matching_etag(etag)
+        if matched:
+            self._send_json(304, {}, dict(headers, ETag=matched))
+        else:
+            self._send_json(200, result, headers)
 
     def _handle_request(self, method):
         parsed = urlparse(self.path)
         path = parsed.path
         headers = {k: v for k, v in self.headers.items()}
-        body = self._read_body_json() if method in ("POST", "PUT", "DELETE") else {}
-
-        if path == "/" or path == "/api":
+        if method in ("POST", "PUT", "DELETE"):
+            body = self._read_body_json()
+        else:
+            # GET 以查询参数作为请求数据（运势类结果可被浏览器与 CDN 按 URL 缓存）
+            body = query_params(parsed.query)
+
+        route, remainder = resolve_route(path)
+        if route is None:
+            self._send_json(404, {"success": False, "error": "Not found"})
+            return
+        if route.kind == "root":
             self._send_json(
                 200,
                 {
@@ -99,104 +382,22 @@ class handler(BaseHTTPRequestHandler):
             return
 
         try:
-            if path.startswith("/api/auth") or path.startswith("/api/invite") or path.startswith("/api/user"):
-                from routes.auth_routes import handle_auth_request
-
-                result = handle_auth_request(path, method, body, headers)
-                self._send_route_result(result)
-                return
-
-            if path.startswith("/api/sync"):
-                from routes.sync_routes import handle_sync_request
-
-                result = handle_sync_request(path, method, body, headers)
-                self._send_route_result(result)
-                return
-
-            if path.endswith("/date-picker/recommend"):
-                from services.date_picker_service import DatePickerService
-
-                result = DatePickerService.handle_recommend_request(body)
-                status = result.pop("code", 200)
-                self._send_json(status, result)
-                return
-
-            if path.endswith("/lifemap/trends"):
-                from services.lifemap_service import LifeMapService
-
-                result = LifeMapService.handle_trends_request(body)
+            target = route.target()
+            if route.kind == "route":
+                self._send_route_result(target(path, method, body, headers))
+            elif route.kind == "service":
+                self._send_service_result(target(body))
+            elif route.kind == "conditional":
+                not_modified = self._matching_etag if method in CONDITIONAL_METHODS else None
+                self._send_cacheable_result(target(body, not_modified=not_modified))
+            elif route.kind == "cacheable":
+                self._send_cacheable_result(target(remainder))
+            elif route.kind == "ai_chat":
+                self._handle_ai_chat(target, body)
+            else:
+                result = target(body)
                 status = result.pop("code", 200)
                 self._send_json(status, result)
-                return
-
-            if path.endswith("/fortune"):
-                from services.fortune_service import FortuneService
-
-                result = FortuneService.handle_fortune_request(body)
-                status = result.pop("code", 200)
-                self._send_json(status, result)
-                return
-
-            if path.endswith("/fortune-year"):
-                from services.fortune_service import FortuneService
-
-                result = FortuneService.handle_fortune_year_request(body)
-                status = result.pop("code", 200)
-                self._send_json(status, result)
-                return
-
-            if path.endswith("/fortune-month"):
-                from services.fortune_service import FortuneService
-
-                result = FortuneService.handle_fortune_month_request(body)
-                status = result.pop("code", 200)
-                self._send_json(status, result)
-                return
-
-            if path.endswith("/yijing-divination"):
-                from services.yijing_service import YijingService
-
-                result = YijingService.handle_divination_request(body)
-                status = result.pop("code", 200)
-                self._send_json(status, result)
-                return
-
-            if path.endswith("/hepan"):
-                from services.hepan_service import HepanService
-
-                result = HepanService.handle_hepan_request(body)
-                status = result.pop("code", 200)
-                self._send_json(status, result)
-                return
-
-            if path.endswith("/ai-chat"):
-                from services.ai_service import AIService
-
-                messages = body.get("messages", [])
-                bazi_context = body.get("baziContext") or {}
-                yijing_context = body.get("yijingContext")
-                dream_context = body.get("dreamContext")
-                tarot_context = body.get("tarotContext")
-
-                api_key = os.environ.get("DEEPSEEK_API_KEY")
-                if not api_key:
-                    self._send_json(500, {"success": False, "error": "AI not configured"})
-                    return
-
-                if tarot_context:
-                    system_prompt = AIService.build_tarot_system_prompt(tarot_context)
-                elif dream_context:
-                    system_prompt = AIService.build_dream_system_prompt(dream_context)
-                elif yijing_context:
-                    system_prompt = AIService.build_yijing_system_prompt(yijing_context)
-                else:
-                    system_prompt = AIService.build_bazi_system_prompt(bazi_context)
-                full_messages = [{"role": "system", "content": system_prompt}] + messages
-                ai_message = AIService.call_deepseek_api(api_key, full_messages)
-                self._send_json(200, {"success": True, "message": ai_message})
-                return
-
-            self._send_json(404, {"success": False, "error": "Not found"})
         except Exception as e:
             import traceback
 
@@ -210,3 +411,27 @@ class handler(BaseHTTPRequestHandler):
                     "details": str(e),
                 },
             )
+
+    def _handle_ai_chat(self, ai_service, body):
+        messages = body.get("messages", [])
+        bazi_context = body.get("baziContext") or {}
+        yijing_context = body.get("yijingContext")
+        dream_context = body.get("dreamContext")
+        tarot_context = body.get("tarotContext")
+
+        api_key = os.environ.get("DEEPSEEK_API_KEY")
+        if not api_key:
+            self._send_json(500, {"success": False, "error": "AI not configured"})
+            return
+
+        if tarot_context:
+            system_prompt = ai_service.build_tarot_system_prompt(tarot_context)
+        elif dream_context:
+            system_prompt = ai_service.build_dream_system_prompt(dream_context)
+        elif yijing_context:
+            system_prompt = ai_service.build_yijing_system_prompt(yijing_context)
+        else:
+            system_prompt = ai_service.build_bazi_system_prompt(bazi_context)
+        full_messages = [{"role": "system", "content": system_prompt}] + messages
+        ai_message = ai_service.call_deepseek_api(api_key, full_messages)
+        self._send_json(200, {"success": True, "message": ai_message})
@@ -4,9 +4,9 @@
 适配 Vercel KV 同步操作
 """
 
-import json
 import os
 import sys
+from typing import Tuple
 
 try:
     from ..services.sync_service import SyncService
@@ -19,13 +19,13 @@ except ImportError:
     from services.auth_service import AuthService
 
 
-def make_response(data: dict, code: int = 200) -> str:
-    """创建 JSON 响应字符串"""
-    data['code'] = code
-    return json.dumps(data, ensure_ascii=False)
+def make_response(data: dict, code: int = 200) -> Tuple[int, dict]:
+    """创建响应：(状态码, 响应体)，由入口统一序列化一次"""
+    data.pop('code', None)
+    return code, data
 
 
-def handle_sync_request(path: str, method: str, body: dict = None, headers: dict = None) -> str:
+def handle_sync_request(path: str, method: str, body: dict = None, headers: dict = None) -> Tuple[int, dict]:
     """处理同步相关请求"""
     try:
         return _handle_request(path, method, body, headers)
@@ -36,7 +36,7 @@ def handle_sync_request(path: str, method: str, body: dict = None, headers: dict
         return make_response({'success': False, 'error': 'Internal error'}, 500)
 
 
-def _handle_request(path: str, method: str, body: dict, headers: dict) -> str:
+def _handle_request(path: str, method: str, body: dict, headers: dict) -> Tuple[int, dict]:
     """处理函数"""
     
     user = _get_current_user(headers)
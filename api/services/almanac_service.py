@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+公共黄历服务：与用户无关的当日信息
+年月日三柱及五行、节气、当令五行、冲合、月令神煞。
+内容只取决于日期，请求按天生成并缓存（首个请求只算当天），响应带强 ETag 与长期 Cache-Control；
+整年批量生成只用于导出静态文件。
+"""
+
+import calendar
+import datetime
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+from typing import Dict, Tuple
+
+try:
+    from ..core.lunar import get_current_solar_term, get_pillar_indices
+    from ..core.calendar_table import JIA_ZI
+    from ..core.constants import WU_XING_MAP, WU_XING_SHENG, YUE_LING_WANG, DIZHI_INTERACTIONS
+    from ..core.fortune_engine import calculate_day_shensha
+except ImportError:
+    api_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if api_dir not in sys.path:
+        sys.path.insert(0, api_dir)
+    from core.lunar import get_current_solar_term, get_pillar_indices
+    from core.calendar_table import JIA_ZI
+    from core.constants import WU_XING_MAP, WU_XING_SHENG, YUE_LING_WANG, DIZHI_INTERACTIONS
+    from core.fortune_engine import calculate_day_shensha
+
+
+# 日期内容不变：允许浏览器与 CDN 长期缓存
+ALMANAC_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# 最多缓存的天数（约 8 年）
+ALMANAC_DAY_CACHE_SIZE = 8 * 366
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+
+
+def _pillar(index: int) -> Dict:
+    gan_zhi = JIA_ZI[index]
+    return {
+        "ganZhi": gan_zhi,
+        "gan": gan_zhi[0],
+        "zhi": gan_zhi[1],
+        "ganElement": WU_XING_MAP[gan_zhi[0]],
+        "zhiElement": WU_XING_MAP[gan_zhi[1]],
+    }
+
+
+def build_almanac(day: datetime.date) -> Dict:
+    """单日黄历（年柱按立春换年，月柱按节气）"""
+    year_idx, month_idx, day_idx = get_pillar_indices(day.year, day.month, day.day)
+    term_name, term_index = get_current_solar_term(day)
+    month_zhi = JIA_ZI[month_idx][1]
+    day_gan, day_zhi = JIA_ZI[day_idx]
+    # 旺相：当令五行与其所生五行
+    season_element = YUE_LING_WANG[month_zhi]
+    san_he = next(
+        (element for group, element in DIZHI_INTERACTIONS["san_he"].items() if day_zhi in group), None
+    )
+
+    return {
+        "date": day.strftime("%Y-%m-%d"),
+        "weekday": day.weekday(),
+        "pillars": {
+            "year": _pillar(year_idx),
+            "month": _pillar(month_idx),
+            "day": _pillar(day_idx),
+        },
+        "solarTerm": {"name": term_name, "index": term_index},
+        "seasonElement": season_element,
+        "favorableElements": [season_element, WU_XING_SHENG[season_element]],
+        "dayElement": WU_XING_MAP[day_gan],
+        "clash": DIZHI_INTERACTIONS["liu_chong"][day_zhi],
+        "harmony": DIZHI_INTERACTIONS["liu_he"][day_zhi],
+        "sanHeElement": san_he,
+        "shensha": calculate_day_shensha(month_zhi, day_gan, day_zhi),
+    }
+
+
+def almanac_etag(data: Dict) -> str:
+    """内容摘要作为强 ETag"""
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+@lru_cache(maxsize=ALMANAC_DAY_CACHE_SIZE)
+def get_day_almanac(day: datetime.date) -> Tuple[Dict, str]:
+    """
+    单日黄历与 ETag（LRU 缓存最近 ALMANAC_DAY_CACHE_SIZE 天；黄历为共享对象，调用方不要修改）
+
+    返回:
+        (黄历, ETag)
+    """
+    data = build_almanac(day)
+    return data, almanac_etag(data)
+
+
+def get_year_almanac(year: int) -> Dict[str, Tuple[Dict, str]]:
+    """
+    整年黄历（逐日取自 get_day_almanac，供导出静态文件）
+
+    返回:
+        {日期字符串: (黄历, ETag)}
+    """
+    out = {}
+    for month in range(1, 13):
+        for d in range(1, calendar.monthrange(year, month)[1] + 1):
+            data, etag = get_day_almanac(datetime.date(year, month, d))
+            out[data["date"]] = (data, etag)
+    return out
+
+
+class AlmanacService:
+    @staticmethod
+    def handle_almanac_request(date_str: str) -> Dict:
+        """
+        黄历请求：date_str 为 YYYY-MM-DD
+
+        返回值除 code 外带 etag 与 cacheControl，供入口写入响应头
+        """
+        try:
+            day = datetime.datetime.strptime(date_str or "", "%Y-%m-%d").date()
+        except ValueError:
+            return {"success": False, "error": "日期格式应为 YYYY-MM-DD", "code": 400}
+        if not MIN_YEAR <= day.year <= MAX_YEAR:
+            return {"success": False, "error": f"仅支持 {MIN_YEAR}-{MAX_YEAR} 年", "code": 400}
+
+        try:
+            data, etag = get_day_almanac(day)
+            return {
+                "success": True,
+                "data": data,
+                "code": 200,
+                "etag": etag,
+                "cacheControl": ALMANAC_CACHE_CONTROL,
+            }
+        except Exception as e:
+            import traceback
+
+            return {
+                "success": False,
+                "error": str(e),
+                "traceback": traceback.format_exc(),
+                "code": 500,
+            }
+
+
+def export_year(year: int, out_dir: str) -> str:
+    """把整年黄历写成静态文件 {out_dir}/{year}.json（{日期: 黄历}），返回文件路径"""
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{year}.json")
+    payload = {key: data for key, (data, _) in get_year_almanac(year).items()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    return path
+
+
+if __name__ == "__main__":
+    # 预生成：python -m api.services.almanac_service 2026 [输出目录]
+    target_year = int(sys.argv[1]) if len(sys.argv) > 1 else datetime.date.today().year
+    target_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "almanac"
+    )
+    print(export_year(target_year, target_dir))
@@ -5,17 +5,20 @@
 """
 
 import datetime
+import heapq
 import os
 import sys
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 try:
-    from .fortune_service import FortuneService
+    from .fortune_pipeline import FortunePipeline, date_pillar_indices
+    from ..core.fortune_engine import generate_main_theme
 except ImportError:
     api_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     if api_dir not in sys.path:
         sys.path.insert(0, api_dir)
-    from services.fortune_service import FortuneService
+    from services.fortune_pipeline import FortunePipeline, date_pillar_indices
+    from core.fortune_engine import generate_main_theme
 
 
 PURPOSE_DIMENSION = {
@@ -39,25 +42,59 @@ PURPOSE_WEIGHTS: Dict[str, Dict[str, float]] = {
 }
 
 
+# 扫描区间上限（天）：婚嫁、开业等场景需要一到两年的窗口
+MAX_RANGE_DAYS = 730
+# 不超过该天数时默认返回完整时间线（兼容旧前端），更长区间默认紧凑时间线
+FULL_TIMELINE_MAX_DAYS = 60
+# 时间线模式：full 完整候选、compact 仅日期与分数、none 不返回
+TIMELINE_MODES = ("full", "compact", "none")
+# 每段批量评分的天数
+SCAN_CHUNK_DAYS = 64
+# 多人合择：最多人数与聚合方式（min 取最低、mean 平均、weighted 按 weight 加权平均）
+MAX_JOINT_PROFILES = 6
+JOINT_AGGREGATES = ("min", "mean", "weighted")
+
+
 class DatePickerService:
     @staticmethod
     def handle_recommend_request(data: Dict) -> Dict:
-        """计算择日推荐结果"""
-        try:
-            birth_date_str = data.get("birthDate")
-            if not birth_date_str:
-                return {"success": False, "error": "出生日期必填", "code": 400}
+        """
+        计算择日推荐结果
 
-            birth_time_str = data.get("birthTime", "12:00")
-            longitude = float(data.get("longitude", 120.0))
-            gender = data.get("gender", "male")
-            custom_yongshen = data.get("customYongShen")
+        单人：顶层 birthDate 等出生信息；多人合择：profiles 列表（每项同单人出生信息，可带 weight），
+        aggregate 指定聚合方式
+        """
+        try:
+            profiles = data.get("profiles")
+            if isinstance(profiles, list) and profiles:
+                if len(profiles) > MAX_JOINT_PROFILES:
+                    return {"success": False, "error": f"最多支持 {MAX_JOINT_PROFILES} 人合择", "code": 400}
+                weights = []
+                for i, profile in enumerate(profiles):
+                    if not isinstance(profile, dict) or not profile.get("birthDate"):
+                        return {"success": False, "error": f"第 {i + 1} 人出生日期必填", "code": 400}
+                    weight = DatePickerService._safe_float(profile.get("weight", 1.0), 1.0)
+                    if weight <= 0:
+                        return {"success": False, "error": f"第 {i + 1} 人权重必须为正数", "code": 400}
+                    weights.append(weight)
+                # 每人一条流水线：排盘、分析各算一次
+                pipelines = [FortunePipeline.from_request(profile) for profile in profiles]
+            else:
+                if not data.get("birthDate"):
+                    return {"success": False, "error": "出生日期必填", "code": 400}
+                pipelines = [FortunePipeline.from_request(data)]
+                weights = [1.0]
+            joint = len(pipelines) > 1
+
+            aggregate = str(data.get("aggregate", "min") or "min")
+            if aggregate not in JOINT_AGGREGATES:
+                aggregate = "min"
 
             purpose = str(data.get("purpose", "other") or "other")
             if purpose not in PURPOSE_DIMENSION:
                 purpose = "other"
 
-            range_days = DatePickerService._clamp_int(data.get("rangeDays", 14), 3, 60, 14)
+            range_days = DatePickerService._clamp_int(data.get("rangeDays", 14), 3, MAX_RANGE_DAYS, 14)
             top_n = DatePickerService._clamp_int(data.get("topN", 10), 3, 20, 10)
             weekend_policy = str(data.get("weekendPolicy", "all") or "all")
             if weekend_policy not in ("all", "weekend_only", "workday_only"):
@@ -67,17 +104,13 @@ class DatePickerService:
             excluded_set = {str(v) for v in excluded_dates if isinstance(v, str)}
 
             start_date = DatePickerService._parse_start_date(data.get("startDate"))
-            base_payload = {
-                "birthDate": birth_date_str,
-                "birthTime": birth_time_str,
-                "longitude": longitude,
-                "gender": gender,
-                "customYongShen": custom_yongshen,
-            }
+            timeline_mode = str(data.get("timelineMode") or "")
+            if timeline_mode not in TIMELINE_MODES:
+                # 兼容旧前端：短区间默认返回完整时间线，长区间默认紧凑时间线
+                timeline_mode = "full" if range_days <= FULL_TIMELINE_MAX_DAYS else "compact"
 
-            candidates = []
+            scan_dates = []
             skipped_days = 0
-            failed_days = 0
 
             for offset in range(range_days):
                 date_obj = start_date + datetime.timedelta(days=offset)
@@ -96,53 +129,86 @@ class DatePickerService:
                     skipped_days += 1
                     continue
 
-                request_payload = dict(base_payload)
-                request_payload["date"] = date_str
-
-                fortune_result = FortuneService.handle_fortune_request(request_payload)
-                if not fortune_result.get("success") or "data" not in fortune_result:
-                    failed_days += 1
-                    continue
-
-                candidate = DatePickerService._build_candidate(date_obj, purpose, fortune_result["data"])
-                candidates.append(candidate)
+                scan_dates.append(date_obj)
 
-            if not candidates:
+            if not scan_dates:
                 return {
                     "success": False,
                     "error": "未生成可用日期，请调整筛选条件后重试",
                     "code": 400,
                 }
 
-            ranked = sorted(
-                candidates,
-                key=lambda x: (
-                    -x["purposeScore"],
-                    -x["totalScore"],
-                    x["riskWeight"],
-                    x["date"],
-                ),
-            )
-            recommendations = ranked[:top_n]
-            timeline = sorted(candidates, key=lambda x: x["date"])
-
-            summary = DatePickerService._build_summary(timeline, recommendations, failed_days)
+            # 流式扫描：只保留 topN 小顶堆、汇总统计与（可选）时间线，不物化全部候选
+            # 合择时主题无法对应单人日主，不生成
+            day_gan = None if joint else pipelines[0].bazi["day_gan"]
+            heap: List[Tuple] = []
+            timeline: List[Dict] = []
+            stats = _ScanStats(len(scan_dates))
+
+            for start in range(0, len(scan_dates), SCAN_CHUNK_DAYS):
+                chunk = scan_dates[start:start + SCAN_CHUNK_DAYS]
+                # 流年、流月、流日每个日期只算一次，各命盘共用
+                indices = date_pillar_indices(chunk)
+                member_scores = [pipeline.score_range(chunk, indices) for pipeline in pipelines]
+                for i in range(len(chunk)):
+                    if joint:
+                        evaluated = DatePickerService._evaluate_joint_day(
+                            purpose, [scores[i] for scores in member_scores], aggregate, weights
+                        )
+                    else:
+                        evaluated = DatePickerService._evaluate_day(purpose, member_scores[0][i])
+                    day_score = evaluated["day"]
+                    stats.add(evaluated)
+
+                    if timeline_mode == "full":
+                        timeline.append(DatePickerService._build_candidate(purpose, evaluated, day_gan))
+                    elif timeline_mode == "compact":
+                        timeline.append(DatePickerService._build_compact_entry(evaluated))
+
+                    # 排序键越大越好：用途分、总分高，风险低，日期早
+                    rank_key = (
+                        evaluated["purposeScore"],
+                        evaluated["totalScore"],
+                        -evaluated["riskWeight"],
+                        -day_score["date"].toordinal(),
+                    )
+                    if len(heap) < top_n:
+                        heapq.heappush(heap, (rank_key, evaluated))
+                    elif rank_key > heap[0][0]:
+                        heapq.heapreplace(heap, (rank_key, evaluated))
+
+            recommendations = [
+                DatePickerService._build_candidate(purpose, evaluated, day_gan)
+                for _, evaluated in sorted(heap, key=lambda item: item[0], reverse=True)
+            ]
+
+            summary = stats.build(recommendations)
+
+            result_data = {
+                "purpose": purpose,
+                "startDate": start_date.strftime("%Y-%m-%d"),
+                "rangeDays": range_days,
+                "scannedDays": stats.count,
+                "skippedDays": skipped_days,
+                # 批量评分不会逐日失败，恒为 0；保留该键兼容读取它的前端
+                "failedDays": 0,
+                "recommendedCount": len(recommendations),
+                "recommendations": recommendations,
+                "timeline": timeline,
+                "summary": summary,
+            }
+            if joint:
+                result_data.update({
+                    "mode": "joint",
+                    "aggregate": aggregate,
+                    "profileCount": len(pipelines),
+                })
 
             return {
                 "success": True,
-                "data": {
-                    "purpose": purpose,
-                    "startDate": start_date.strftime("%Y-%m-%d"),
-                    "rangeDays": range_days,
-                    "scannedDays": len(candidates),
-                    "skippedDays": skipped_days,
-                    "failedDays": failed_days,
-                    "recommendedCount": len(recommendations),
-                    "recommendations": recommendations,
-                    "timeline": timeline,
-                    "summary": summary,
-                },
+                "data": result_data,
                 "code": 200,
+                "timings": ", ".join(p.server_timing() for p in pipelines),
             }
         except Exception as e:
             import traceback
@@ -163,6 +229,13 @@ class DatePickerService:
                 pass
         return datetime.date.today()
 
+    @staticmethod
+    def _safe_float(value, default_v: float) -> float:
+        try:
+            return float(value)
+        except Exception:
+            return default_v
+
     @staticmethod
     def _clamp_int(value, min_v: int, max_v: int, default_v: int) -> int:
         try:
@@ -172,10 +245,11 @@ class DatePickerService:
             return default_v
 
     @staticmethod
-    def _build_candidate(date_obj: datetime.date, purpose: str, fortune_data: Dict) -> Dict:
-        fortune = fortune_data.get("fortune", {})
-        dimensions = DatePickerService._extract_dimension_scores(fortune.get("dimensions", {}))
-        total_score = int(fortune.get("totalScore", 50))
+    def _evaluate_day(purpose: str, day_score: Dict) -> Dict:
+        """由 FortunePipeline.score_range 的单日结果计算用途分、风险与置信度（排序与统计所需的最小字段）"""
+        date_obj = day_score["date"]
+        dimensions = DatePickerService._extract_dimension_scores(day_score["dimensions"])
+        total_score = int(day_score["totalScore"])
         purpose_score = DatePickerService._calculate_purpose_score(purpose, total_score, dimensions)
         risk_level, risk_weight, risk_flags = DatePickerService._analyze_risk(
             purpose=purpose,
@@ -185,35 +259,120 @@ class DatePickerService:
             dimensions=dimensions,
         )
         confidence = max(35, min(99, int(purpose_score - risk_weight * 8 + (total_score - 60) * 0.2)))
-        highlights, cautions = DatePickerService._build_explanations(dimensions)
-        best_time_window = DatePickerService._suggest_time_window(purpose, date_obj.weekday(), purpose_score)
-
-        liu_ri = fortune.get("liuRi", {}) or {}
-        liu_nian = fortune.get("liuNian", {}) or {}
-        liu_yue = fortune.get("liuYue", {}) or {}
-
-        tags = DatePickerService._build_tags(purpose_score, total_score, risk_level)
-
         return {
             "date": date_obj.strftime("%Y-%m-%d"),
-            "weekday": date_obj.weekday(),
             "totalScore": total_score,
             "purposeScore": purpose_score,
             "confidence": confidence,
             "riskLevel": risk_level,
             "riskWeight": risk_weight,
             "riskFlags": risk_flags,
+            "dimensions": dimensions,
+            "day": day_score,
+        }
+
+    @staticmethod
+    def _evaluate_joint_day(purpose: str, day_scores: List[Dict], aggregate: str, weights: List[float]) -> Dict:
+        """
+        多人合择的单日评估：每人先按 PURPOSE_WEIGHTS 算用途分，总分、六维、用途分再按 aggregate 聚合，
+        风险与置信度按聚合后的分数评估（同单人的 _analyze_risk）
+        """
+        members = [DatePickerService._evaluate_day(purpose, day_score) for day_score in day_scores]
+        date_obj = day_scores[0]["date"]
+
+        def combine(values: List[int]) -> int:
+            return DatePickerService._aggregate_scores(values, aggregate, weights)
+
+        total_score = combine([m["totalScore"] for m in members])
+        purpose_score = combine([m["purposeScore"] for m in members])
+        dimensions = {key: combine([m["dimensions"][key] for m in members]) for key in members[0]["dimensions"]}
+        risk_level, risk_weight, risk_flags = DatePickerService._analyze_risk(
+            purpose=purpose,
+            date_obj=date_obj,
+            total_score=total_score,
+            purpose_score=purpose_score,
+            dimensions=dimensions,
+        )
+        confidence = max(35, min(99, int(purpose_score - risk_weight * 8 + (total_score - 60) * 0.2)))
+        return {
+            "date": members[0]["date"],
+            "totalScore": total_score,
+            "purposeScore": purpose_score,
+            "confidence": confidence,
+            "riskLevel": risk_level,
+            "riskWeight": risk_weight,
+            "riskFlags": risk_flags,
+            "dimensions": dimensions,
+            # 流年流月流日与日期相关，各人相同
+            "day": day_scores[0],
+            "members": [
+                {
+                    "index": i,
+                    "totalScore": m["totalScore"],
+                    "purposeScore": m["purposeScore"],
+                    "riskLevel": m["riskLevel"],
+                }
+                for i, m in enumerate(members)
+            ],
+        }
+
+    @staticmethod
+    def _aggregate_scores(values: List[int], aggregate: str, weights: List[float]) -> int:
+        """按 min / mean / weighted 聚合多人分数"""
+        if aggregate == "min":
+            return min(values)
+        if aggregate == "weighted":
+            return int(round(sum(v * w for v, w in zip(values, weights)) / sum(weights)))
+        return int(round(sum(values) / len(values)))
+
+    @staticmethod
+    def _build_candidate(purpose: str, evaluated: Dict, day_gan: Optional[str]) -> Dict:
+        """构建完整候选日（主题按总分与流日天干生成，同日运；合择时 day_gan 为 None，不生成主题，附各人分数）"""
+        day_score = evaluated["day"]
+        date_obj = day_score["date"]
+        total_score = evaluated["totalScore"]
+        purpose_score = evaluated["purposeScore"]
+        dimensions = evaluated["dimensions"]
+        highlights, cautions = DatePickerService._build_explanations(dimensions)
+        best_time_window = DatePickerService._suggest_time_window(purpose, date_obj.weekday(), purpose_score)
+        tags = DatePickerService._build_tags(purpose_score, total_score, evaluated["riskLevel"])
+
+        candidate = {
+            "date": evaluated["date"],
+            "weekday": date_obj.weekday(),
+            "totalScore": total_score,
+            "purposeScore": purpose_score,
+            "confidence": evaluated["confidence"],
+            "riskLevel": evaluated["riskLevel"],
+            "riskWeight": evaluated["riskWeight"],
+            "riskFlags": evaluated["riskFlags"],
             "bestTimeWindow": best_time_window,
-            "mainTheme": fortune.get("mainTheme", {}),
+        }
+        if day_gan is not None:
+            candidate["mainTheme"] = generate_main_theme(total_score, day_gan, day_score["liuRi"][0])
+        candidate.update({
             "dimensions": dimensions,
             "highlights": highlights,
             "cautions": cautions,
             "tags": tags,
             "liu": {
-                "nian": f"{liu_nian.get('gan', '')}{liu_nian.get('zhi', '')}",
-                "yue": f"{liu_yue.get('gan', '')}{liu_yue.get('zhi', '')}",
-                "ri": f"{liu_ri.get('gan', '')}{liu_ri.get('zhi', '')}",
+                "nian": day_score["liuNian"],
+                "yue": day_score["liuYue"],
+                "ri": day_score["liuRi"],
             },
+        })
+        if "members" in evaluated:
+            candidate["members"] = evaluated["members"]
+        return candidate
+
+    @staticmethod
+    def _build_compact_entry(evaluated: Dict) -> Dict:
+        """紧凑时间线条目：只含日期、分数与风险等级"""
+        return {
+            "date": evaluated["date"],
+            "totalScore": evaluated["totalScore"],
+            "purposeScore": evaluated["purposeScore"],
+            "riskLevel": evaluated["riskLevel"],
         }
 
     @staticmethod
@@ -327,16 +486,38 @@ class DatePickerService:
             tags.append("均衡可用")
         return tags[:3]
 
-    @staticmethod
-    def _build_summary(timeline: List[Dict], recommendations: List[Dict], failed_days: int) -> Dict:
-        ordered = sorted(timeline, key=lambda x: x["date"])
-        best = recommendations[0]
-        worst = min(timeline, key=lambda x: x["purposeScore"])
-        first_half = ordered[: max(1, len(ordered) // 2)]
-        second_half = ordered[len(ordered) // 2 :]
 
-        first_avg = sum(x["purposeScore"] for x in first_half) / len(first_half)
-        second_avg = sum(x["purposeScore"] for x in second_half) / max(1, len(second_half))
+class _ScanStats:
+    """扫描过程中的汇总统计（按日期顺序逐日累加，结果与对完整时间线统计相同）"""
+
+    def __init__(self, total_days: int):
+        self.total_days = total_days
+        self.count = 0
+        # 前半段 [0, max(1, n//2))，后半段 [n//2, n)；只有 1 天时两段都包含它
+        self.first_end = max(1, total_days // 2)
+        self.second_start = total_days // 2
+        self.first_sum = 0
+        self.second_sum = 0
+        self.confidence_sum = 0
+        self.worst = None
+
+    def add(self, evaluated: Dict) -> None:
+        index = self.count
+        self.count += 1
+        score = evaluated["purposeScore"]
+        if index < self.first_end:
+            self.first_sum += score
+        if index >= self.second_start:
+            self.second_sum += score
+        self.confidence_sum += evaluated["confidence"]
+        # 同分取最早的日期
+        if self.worst is None or score < self.worst["purposeScore"]:
+            self.worst = evaluated
+
+    def build(self, recommendations: List[Dict]) -> Dict:
+        best = recommendations[0]
+        first_avg = self.first_sum / min(self.first_end, self.count)
+        second_avg = self.second_sum / max(1, self.count - self.second_start)
         if second_avg > first_avg + 4:
             trend = "rising"
         elif first_avg > second_avg + 4:
@@ -344,14 +525,15 @@ class DatePickerService:
         else:
             trend = "stable"
 
-        avg_conf = int(sum(x["confidence"] for x in timeline) / max(1, len(timeline)))
+        avg_conf = int(self.confidence_sum / max(1, self.count))
 
         return {
             "bestDate": best["date"],
             "bestScore": best["purposeScore"],
-            "worstDate": worst["date"],
-            "worstScore": worst["purposeScore"],
+            "worstDate": self.worst["date"],
+            "worstScore": self.worst["purposeScore"],
             "trend": trend,
             "averageConfidence": avg_conf,
-            "failedDays": failed_days,
+            # 兼容旧响应结构，恒为 0
+            "failedDays": 0,
         }
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+单次请求的运势计算流水线
+把出生信息解析、排盘、八字分析、流年流月流日、大运各阶段按需计算并记住结果，
+日运、月运、年运、择日、人生大图景共用同一个流水线对象，同一请求内任何阶段只算一次，
+各阶段累计耗时可通过 Server-Timing 响应头输出。
+"""
+
+import datetime
+import time
+
+try:
+    from ..core.lunar import (
+        calculate_bazi, calculate_liu_nian, calculate_liu_yue, calculate_liu_ri, calculate_dayun,
+        get_pillar_indices, get_solar_term_for_year
+    )
+    from ..core.calendar_table import JIA_ZI, year_index_for
+    from ..core.bazi_engine import analyze_bazi_for_chart, _create_custom_yongshen
+    from ..core.fortune_engine import (
+        DIMENSION_KEYS, calculate_fortune_score_v5_batch, calculate_fortune_score_year_batch,
+        calculate_dimension_scores_v5_batch, calculate_shichen_scores_v5
+    )
+    from ..utils.date_utils import parse_datetime
+except ImportError:
+    import os
+    import sys
+    api_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if api_dir not in sys.path:
+        sys.path.insert(0, api_dir)
+    from core.lunar import (
+        calculate_bazi, calculate_liu_nian, calculate_liu_yue, calculate_liu_ri, calculate_dayun,
+        get_pillar_indices, get_solar_term_for_year
+    )
+    from core.calendar_table import JIA_ZI, year_index_for
+    from core.bazi_engine import analyze_bazi_for_chart, _create_custom_yongshen
+    from core.fortune_engine import (
+        DIMENSION_KEYS, calculate_fortune_score_v5_batch, calculate_fortune_score_year_batch,
+        calculate_dimension_scores_v5_batch, calculate_shichen_scores_v5
+    )
+    from utils.date_utils import parse_datetime
+
+
+# 中文旺衰等级 → 评分用的英文格局
+LEVEL_TO_PATTERN = {'身弱': 'Weak', '身旺': 'Strong', '中和': 'Neutral'}
+
+
+def date_pillar_indices(dates):
+    """
+    一组日期的流年、流月、流日六十甲子序号（流年按公历年取，同 calculate_liu_nian；流月、流日查干支表）
+
+    返回:
+        (年序号列表, 月序号列表, 日序号列表)
+    """
+    year_indices, month_indices, day_indices = [], [], []
+    for d in dates:
+        _, month_idx, day_idx = get_pillar_indices(d.year, d.month, d.day)
+        year_indices.append(year_index_for(d.year))
+        month_indices.append(month_idx)
+        day_indices.append(day_idx)
+    return year_indices, month_indices, day_indices
+
+
+class FortunePipeline:
+    """
+    请求级运势流水线
+
+    阶段：birth_dt → bazi → analysis → element_analysis，以及按日期的 date_context、按年的 dayun。
+    每个阶段首次访问时计算并缓存，耗时按阶段名累计到 timings（毫秒）。
+    """
+
+    def __init__(self, birth_date_str, birth_time_str='12:00', longitude=120.0,
+                 gender='male', custom_yongshen=None):
+        self.birth_date_str = birth_date_str
+        self.birth_time_str = birth_time_str
+        self.longitude = longitude
+        self.gender = gender
+        self.custom_yongshen = custom_yongshen
+        self.timings = {}
+        self._memo = {}
+
+    @classmethod
+    def from_request(cls, data):
+        """按请求参数创建（字段与默认值同各运势接口）"""
+        return cls(
+            data.get('birthDate'),
+            data.get('birthTime', '12:00'),
+            float(data.get('longitude', 120.0)),
+            data.get('gender', 'male'),
+            data.get('customYongShen'),
+        )
+
+    def _stage(self, key, compute):
+        """
+        取阶段结果：未算过则计算、记录耗时并缓存（key 为元组，首项是阶段名）
+
+        依赖的上游阶段由调用方先取好，耗时不会重复计入下游阶段
+        """
+        if key in self._memo:
+            return self._memo[key]
+        value = self._timed(key[0], compute)
+        self._memo[key] = value
+        return value
+
+    def _timed(self, name, compute):
+        """计算并把耗时累计到阶段 name（不缓存结果）"""
+        start = time.perf_counter()
+        value = compute()
+        elapsed = (time.perf_counter() - start) * 1000
+        self.timings[name] = self.timings.get(name, 0.0) + elapsed
+        return value
+
+    @property
+    def birth_dt(self):
+        """出生时间"""
+        return self._stage(('parse',), lambda: parse_datetime(self.birth_date_str, self.birth_time_str))
+
+    @property
+    def bazi(self):
+        """命盘四柱"""
+        birth_dt = self.birth_dt
+        return self._stage(('bazi',), lambda: calculate_bazi(birth_dt, self.longitude))
+
+    @property
+    def analysis(self):
+        """八字分析 {'strength_result', 'yong_shen_result'}，已套用用户自定义用神"""
+        bazi = self.bazi
+
+        def compute():
+            analysis_result = analyze_bazi_for_chart(bazi)
+            if self.custom_yongshen:
+                analysis_result['yong_shen_result'] = _create_custom_yongshen(self.custom_yongshen, bazi)
+            return analysis_result
+        return self._stage(('analysis',), compute)
+
+    @property
+    def yongshen(self):
+        """用神喜忌"""
+        return self.analysis.get('yong_shen_result', {})
+
+    @property
+    def element_analysis(self):
+        """评分用的元素分析：中文旺衰等级映射为英文格局"""
+        analysis = self.analysis
+
+        def compute():
+            strength_result = analysis.get('strength_result', {})
+            level = strength_result.get('level', '中和')
+            return {
+                'pattern': LEVEL_TO_PATTERN.get(level, 'Neutral'),
+                'score': strength_result.get('score', 0.5),
+                'level': level  # 保留中文 level 供其他用途
+            }
+        return self._stage(('element_analysis',), compute)
+
+    def date_context(self, target_dt):
+        """
+        目标日期的流年、流月、流日（干支查干支表，字典在本请求内共用）
+
+        返回:
+            (liu_nian, liu_yue, liu_ri)
+        """
+        year, month, day = target_dt.year, target_dt.month, target_dt.day
+        return self._stage(('date_context', year, month, day), lambda: (
+            calculate_liu_nian(year),
+            calculate_liu_yue(year, month, day),
+            calculate_liu_ri(year, month, day),
+        ))
+
+    def dayun(self, year):
+        """目标公历年所在的大运"""
+        birth_dt = self.birth_dt
+        return self._stage(('dayun', year),
+                           lambda: calculate_dayun(birth_dt, year, self.gender, self.longitude))
+
+    def score_range(self, dates, indices=None):
+        """
+        批量评分：一次命盘准备后，对一组日期只算总分与六维分数（不生成主题、宜忌等文案）
+
+        总分、六维与逐日走 handle_fortune_request 的结果相同
+
+        参数:
+            dates: date/datetime 序列
+            indices: date_pillar_indices(dates) 的结果；多张命盘评同一组日期时可先算好共用
+
+        返回:
+            与 dates 等长的列表，每项 {'date', 'totalScore', 'dimensions': {维度: 分数},
+            'liuNian', 'liuYue', 'liuRi'（干支字符串）}
+        """
+        bazi = self.bazi
+        yongshen = self.yongshen
+        element_analysis = self.element_analysis
+        dayuns = [self.dayun(d.year) for d in dates]
+
+        def compute():
+            year_indices, month_indices, day_indices = indices or date_pillar_indices(dates)
+            totals = calculate_fortune_score_v5_batch(
+                bazi, element_analysis, yongshen,
+                year_indices, month_indices, day_indices, dayun=dayuns
+            )
+            totals = [int(t) for t in totals]
+            columns = calculate_dimension_scores_v5_batch(bazi, day_indices, totals)
+
+            results = []
+            for i, d in enumerate(dates):
+                results.append({
+                    'date': d,
+                    'totalScore': totals[i],
+                    'dimensions': {key: columns[key][i] for key in DIMENSION_KEYS},
+                    'liuNian': JIA_ZI[year_indices[i]],
+                    'liuYue': JIA_ZI[month_indices[i]],
+                    'liuRi': JIA_ZI[day_indices[i]],
+                })
+            return results
+
+        # 批量结果不入缓存（日期组合各异），只累计耗时
+        return self._timed('score_range', compute)
+
+    def score_years(self, years):
+        """
+        批量年运评分：一次命盘准备与大运时间轴后，逐年只查表（代表日取立春，同 handle_fortune_year_request）
+
+        总分、六维与逐年走 handle_fortune_year_request 的结果相同
+
+        返回:
+            与 years 等长的列表，每项 {'year', 'totalScore', 'dimensions': {维度: 分数}, 'liuNian'（干支字符串），
+            'dayun'（大运干支；起运前或超出大运时间轴的年份为 None，评分不含大运）}
+        """
+        bazi = self.bazi
+        yongshen = self.yongshen
+        element_analysis = self.element_analysis
+        dayuns = [self.dayun(year) for year in years]
+
+        def compute():
+            lichun_dates = [datetime.date(year, *get_solar_term_for_year(year, 2)) for year in years]
+            year_indices, month_indices, day_indices = date_pillar_indices(lichun_dates)
+            totals = calculate_fortune_score_year_batch(
+                bazi, element_analysis, yongshen, year_indices, month_indices, dayun=dayuns
+            )
+            # 年运维度不计神煞（与 handle_fortune_year_request 传入空神煞结果一致）
+            columns = calculate_dimension_scores_v5_batch(bazi, day_indices, totals, shensha=False)
+            return [
+                {
+                    'year': year,
+                    'totalScore': totals[i],
+                    'dimensions': {key: columns[key][i] for key in DIMENSION_KEYS},
+                    'liuNian': JIA_ZI[year_indices[i]],
+                    'dayun': dayuns[i]['gan_zhi'] if dayuns[i] else None,
+                }
+                for i, year in enumerate(years)
+            ]
+
+        return self._timed('score_years', compute)
+
+    def score_shichen(self, target_date):
+        """
+        目标日期十二时辰评分：日级分量算一次，各时辰只查时柱（见 calculate_shichen_scores_v5）
+
+        返回:
+            12 项列表（子时起），每项 {'zhi', 'ganZhi', 'timeRange', 'score', 'level'}
+        """
+        bazi = self.bazi
+        yongshen = self.yongshen
+        element_analysis = self.element_analysis
+        dayun = self.dayun(target_date.year)
+
+        def compute():
+            (year_idx,), (month_idx,), (day_idx,) = date_pillar_indices([target_date])
+            return calculate_shichen_scores_v5(
+                bazi, element_analysis, yongshen, year_idx, month_idx, day_idx, dayun=dayun
+            )
+
+        return self._timed('score_shichen', compute)
+
+    def server_timing(self):
+        """各阶段累计耗时，Server-Timing 响应头格式"""
+        return ', '.join(f"{name};dur={ms:.2f}" for name, ms in self.timings.items())
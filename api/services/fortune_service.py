@@ -5,175 +5,254 @@
 """
 
 import datetime
+import hashlib
+import json
 import os
 import sys
 
 # 处理相对导入问题（Vercel 环境兼容）
 try:
-    from ..core.lunar import (
-        calculate_bazi, calculate_liu_nian, calculate_liu_yue, calculate_liu_ri,
-        get_day_gan_zhi, get_hour_gan_zhi, calculate_dayun, get_solar_term_for_year
-    )
-    from ..core.bazi_engine import analyze_bazi_cached, calculate_ten_god
+    from ..core.lunar import get_solar_term_for_year
+    from .fortune_pipeline import FortunePipeline
     from ..core.fortune_engine import (
         calculate_fortune_score_v5, calculate_fortune_score_year,
-        calculate_fortune_score_month,
+        calculate_fortune_score_month, DIMENSION_KEYS, ENGINE_VERSION,
         calculate_dimensions_v5, generate_main_theme, generate_todo
     )
-    from ..utils.json_utils import clean_for_json
 except ImportError:
     # Vercel 部署时的备用导入方式
     api_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     if api_dir not in sys.path:
         sys.path.insert(0, api_dir)
-    from core.lunar import (
-        calculate_bazi, calculate_liu_nian, calculate_liu_yue, calculate_liu_ri,
-        get_day_gan_zhi, get_hour_gan_zhi, calculate_dayun, get_solar_term_for_year
-    )
-    from core.bazi_engine import analyze_bazi_cached, calculate_ten_god
+    from core.lunar import get_solar_term_for_year
+    from services.fortune_pipeline import FortunePipeline
     from core.fortune_engine import (
         calculate_fortune_score_v5, calculate_fortune_score_year,
-        calculate_fortune_score_month,
+        calculate_fortune_score_month, DIMENSION_KEYS, ENGINE_VERSION,
         calculate_dimensions_v5, generate_main_theme, generate_todo
     )
-    from utils.json_utils import clean_for_json
+
+# 日运 fields 可选字段：bazi、analysis 在 data 下，其余在 data.fortune 下
+# （dimensions 为带等级、标签、推论文案的完整维度；dimensionScores 只含分数，需显式请求）
+FORTUNE_FIELDS = (
+    'bazi', 'analysis', 'totalScore', 'dimensions', 'dimensionScores',
+    'mainTheme', 'todoList', 'liuNian', 'liuYue', 'liuRi',
+)
+# data.fortune 的键顺序
+FORTUNE_RESPONSE_ORDER = (
+    'totalScore', 'dimensions', 'dimensionScores', 'mainTheme', 'todoList', 'liuNian', 'liuYue', 'liuRi',
+)
+
+# 指定了日期（年、月）的结果不随时间变化，可缓存一天；
+# 缺省时按服务器当天计算，每次回源验证（ETag 跨日变化）
+FORTUNE_CACHE_CONTROL = "public, max-age=86400"
+FORTUNE_CACHE_CONTROL_TODAY = "no-cache"
+
+
+def parse_fields(raw):
+    """
+    解析 fields 参数
+
+    返回:
+        字段名集合；未传或为空时返回 None（表示全部字段）
+    """
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        raw = raw.split(',')
+    names = {str(name).strip() for name in raw} - {''}
+    return names or None
+
+
+def parse_flag(value):
+    """布尔参数：JSON 布尔与查询串 / 表单中的 true、1、yes 为真，false、0、空串等为假"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes', 'on')
+    return bool(value)
+
+
+def resolve_target_date(raw):
+    """
+    解析目标日期参数（YYYY-MM-DD）
+
+    返回:
+        (date, implicit)：未传或无法解析时取服务器当天，implicit 为真
+    """
+    if raw:
+        try:
+            return datetime.datetime.strptime(str(raw), '%Y-%m-%d').date(), False
+        except ValueError:
+            pass
+    return datetime.date.today(), True
+
+
+def _canonical_yongshen(custom_yongshen):
+    """自定义用神的规范形式：与 _create_custom_yongshen 相同地只保留五行，无有效值时为 None"""
+    if isinstance(custom_yongshen, str):
+        custom_yongshen = [custom_yongshen]
+    if not isinstance(custom_yongshen, list):
+        return None
+    elements = [y for y in custom_yongshen if y in ('木', '火', '土', '金', '水')]
+    return elements or None
+
+
+def cache_validators(endpoint, pipeline, target, implicit=False, options=None):
+    """
+    由规范化输入与 ENGINE_VERSION 生成强 ETag 与 Cache-Control（不运行流水线）
+
+    摘要只取流水线实际使用的、已解析并补齐默认值的输入（出生时间、经度、性别、有效的自定义用神），
+    缺省与显式默认值、120 与 120.0 等写法得到相同 ETag，请求中的其他键不参与。
+
+    参数:
+        endpoint: 接口名，不同接口的 ETag 互不相同
+        pipeline: 本次请求的 FortunePipeline
+        target: 已解析的目标日期 / 年 / 年月（可 JSON 序列化）
+        implicit: 目标取自服务器当天（缺省参数）时为真，改为每次回源验证
+        options: 影响输出的其他已规范化参数（如字段集合）
+
+    返回:
+        {'etag': ..., 'cacheControl': ...}
+    """
+    canonical = json.dumps(
+        [endpoint, ENGINE_VERSION, pipeline.birth_dt.isoformat(), float(pipeline.longitude), pipeline.gender,
+         _canonical_yongshen(pipeline.custom_yongshen), target, options],
+        ensure_ascii=False, separators=(',', ':'), default=str,
+    )
+    return {
+        'etag': '"' + hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32] + '"',
+        'cacheControl': FORTUNE_CACHE_CONTROL_TODAY if implicit else FORTUNE_CACHE_CONTROL,
+    }
+
 
 class FortuneService:
     @staticmethod
-    def handle_fortune_request(data):
-        """处理运势分析请求的完整业务流程"""
+    def handle_fortune_request(data, not_modified=None):
+        """
+        处理运势分析请求的完整业务流程
+
+        参数:
+            data: 请求参数；fields（列表或逗号分隔字符串，取值见 FORTUNE_FIELDS）只返回所列字段，
+                未请求的阶段（宜忌、主题、维度文案、分析序列化）不执行；不传返回全部
+            not_modified: 可选回调，参数为本次结果的 ETag，返回真表示客户端缓存仍有效，
+                此时不运行流水线，直接返回 code 304（见 cache_validators）
+        """
         try:
             # 1. 参数验证与解析
-            birth_date_str = data.get('birthDate')
-            birth_time_str = data.get('birthTime', '12:00')
-            longitude = float(data.get('longitude', 120.0))
-            gender = data.get('gender', 'male')
-            custom_yongshen = data.get('customYongShen')
+            pipeline = FortunePipeline.from_request(data)
 
-            if not birth_date_str:
+            if not pipeline.birth_date_str:
                 return {'success': False, 'error': '出生日期必填', 'code': 400}
 
-            # 解析出生日期时间
-            try:
-                from ..utils.date_utils import parse_datetime
-            except ImportError:
-                from utils.date_utils import parse_datetime
-            birth_dt = parse_datetime(birth_date_str, birth_time_str)
-
-            # 2. 计算基础八字
-            bazi = calculate_bazi(birth_dt, longitude)
-
-            # 3. 八字分析（带缓存）
-            try:
-                from ..core.bazi_engine import generate_bazi_cache_key, _create_custom_yongshen
-            except ImportError:
-                from core.bazi_engine import generate_bazi_cache_key, _create_custom_yongshen
-            cache_key = generate_bazi_cache_key(birth_date_str, birth_time_str, longitude)
-            analysis_result = analyze_bazi_cached(cache_key, birth_date_str, birth_time_str, longitude)
-
-            # 处理用户手动调整的用神
-            if custom_yongshen:
-                analysis_result['yong_shen_result'] = _create_custom_yongshen(custom_yongshen, bazi)
-
-            # 4. 获取目标日期（前端传递的date参数，如果未提供则使用当前日期）
-            target_date_str = data.get('date')
-            if target_date_str:
-                # 解析目标日期
-                try:
-                    from ..utils.date_utils import parse_date
-                except ImportError:
-                    from utils.date_utils import parse_date
-                target_dt = parse_date(target_date_str)
-                # 调试日志：记录接收到的日期参数
-                print(f"[DEBUG] 接收到目标日期参数: {target_date_str}, 解析为: {target_dt}")
-            else:
-                # 如果未提供目标日期，使用当前日期
-                target_dt = datetime.datetime.now()
-                print(f"[DEBUG] 未提供目标日期，使用当前日期: {target_dt}")
-            
+            fields = parse_fields(data.get('fields'))
+            unknown = sorted(fields - set(FORTUNE_FIELDS)) if fields is not None else []
+            if unknown:
+                return {'success': False, 'error': f"未知字段: {', '.join(unknown)}", 'code': 400}
+
+            # 目标日期（前端传递的 date 参数，未提供或无法解析时使用当前日期）
+            target_date, implicit_date = resolve_target_date(data.get('date'))
+            validators = cache_validators('fortune', pipeline, target_date.isoformat(), implicit_date,
+                                          sorted(fields) if fields is not None else None)
+            if not_modified is not None and not_modified(validators['etag']):
+                return dict(validators, code=304)
+
+            def wants(name):
+                return fields is None or name in fields
+
+            # 2. 计算基础八字  3. 八字分析（带缓存，已套用用户手动调整的用神）
+            bazi = pipeline.bazi
+            analysis_result = pipeline.analysis
+
+            # 4. 目标日期
+            target_dt = datetime.datetime.combine(target_date, datetime.time())
+            print(f"[DEBUG] 目标日期: {target_date}{'（缺省，取当前日期）' if implicit_date else ''}")
+
             # 4.1 计算目标日期的流年流月流日
-            liu_nian = calculate_liu_nian(target_dt.year)
-            liu_yue = calculate_liu_yue(target_dt.year, target_dt.month, target_dt.day)
-            liu_ri = calculate_liu_ri(target_dt.year, target_dt.month, target_dt.day)
+            liu_nian, liu_yue, liu_ri = pipeline.date_context(target_dt)
             
             # 调试日志：记录流年流月流日
             print(f"[DEBUG] 流年: {liu_nian['gan']}{liu_nian['zhi']}, 流月: {liu_yue['gan']}{liu_yue['zhi']}, 流日: {liu_ri['gan']}{liu_ri['zhi']}")
             
             # 4.2 计算目标日期所在的大运
-            dayun = calculate_dayun(birth_dt, target_dt.year, gender, longitude)
+            dayun = pipeline.dayun(target_dt.year)
             if dayun:
                 print(f"[DEBUG] 大运: {dayun.get('current_gan', '')}{dayun.get('current_zhi', '')}")
 
             # 5. 计算运势评分 (V5.0)
-            yongshen_data = analysis_result.get('yong_shen_result', {})
-            strength_result = analysis_result.get('strength_result', {})
-            
-            # 构建元素分析数据：将中文 level 映射为英文 pattern
-            level = strength_result.get('level', '中和')
-            level_to_pattern = {
-                '身弱': 'Weak',
-                '身旺': 'Strong',
-                '中和': 'Neutral'
-            }
-            pattern = level_to_pattern.get(level, 'Neutral')
-            
-            element_analysis = {
-                'pattern': pattern,
-                'score': strength_result.get('score', 0.5),
-                'level': level  # 保留中文 level 供其他用途
-            }
-            
-            score_result_v5 = calculate_fortune_score_v5(
-                bazi, element_analysis, yongshen_data,
-                liu_nian, liu_yue, liu_ri, dayun=dayun
-            )
-            total_score = score_result_v5['total_score']
-            
+            yongshen_data = pipeline.yongshen
+            # 元素分析数据：中文 level 映射为英文 pattern
+            element_analysis = pipeline.element_analysis
+
+            fortune = {}
+            if wants('dimensions'):
+                score_result_v5 = calculate_fortune_score_v5(
+                    bazi, element_analysis, yongshen_data,
+                    liu_nian, liu_yue, liu_ri, dayun=dayun
+                )
+                total_score = score_result_v5['total_score']
+            else:
+                # 不需要维度文案时只做批量查表（不构建神煞明细与互动描述）
+                day = pipeline.score_range([target_dt.date()])[0]
+                total_score = day['totalScore']
+                if wants('dimensionScores'):
+                    fortune['dimensionScores'] = day['dimensions']
+
             # 调试日志：记录分数
             print(f"[DEBUG] 计算得分: {total_score}, 流日: {liu_ri['gan']}{liu_ri['zhi']}")
 
+            if wants('totalScore'):
+                fortune['totalScore'] = total_score
+
             # 6. 生成维度评分和建议
-            # 计算神煞（用于维度计算）- 从 calculate_fortune_score_v5 的结果中获取
-            shensha_result = score_result_v5.get('shensha', score_result_v5.get('shensha_result', {'total_score': 0, 'details': [], 'dimension_boosts': {}}))
-            
-            dimensions = calculate_dimensions_v5(
-                bazi, liu_ri, total_score, yongshen_data, element_analysis, shensha_result
-            )
-            
+            if wants('dimensions'):
+                # 计算神煞（用于维度计算）- 从 calculate_fortune_score_v5 的结果中获取
+                shensha_result = score_result_v5.get('shensha', score_result_v5.get('shensha_result', {'total_score': 0, 'details': [], 'dimension_boosts': {}}))
+
+                dimensions = calculate_dimensions_v5(
+                    bazi, liu_ri, total_score, yongshen_data, element_analysis, shensha_result
+                )
+                fortune['dimensions'] = dimensions
+                if wants('dimensionScores') and fields is not None:
+                    fortune['dimensionScores'] = {k: v['score'] for k, v in dimensions.items()}
+
             # 生成随机数生成器，确保主题和宜忌的一致性
             seed_str = f"{bazi['day_gan']}{bazi['day_zhi']}{liu_ri['gan']}{liu_ri['zhi']}"
             import random
-            rng = random.Random(hash(seed_str))
-            
-            todo_list = generate_todo(
-                yongshen_data.get('primary', '木'),
-                yongshen_data.get('ji_shen', []),
-                liu_ri=liu_ri,
-                bazi=bazi,
-                yongshen=yongshen_data,
-                rng=rng
-            )
-            
-            main_theme = generate_main_theme(
-                total_score, bazi['day_gan'], liu_ri['gan'], rng=rng
-            )
+            rng = random.Random(seed_str)  # 字符串种子跨进程稳定（不受 PYTHONHASHSEED 影响）
+
+            if wants('todoList'):
+                todo_list = generate_todo(
+                    yongshen_data.get('primary', '木'),
+                    yongshen_data.get('ji_shen', []),
+                    liu_ri=liu_ri,
+                    bazi=bazi,
+                    yongshen=yongshen_data,
+                    rng=rng
+                )
 
-            # 7. 构建完整响应
-            response_data = {
-                'bazi': clean_for_json(bazi),
-                'analysis': clean_for_json(analysis_result),
-                'fortune': {
-                    'totalScore': total_score,
-                    'dimensions': clean_for_json(dimensions),
-                    'mainTheme': clean_for_json(main_theme),
-                    'todoList': clean_for_json(todo_list),
-                    'liuNian': clean_for_json(liu_nian),
-                    'liuYue': clean_for_json(liu_yue),
-                    'liuRi': clean_for_json(liu_ri)
-                }
+            # 主题只取决于总分、日干与流日天干（不消耗 rng），跳过宜忌不影响主题
+            if wants('mainTheme'):
+                main_theme = generate_main_theme(
+                    total_score, bazi['day_gan'], liu_ri['gan'], rng=rng
+                )
+                fortune['mainTheme'] = main_theme
+            if wants('todoList'):
+                fortune['todoList'] = todo_list
+            for name, value in (('liuNian', liu_nian), ('liuYue', liu_yue), ('liuRi', liu_ri)):
+                if wants(name):
+                    fortune[name] = value
+
+            # 7. 构建完整响应（键顺序与不带 fields 时相同；直接引用引擎输出，analysis 内层为缓存共享对象，只读）
+            response_data = {}
+            if wants('bazi'):
+                response_data['bazi'] = bazi
+            if wants('analysis'):
+                response_data['analysis'] = analysis_result
+            response_data['fortune'] = {
+                key: fortune[key] for key in FORTUNE_RESPONSE_ORDER if key in fortune
             }
             
-            return {'success': True, 'data': response_data, 'code': 200}
+            return {'success': True, 'data': response_data, 'code': 200,
+                    'timings': pipeline.server_timing(), **validators}
 
         except Exception as e:
             import traceback
@@ -185,56 +264,36 @@ class FortuneService:
             }
 
     @staticmethod
-    def handle_fortune_year_request(data):
-        """处理年运势请求 - 用于十年趋势，每年分数差异化"""
+    def handle_fortune_year_request(data, not_modified=None):
+        """
+        处理年运势请求 - 用于十年趋势，每年分数差异化
+
+        参数:
+            data: 请求参数
+            not_modified: 同 handle_fortune_request
+        """
         try:
-            birth_date_str = data.get('birthDate')
-            birth_time_str = data.get('birthTime', '12:00')
-            longitude = float(data.get('longitude', 120.0))
-            gender = data.get('gender', 'male')
-            year = int(data.get('year', datetime.datetime.now().year))
+            pipeline = FortunePipeline.from_request(data)
+            year = int(data.get('year') or datetime.datetime.now().year)
 
-            if not birth_date_str:
+            if not pipeline.birth_date_str:
                 return {'success': False, 'error': '出生日期必填', 'code': 400}
 
-            try:
-                from ..utils.date_utils import parse_datetime
-            except ImportError:
-                from utils.date_utils import parse_datetime
-            birth_dt = parse_datetime(birth_date_str, birth_time_str)
-
-            bazi = calculate_bazi(birth_dt, longitude)
-
-            try:
-                from ..core.bazi_engine import generate_bazi_cache_key, _create_custom_yongshen
-            except ImportError:
-                from core.bazi_engine import generate_bazi_cache_key, _create_custom_yongshen
-            cache_key = generate_bazi_cache_key(birth_date_str, birth_time_str, longitude)
-            analysis_result = analyze_bazi_cached(cache_key, birth_date_str, birth_time_str, longitude)
+            validators = cache_validators('fortune-year', pipeline, year, not data.get('year'))
+            if not_modified is not None and not_modified(validators['etag']):
+                return dict(validators, code=304)
 
-            custom_yongshen = data.get('customYongShen')
-            if custom_yongshen:
-                analysis_result['yong_shen_result'] = _create_custom_yongshen(custom_yongshen, bazi)
+            bazi = pipeline.bazi
 
             # 使用立春（节气索引2）作为年代表日
             lichun_month, lichun_day = get_solar_term_for_year(year, 2)
             target_dt = datetime.datetime(year, lichun_month, lichun_day, 12, 0, 0)
 
-            liu_nian = calculate_liu_nian(target_dt.year)
-            liu_yue = calculate_liu_yue(target_dt.year, target_dt.month, target_dt.day)
-            liu_ri = calculate_liu_ri(target_dt.year, target_dt.month, target_dt.day)
-            dayun = calculate_dayun(birth_dt, target_dt.year, gender, longitude)
-
-            yongshen_data = analysis_result.get('yong_shen_result', {})
-            strength_result = analysis_result.get('strength_result', {})
-            level = strength_result.get('level', '中和')
-            level_to_pattern = {'身弱': 'Weak', '身旺': 'Strong', '中和': 'Neutral'}
-            pattern = level_to_pattern.get(level, 'Neutral')
-            element_analysis = {
-                'pattern': pattern,
-                'score': strength_result.get('score', 0.5),
-                'level': level
-            }
+            liu_nian, liu_yue, liu_ri = pipeline.date_context(target_dt)
+            dayun = pipeline.dayun(target_dt.year)
+
+            yongshen_data = pipeline.yongshen
+            element_analysis = pipeline.element_analysis
 
             total_score = calculate_fortune_score_year(
                 bazi, element_analysis, yongshen_data,
@@ -250,11 +309,62 @@ class FortuneService:
                 'success': True,
                 'data': {
                     'totalScore': total_score,
-                    'dimensions': clean_for_json(dimensions),
-                    'liuNian': clean_for_json(liu_nian),
+                    'dimensions': dimensions,
+                    'liuNian': liu_nian,
                     'year': year
                 },
-                'code': 200
+                'code': 200,
+                'timings': pipeline.server_timing(),
+                **validators
+            }
+
+        except Exception as e:
+            import traceback
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc(),
+                'code': 500
+            }
+
+    @staticmethod
+    def handle_fortune_shichen_request(data, not_modified=None):
+        """
+        时辰运势：目标日期（date，默认今天）十二时辰的评分，一次批量计算
+
+        参数:
+            data: 请求参数
+            not_modified: 同 handle_fortune_request
+        """
+        try:
+            pipeline = FortunePipeline.from_request(data)
+
+            if not pipeline.birth_date_str:
+                return {'success': False, 'error': '出生日期必填', 'code': 400}
+
+            target_date, implicit_date = resolve_target_date(data.get('date'))
+            validators = cache_validators('fortune-shichen', pipeline, target_date.isoformat(), implicit_date)
+            if not_modified is not None and not_modified(validators['etag']):
+                return dict(validators, code=304)
+
+            day = pipeline.score_range([target_date])[0]
+            shichen = pipeline.score_shichen(target_date)
+            best = max(shichen, key=lambda x: x['score'])
+            worst = min(shichen, key=lambda x: x['score'])
+
+            return {
+                'success': True,
+                'data': {
+                    'date': target_date.strftime('%Y-%m-%d'),
+                    'dayScore': day['totalScore'],
+                    'liuRi': day['liuRi'],
+                    'shichen': shichen,
+                    'bestShichen': best['zhi'],
+                    'worstShichen': worst['zhi'],
+                },
+                'code': 200,
+                'timings': pipeline.server_timing(),
+                **validators
             }
 
         except Exception as e:
@@ -267,75 +377,53 @@ class FortuneService:
             }
 
     @staticmethod
-    def handle_fortune_month_request(data):
-        """月度运势：返回月中代表日详批 + 当月每日分数（热力）"""
+    def handle_fortune_month_request(data, not_modified=None):
+        """
+        月度运势：返回月中代表日详批 + 当月每日分数（热力）
+
+        includeDimensions 为真时另返回 dimensionMatrix：6 × 当月天数的六维分数矩阵
+        （行按 keys 顺序，列与 dailyScores 同序，只含分数不含文案），一次请求代替逐日调用日运接口
+
+        not_modified 同 handle_fortune_request
+        """
         import calendar
 
         try:
-            birth_date_str = data.get('birthDate')
-            birth_time_str = data.get('birthTime', '12:00')
-            longitude = float(data.get('longitude', 120.0))
-            gender = data.get('gender', 'male')
-            custom_yongshen = data.get('customYongShen')
+            pipeline = FortunePipeline.from_request(data)
             now = datetime.datetime.now()
-            year = int(data.get('year', now.year))
-            month = int(data.get('month', now.month))
+            year = int(data.get('year') or now.year)
+            month = int(data.get('month') or now.month)
+            include_dimensions = parse_flag(data.get('includeDimensions'))
 
-            if not birth_date_str:
+            if not pipeline.birth_date_str:
                 return {'success': False, 'error': '出生日期必填', 'code': 400}
             if month < 1 or month > 12:
                 return {'success': False, 'error': '月份无效', 'code': 400}
 
-            try:
-                from ..utils.date_utils import parse_datetime
-            except ImportError:
-                from utils.date_utils import parse_datetime
-            birth_dt = parse_datetime(birth_date_str, birth_time_str)
-            bazi = calculate_bazi(birth_dt, longitude)
-
-            try:
-                from ..core.bazi_engine import generate_bazi_cache_key, _create_custom_yongshen
-            except ImportError:
-                from core.bazi_engine import generate_bazi_cache_key, _create_custom_yongshen
-            cache_key = generate_bazi_cache_key(birth_date_str, birth_time_str, longitude)
-            analysis_result = analyze_bazi_cached(cache_key, birth_date_str, birth_time_str, longitude)
-            if custom_yongshen:
-                analysis_result['yong_shen_result'] = _create_custom_yongshen(custom_yongshen, bazi)
-
-            yongshen_data = analysis_result.get('yong_shen_result', {})
-            strength_result = analysis_result.get('strength_result', {})
-            level = strength_result.get('level', '中和')
-            level_to_pattern = {'身弱': 'Weak', '身旺': 'Strong', '中和': 'Neutral'}
-            pattern = level_to_pattern.get(level, 'Neutral')
-            element_analysis = {
-                'pattern': pattern,
-                'score': strength_result.get('score', 0.5),
-                'level': level
-            }
+            validators = cache_validators('fortune-month', pipeline, [year, month],
+                                          not (data.get('year') and data.get('month')), include_dimensions)
+            if not_modified is not None and not_modified(validators['etag']):
+                return dict(validators, code=304)
+
+            bazi = pipeline.bazi
+            analysis_result = pipeline.analysis
+            yongshen_data = pipeline.yongshen
+            element_analysis = pipeline.element_analysis
 
             last_day = calendar.monthrange(year, month)[1]
-            daily_scores = []
-            for d in range(1, last_day + 1):
-                target_dt = datetime.datetime(year, month, d, 12, 0, 0)
-                liu_nian = calculate_liu_nian(target_dt.year)
-                liu_yue = calculate_liu_yue(target_dt.year, target_dt.month, target_dt.day)
-                liu_ri = calculate_liu_ri(target_dt.year, target_dt.month, target_dt.day)
-                dayun = calculate_dayun(birth_dt, target_dt.year, gender, longitude)
-                score_res = calculate_fortune_score_v5(
-                    bazi, element_analysis, yongshen_data,
-                    liu_nian, liu_yue, liu_ri, dayun=dayun
-                )
-                daily_scores.append({
-                    'date': f'{year}-{month:02d}-{d:02d}',
-                    'score': score_res['total_score'],
-                })
+            # 当月逐日总分与六维一次批量查表得出
+            month_scores = pipeline.score_range(
+                [datetime.date(year, month, d) for d in range(1, last_day + 1)]
+            )
+            daily_scores = [
+                {'date': f'{year}-{month:02d}-{item["date"].day:02d}', 'score': item['totalScore']}
+                for item in month_scores
+            ]
 
             mid = min(15, last_day)
             mid_dt = datetime.datetime(year, month, mid, 12, 0, 0)
-            liu_nian_m = calculate_liu_nian(mid_dt.year)
-            liu_yue_m = calculate_liu_yue(mid_dt.year, mid_dt.month, mid_dt.day)
-            liu_ri_m = calculate_liu_ri(mid_dt.year, mid_dt.month, mid_dt.day)
-            dayun_m = calculate_dayun(birth_dt, mid_dt.year, gender, longitude)
+            liu_nian_m, liu_yue_m, liu_ri_m = pipeline.date_context(mid_dt)
+            dayun_m = pipeline.dayun(mid_dt.year)
 
             month_total = calculate_fortune_score_month(
                 bazi, element_analysis, yongshen_data,
@@ -351,7 +439,7 @@ class FortuneService:
             )
             import random
             seed_str = f"{bazi['day_gan']}{bazi['day_zhi']}{liu_ri_m['gan']}{liu_ri_m['zhi']}month"
-            rng = random.Random(hash(seed_str))
+            rng = random.Random(seed_str)  # 字符串种子跨进程稳定（不受 PYTHONHASHSEED 影响）
             main_theme = generate_main_theme(
                 month_total, bazi['day_gan'], liu_ri_m['gan'], rng=rng
             )
@@ -371,8 +459,8 @@ class FortuneService:
             response_data = {
                 'year': year,
                 'month': month,
-                'bazi': clean_for_json(bazi),
-                'analysis': clean_for_json(analysis_result),
+                'bazi': bazi,
+                'analysis': analysis_result,
                 'summary': {
                     'avgScore': avg_score,
                     'bestDay': best['date'],
@@ -382,17 +470,23 @@ class FortuneService:
                 },
                 'fortune': {
                     'totalScore': month_total,
-                    'dimensions': clean_for_json(dimensions),
-                    'mainTheme': clean_for_json(main_theme),
-                    'todoList': clean_for_json(todo_list),
-                    'liuNian': clean_for_json(liu_nian_m),
-                    'liuYue': clean_for_json(liu_yue_m),
-                    'liuRi': clean_for_json(liu_ri_m),
+                    'dimensions': dimensions,
+                    'mainTheme': main_theme,
+                    'todoList': todo_list,
+                    'liuNian': liu_nian_m,
+                    'liuYue': liu_yue_m,
+                    'liuRi': liu_ri_m,
                 },
-                'dailyScores': clean_for_json(daily_scores),
+                'dailyScores': daily_scores,
             }
+            if include_dimensions:
+                response_data['dimensionMatrix'] = {
+                    'keys': list(DIMENSION_KEYS),
+                    'scores': [[item['dimensions'][key] for item in month_scores] for key in DIMENSION_KEYS],
+                }
 
-            return {'success': True, 'data': response_data, 'code': 200}
+            return {'success': True, 'data': response_data, 'code': 200,
+                    'timings': pipeline.server_timing(), **validators}
 
         except Exception as e:
             import traceback
@@ -12,7 +12,6 @@ try:
     from ..core.constants import WU_XING_MAP, WU_XING_SHENG, WU_XING_KE
     from ..core.fortune_engine import DIZHI_INTERACTIONS
     from ..utils.date_utils import parse_datetime
-    from ..utils.json_utils import clean_for_json
 except ImportError:
     import os
     import sys
@@ -24,7 +23,6 @@ except ImportError:
     from core.constants import WU_XING_MAP, WU_XING_SHENG, WU_XING_KE
     from core.fortune_engine import DIZHI_INTERACTIONS
     from utils.date_utils import parse_datetime
-    from utils.json_utils import clean_for_json
 
 
 def _element(gan: str) -> str:
@@ -116,8 +114,8 @@ class HepanService:
                     'stability': '稳定持久',
                 },
                 'summaryPoints': summary_points[:8],
-                'personA': {'bazi': clean_for_json(bazi_a)},
-                'personB': {'bazi': clean_for_json(bazi_b)},
+                'personA': {'bazi': bazi_a},
+                'personB': {'bazi': bazi_b},
                 'tenGodBtoA': ten,
             }
             return {'success': True, 'data': data, 'code': 200}
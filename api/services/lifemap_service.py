@@ -11,12 +11,16 @@ import sys
 from typing import Dict, List
 
 try:
-    from .fortune_service import FortuneService
+    from .fortune_pipeline import FortunePipeline
 except ImportError:
     api_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     if api_dir not in sys.path:
         sys.path.insert(0, api_dir)
-    from services.fortune_service import FortuneService
+    from services.fortune_pipeline import FortunePipeline
+
+# 年数范围：最少 5 年，最多 100 年（完整人生视图）
+MIN_YEARS = 5
+MAX_YEARS = 100
 
 
 class LifeMapService:
@@ -32,40 +36,21 @@ class LifeMapService:
             gender = data.get("gender", "male")
             custom_yongshen = data.get("customYongShen")
             start_year = LifeMapService._safe_int(data.get("startYear"), datetime.datetime.now().year)
-            years = LifeMapService._clamp_int(data.get("years", 10), 5, 20, 10)
-
-            points: List[Dict] = []
-            failed_years: List[int] = []
-
-            for i in range(years):
-                year = start_year + i
-                payload = {
-                    "year": year,
-                    "birthDate": birth_date,
-                    "birthTime": birth_time,
-                    "longitude": longitude,
-                    "gender": gender,
-                    "customYongShen": custom_yongshen,
-                }
-
-                result = FortuneService.handle_fortune_year_request(payload)
-                if not result.get("success"):
-                    failed_years.append(year)
-                    continue
-
-                point = LifeMapService._build_point(result.get("data", {}), year)
-                points.append(point)
-
-            if not points:
-                return {
-                    "success": False,
-                    "error": "年度趋势计算失败，请稍后重试",
-                    "code": 500,
-                }
+            years = LifeMapService._clamp_int(data.get("years", 10), MIN_YEARS, MAX_YEARS, 10)
+
+            # 排盘、分析、大运时间轴只算一次，各年在命盘分数表上批量查表评分
+            pipeline = FortunePipeline(birth_date, birth_time, longitude, gender, custom_yongshen)
+            year_scores = pipeline.score_years([start_year + i for i in range(years)])
+            points: List[Dict] = [
+                LifeMapService._build_point(
+                    item["year"], item["totalScore"], item["dimensions"], item["liuNian"], item["dayun"]
+                )
+                for item in year_scores
+            ]
 
             points = LifeMapService._attach_momentum(points)
             milestones = LifeMapService._build_milestones(points)
-            summary = LifeMapService._build_summary(points, milestones, failed_years)
+            summary = LifeMapService._build_summary(points, milestones)
             strategy = LifeMapService._build_strategy(points, milestones)
 
             return {
@@ -77,9 +62,9 @@ class LifeMapService:
                     "milestones": milestones,
                     "summary": summary,
                     "strategy": strategy,
-                    "failedYears": failed_years,
                 },
                 "code": 200,
+                "timings": pipeline.server_timing(),
             }
         except Exception as e:
             import traceback
@@ -92,20 +77,19 @@ class LifeMapService:
             }
 
     @staticmethod
-    def _build_point(data: Dict, year: int) -> Dict:
-        dims = data.get("dimensions", {}) or {}
+    def _build_point(year: int, total: int, dims: Dict[str, int], gan_zhi: str, dayun) -> Dict:
+        """
+        单年趋势点
+
+        dayun 为该年所在大运干支；起运前或超出大运时间轴（九步）的年份为 None，
+        其评分不含大运影响，前端据 daYun 标注
+        """
         career = LifeMapService._extract_dim_score(dims.get("career"), 50)
         wealth = LifeMapService._extract_dim_score(dims.get("wealth"), 50)
         romance = LifeMapService._extract_dim_score(dims.get("romance"), 50)
         health = LifeMapService._extract_dim_score(dims.get("health"), 50)
         academic = LifeMapService._extract_dim_score(dims.get("academic"), 50)
         travel = LifeMapService._extract_dim_score(dims.get("travel"), 50)
-        total = LifeMapService._safe_int(data.get("totalScore"), 50)
-
-        liu_nian = data.get("liuNian", {}) or {}
-        gan = liu_nian.get("gan", "")
-        zhi = liu_nian.get("zhi", "")
-        gan_zhi = liu_nian.get("gan_zhi") or f"{gan}{zhi}" if (gan or zhi) else f"{year}"
 
         risk_level = "low" if total >= 75 else "medium" if total >= 55 else "high"
         confidence = max(35, min(97, int(total * 0.78 + (health + career) * 0.11)))
@@ -113,6 +97,7 @@ class LifeMapService:
         return {
             "year": year,
             "ganZhi": gan_zhi,
+            "daYun": dayun,
             "overall": total,
             "career": career,
             "wealth": wealth,
@@ -205,7 +190,7 @@ class LifeMapService:
         return list(unique.values())
 
     @staticmethod
-    def _build_summary(points: List[Dict], milestones: List[Dict], failed_years: List[int]) -> Dict:
+    def _build_summary(points: List[Dict], milestones: List[Dict]) -> Dict:
         overall_values = [p["overall"] for p in points]
         average = int(sum(overall_values) / len(overall_values))
         variance = sum((x - average) ** 2 for x in overall_values) / len(overall_values)
@@ -232,7 +217,6 @@ class LifeMapService:
             "confidence": confidence,
             "peakYear": max(points, key=lambda x: x["overall"])["year"],
             "troughYear": min(points, key=lambda x: x["overall"])["year"],
-            "failedYears": failed_years,
             "milestoneCount": len(milestones),
         }
 
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+冷启动基准：大运计算后端对比
+
+每轮启动一个全新解释器，导入 api.core.lunar 并计算一次大运，
+统计耗时与峰值内存，对比内置后端（native）与 lunar_python 后端。
+
+用法:
+    python api/tests/benchmark_cold_start.py [轮数]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 子进程内执行：导入 + 首次大运计算，输出 耗时(ms) 峰值内存(KB) 是否导入 lunar_python
+CHILD_CODE = """
+import resource, sys, time
+from datetime import datetime
+t0 = time.perf_counter()
+from api.core.lunar import calculate_dayun
+calculate_dayun(datetime(1990, 5, 15, 10, 30), 2025, 'male')
+elapsed = (time.perf_counter() - t0) * 1000
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'lunar_python' in sys.modules)
+"""
+
+
+def run_once(backend):
+    """启动一次子进程，返回 (耗时ms, 峰值内存KB, 是否导入 lunar_python)"""
+    env = dict(os.environ, DAYUN_BACKEND=backend)
+    output = subprocess.check_output(
+        [sys.executable, '-c', CHILD_CODE], cwd=PROJECT_ROOT, env=env, text=True
+    )
+    elapsed, rss, imported = output.split()
+    return float(elapsed), int(rss), imported == 'True'
+
+
+def benchmark(backend, rounds):
+    """多轮冷启动，返回中位耗时、中位峰值内存与是否导入 lunar_python"""
+    results = [run_once(backend) for _ in range(rounds)]
+    return (
+        statistics.median(r[0] for r in results),
+        statistics.median(r[1] for r in results),
+        results[0][2],
+    )
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print("=" * 70)
+    print(f"冷启动基准（导入 api.core.lunar + 首次大运计算，{rounds} 轮取中位数）")
+    print("=" * 70)
+    print(f"{'后端':<14} {'耗时(ms)':>10} {'峰值内存(MB)':>14} {'导入lunar_python':>18}")
+    print("-" * 70)
+    rows = {}
+    for backend in ('native', 'lunar_python'):
+        elapsed, rss, imported = benchmark(backend, rounds)
+        rows[backend] = (elapsed, rss)
+        print(f"{backend:<14} {elapsed:>10.1f} {rss / 1024:>14.1f} {str(imported):>18}")
+    print("-" * 70)
+    saved_ms = rows['lunar_python'][0] - rows['native'][0]
+    saved_mb = (rows['lunar_python'][1] - rows['native'][1]) / 1024
+    print(f"native 节省: {saved_ms:.1f} ms, {saved_mb:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+响应压缩基准：各接口典型响应体
+
+对每个接口的典型请求取一次响应正文，统计原始字节数，以及 gzip（级别 1 / 6 / 9）与 brotli（已安装时，
+质量 5 / 11）的压缩后字节数、压缩率与每次压缩耗时。
+
+用法:
+    python api/tests/benchmark_compression.py [轮数]
+"""
+
+import io
+import json
+import os
+import sys
+import timeit
+from unittest import mock
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api import index
+from api.index import compress_payload, handler
+
+BIRTH = {'birthDate': '1990-05-15', 'birthTime': '08:30'}
+
+# (名称, 方法, 路径, 请求体)
+PAYLOADS = [
+    ('fortune', 'POST', '/api/fortune', dict(BIRTH, date='2026-03-05')),
+    ('fortune-month', 'POST', '/api/fortune-month', dict(BIRTH, year=2026, month=3, includeDimensions=True)),
+    ('fortune-year', 'POST', '/api/fortune-year', dict(BIRTH, year=2026)),
+    ('date-picker 60d', 'POST', '/api/date-picker/recommend', dict(BIRTH, rangeDays=60, startDate='2026-03-01')),
+    ('lifemap', 'POST', '/api/lifemap/trends', dict(BIRTH, years=30)),
+    ('hepan', 'POST', '/api/hepan', {'personA': BIRTH, 'personB': {'birthDate': '1992-08-01'}}),
+    ('almanac', 'GET', '/api/almanac/2026-03-05', None),
+]
+
+
+def response_body(method, path, body):
+    """不经套接字调用入口，取未压缩的响应正文"""
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    h = handler.__new__(handler)
+    h.path, h.command, h.request_version = path, method, 'HTTP/1.1'
+    h.requestline, h.client_address = f'{method} {path} HTTP/1.1', ('127.0.0.1', 0)
+    h.headers = {'Content-Length': str(len(payload)), 'Content-Type': 'application/json'}
+    h.rfile, h.wfile = io.BytesIO(payload), io.BytesIO()
+    h._handle_request(method)
+    return h.wfile.getvalue().partition(b'\r\n\r\n')[2]
+
+
+def settings():
+    """(列名, 编码, 设置项, 取值)"""
+    out = [(f'gzip-{level}', 'gzip', 'GZIP_LEVEL', level) for level in (1, 6, 9)]
+    if index.brotli is not None:
+        out += [(f'br-{quality}', 'br', 'BROTLI_QUALITY', quality) for quality in (5, 11)]
+    return out
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    number = 20
+    columns = settings()
+    print("=" * 96)
+    print(f"响应压缩（{number} 次 × {rounds} 轮取最优；格内为 压缩后字节 / 压缩率 / 每次耗时 µs）")
+    if index.brotli is None:
+        print("brotli 未安装，仅统计 gzip")
+    print("=" * 96)
+    print(f"{'接口':<16} {'原始字节':>8}  " + "  ".join(f"{label:^22}" for label, *_ in columns))
+    print("-" * 96)
+    for name, method, path, body in PAYLOADS:
+        raw = response_body(method, path, body)
+        cells = []
+        for _, encoding, setting, value in columns:
+            with mock.patch.object(index, setting, value):
+                compressed = compress_payload(raw, encoding)
+                best = min(timeit.repeat(lambda: compress_payload(raw, encoding),
+                                         number=number, repeat=rounds))
+            cells.append(f"{len(compressed):>7} {len(compressed) / len(raw):>5.0%} {best / number * 1e6:>7.0f}")
+        print(f"{name:<16} {len(raw):>8}  " + "  ".join(cells))
+
+
+if __name__ == '__main__':
+    main()
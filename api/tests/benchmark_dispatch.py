@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+路由分发基准
+
+1. 分发开销：路由表解析（resolve_route）与原 startswith / endswith 判断链对比
+2. 各路由首个请求耗时：每个路由启动一个全新解释器，分别在不预加载 / 预加载（API_PRELOAD=1）
+   下统计导入入口耗时、首个请求耗时与第二个请求耗时
+
+用法:
+    python api/tests/benchmark_dispatch.py [轮数]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from api.index import resolve_route
+from api.tests.test_routing import TestRouting, legacy_route
+
+# (名称, 方法, 路径, 请求体)
+ROUTES = [
+    ("almanac", "GET", "/api/almanac/2026-03-05", None),
+    ("fortune", "POST", "/api/fortune", {"birthDate": "1990-05-15", "date": "2026-03-05"}),
+    ("fortune-month", "POST", "/api/fortune-month", {"birthDate": "1990-05-15", "year": 2026, "month": 3}),
+    ("date-picker", "POST", "/api/date-picker/recommend", {"birthDate": "1990-05-15", "rangeDays": 30}),
+    ("lifemap", "POST", "/api/lifemap/trends", {"birthDate": "1990-05-15", "years": 10}),
+    ("hepan", "POST", "/api/hepan", {"personA": {"birthDate": "1990-05-15"},
+                                     "personB": {"birthDate": "1992-08-01"}}),
+    ("auth/login", "POST", "/api/auth/login", {}),
+    ("sync/status", "GET", "/api/sync/status", None),
+]
+
+# 子进程内执行：导入入口，构造不带套接字的 handler 连发两次同一请求，输出 导入(ms) 首次(ms) 第二次(ms)
+CHILD_CODE = """
+import io, json, sys, time
+t0 = time.perf_counter()
+from api.index import handler
+t1 = time.perf_counter()
+method, path, body = sys.argv[1], sys.argv[2], sys.argv[3]
+payload = body.encode('utf-8') if body != 'null' else b''
+
+def request():
+    h = handler.__new__(handler)
+    h.path, h.command, h.request_version = path, method, 'HTTP/1.1'
+    h.requestline, h.client_address = f'{method} {path} HTTP/1.1', ('127.0.0.1', 0)
+    h.headers = {'Content-Length': str(len(payload)), 'Content-Type': 'application/json'}
+    h.rfile, h.wfile = io.BytesIO(payload), io.BytesIO()
+    start = time.perf_counter()
+    h._handle_request(method)
+    return (time.perf_counter() - start) * 1000
+
+first = request()
+second = request()
+print((t1 - t0) * 1000, first, second)
+"""
+
+
+def run_child(method, path, body, preload):
+    import json
+
+    env = dict(os.environ, API_PRELOAD="1" if preload else "0")
+    output = subprocess.check_output(
+        [sys.executable, "-c", CHILD_CODE, method, path, json.dumps(body)],
+        cwd=PROJECT_ROOT, env=env, text=True, stderr=subprocess.DEVNULL,
+    )
+    return tuple(float(x) for x in output.split()[-3:])
+
+
+def bench_resolve(paths, iterations=20000):
+    """每次分发的平均解析耗时（微秒）：(路由表, 原判断链)"""
+    results = []
+    for fn in (resolve_route, legacy_route):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for path in paths:
+                fn(path)
+        results.append((time.perf_counter() - start) / (iterations * len(paths)) * 1e6)
+    return results
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print("=" * 78)
+    print("路由分发开销（微秒/次）")
+    print("-" * 78)
+    print(f"{'路径集':<24} {'路由表':>10} {'原判断链':>10}")
+    for label, paths in (("前端请求路径", [path for _, _, path, _ in ROUTES]),
+                         ("全部测试路径（含 404）", TestRouting.PATHS)):
+        table_us, legacy_us = bench_resolve(paths)
+        print(f"{label:<24} {table_us:>10.2f} {legacy_us:>10.2f}")
+
+    print("=" * 78)
+    print(f"首个请求耗时（全新解释器，{rounds} 轮取中位数，ms）")
+    print("-" * 78)
+    print(f"{'路由':<14} {'导入':>8} {'首次':>8} {'第二次':>8} │ {'预加载导入':>10} {'首次':>8} {'第二次':>8}")
+    print("-" * 78)
+    for name, method, path, body in ROUTES:
+        row = []
+        for preload in (False, True):
+            samples = [run_child(method, path, body, preload) for _ in range(rounds)]
+            row.extend(statistics.median(s[i] for s in samples) for i in range(3))
+        print(f"{name:<14} {row[0]:>8.1f} {row[1]:>8.1f} {row[2]:>8.1f} │ "
+              f"{row[3]:>10.1f} {row[4]:>8.1f} {row[5]:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
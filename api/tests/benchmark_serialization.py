@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+响应序列化基准：/fortune-month 响应体
+
+对比原流程（clean_for_json 逐层复制 + json.dumps）与一次编码（dumps_response 标准库 / orjson），
+统计每次编码耗时、峰值内存与输出字节数。
+
+用法:
+    python api/tests/benchmark_serialization.py [轮数]
+"""
+
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services.fortune_service import FortuneService
+from api.utils import json_utils
+from api.utils.json_utils import clean_for_json
+
+
+def legacy_encode(data):
+    """原流程：各字段 clean_for_json 复制一遍，再整体 json.dumps"""
+    return json.dumps(clean_for_json(data), ensure_ascii=False).encode('utf-8')
+
+
+def stdlib_encode(data):
+    """dumps_response 的标准库路径"""
+    return json.dumps(data, ensure_ascii=False, default=json_utils._encode_default).encode('utf-8')
+
+
+def peak_kb(func, data):
+    """单次编码期间的峰值内存（KB）"""
+    tracemalloc.start()
+    func(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    result = FortuneService.handle_fortune_month_request({
+        'birthDate': '1990-05-15', 'birthTime': '08:30', 'year': 2026, 'month': 3, 'includeDimensions': True,
+    })
+    result.pop('code')
+    result.pop('timings')
+
+    cases = [('clean+dumps', legacy_encode), ('一次编码', stdlib_encode)]
+    if json_utils.orjson is not None:
+        cases.append(('orjson', lambda data: json_utils.orjson.dumps(
+            data, default=json_utils._encode_default, option=json_utils.orjson.OPT_NON_STR_KEYS)))
+
+    number = 200
+    print("=" * 70)
+    print(f"/fortune-month 响应编码（{number} 次 × {rounds} 轮取最优）")
+    print("=" * 70)
+    print(f"{'实现':<14} {'每次(µs)':>10} {'峰值(KB)':>10} {'字节数':>10}")
+    print("-" * 70)
+    for label, func in cases:
+        best = min(timeit.repeat(lambda: func(result), number=number, repeat=rounds))
+        print(f"{label:<14} {best / number * 1e6:>10.1f} {peak_kb(func, result):>10.1f} "
+              f"{len(func(result)):>10}")
+
+
+if __name__ == '__main__':
+    main()
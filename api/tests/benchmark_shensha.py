@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+神煞判定基准：逐条遍历配置（旧实现） vs 位掩码查表
+
+统计每次调用耗时，以及在同一批 (命盘, 流日) 上触发的神煞种类与次数。
+
+用法:
+    python api/tests/benchmark_shensha.py [轮数]
+"""
+
+import os
+import sys
+import timeit
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.core.constants import TIAN_GAN, DI_ZHI, SHEN_SHA_COMPLETE
+from api.core.calendar_table import JIA_ZI
+from api.core.fortune_engine import (
+    _GAN_INDEX, _ZHI_INDEX, _calculate_shensha, _shensha_mask, _shensha_result_for_mask
+)
+
+
+def legacy_calculate_shensha(bazi, liu_ri):
+    """旧实现：每次遍历全部神煞，仅判定 stem_based"""
+    total_score = 0
+    details = []
+    dimension_boosts = {}
+    day_gan = bazi['day_gan']
+    liu_ri_zhi = liu_ri['zhi']
+    for sha_name, sha_config in SHEN_SHA_COMPLETE.items():
+        triggered = False
+        if sha_config['calc_method'] == 'stem_based':
+            valid_zhis = sha_config['table'].get(day_gan, [])
+            if isinstance(valid_zhis, list):
+                triggered = liu_ri_zhi in valid_zhis
+            else:
+                triggered = liu_ri_zhi == valid_zhis
+        if triggered:
+            total_score += sha_config['score']
+            details.append({
+                'name': sha_name,
+                'score': sha_config['score'],
+                'desc': sha_config['desc'],
+                'type': 'auspicious' if sha_config['score'] > 0 else 'inauspicious'
+            })
+            for dim, boost in sha_config.get('dimension_boost', {}).items():
+                dimension_boosts[dim] = dimension_boosts.get(dim, 0) + boost
+    total_score = max(-20, min(20, total_score))
+    return {'total_score': total_score, 'details': details, 'dimension_boosts': dimension_boosts}
+
+
+def mask_score_only(bazi, liu_ri):
+    """分数表构建所用路径：只取合计分，不复制明细"""
+    return _shensha_result_for_mask(_shensha_mask(
+        _GAN_INDEX[bazi['day_gan']], _ZHI_INDEX[bazi['month_zhi']],
+        _ZHI_INDEX[bazi['year_zhi']], _ZHI_INDEX[bazi['day_zhi']],
+        _GAN_INDEX[liu_ri['gan']], _ZHI_INDEX[liu_ri['zhi']]
+    ))[0]
+
+
+def build_cases():
+    """120 张命盘 × 六十甲子流日"""
+    charts = []
+    for i in range(120):
+        charts.append({
+            'day_gan': TIAN_GAN[i % 10],
+            'day_zhi': DI_ZHI[(i % 10 + 2 * (i // 10)) % 12],
+            'month_zhi': DI_ZHI[(i * 7) % 12],
+            'year_zhi': DI_ZHI[(i * 5) % 12],
+        })
+    days = [{'gan': gz[0], 'zhi': gz[1]} for gz in JIA_ZI]
+    return [(bazi, liu_ri) for bazi in charts for liu_ri in days]
+
+
+def coverage(func, cases):
+    """触发的神煞种类与总次数"""
+    names = set()
+    hits = 0
+    for bazi, liu_ri in cases:
+        details = func(bazi, liu_ri)['details']
+        hits += len(details)
+        names.update(d['name'] for d in details)
+    return names, hits
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    cases = build_cases()
+    print("=" * 70)
+    print(f"神煞判定基准（{len(cases)} 次调用 × {rounds} 轮取最优）")
+    print("=" * 70)
+    print(f"{'实现':<10} {'每次(µs)':>10} {'触发种类':>10} {'触发次数':>10}")
+    print("-" * 70)
+    for label, func in (('遍历配置', legacy_calculate_shensha), ('位掩码', _calculate_shensha)):
+        best = min(timeit.repeat(lambda: [func(b, d) for b, d in cases], number=1, repeat=rounds))
+        names, hits = coverage(func, cases)
+        print(f"{label:<10} {best / len(cases) * 1e6:>10.2f} "
+              f"{len(names):>6}/{len(SHEN_SHA_COMPLETE):<3} {hits:>10}")
+    best = min(timeit.repeat(lambda: [mask_score_only(b, d) for b, d in cases], number=1, repeat=rounds))
+    print(f"{'仅分数':<10} {best / len(cases) * 1e6:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
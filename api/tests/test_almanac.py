@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+公共黄历单元测试
+
+验证内容：
+1. 三柱、节气与排盘一致，冲合、当令五行、月令神煞按常量表
+2. 请求按天生成并缓存（不整年计算），ETag 只随内容变化
+3. /api/almanac/{date}：Cache-Control、ETag、If-None-Match 返回 304、日期校验
+"""
+
+import datetime
+import json
+import os
+import sys
+import threading
+import unittest
+from http.server import HTTPServer
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.core.constants import DIZHI_INTERACTIONS, SHEN_SHA_COMPLETE
+from api.core.lunar import calculate_bazi
+from api.index import handler
+from api.services import almanac_service
+from api.services.almanac_service import (
+    ALMANAC_CACHE_CONTROL, AlmanacService, almanac_etag, build_almanac, get_day_almanac, get_year_almanac
+)
+
+
+class TestAlmanac(unittest.TestCase):
+    """黄历内容测试"""
+
+    def test_pillars_match_bazi(self):
+        """年月日三柱与节气同当日正午排盘（立春前后；交节当日整天算新节气，故取交节时刻在正午前的日子）"""
+        for day in (datetime.date(2026, 2, 3), datetime.date(2026, 2, 4), datetime.date(2026, 3, 10),
+                    datetime.date(2030, 12, 31)):
+            data = build_almanac(day)
+            bazi = calculate_bazi(datetime.datetime(day.year, day.month, day.day, 12, 0), 120.0)
+            pillars = data['pillars']
+            self.assertEqual((pillars['year']['ganZhi'], pillars['month']['ganZhi'], pillars['day']['ganZhi']),
+                             (bazi['year'], bazi['month'], bazi['day']))
+            self.assertEqual(data['solarTerm']['index'], bazi['solar_term_index'])
+            self.assertEqual(data['clash'], DIZHI_INTERACTIONS['liu_chong'][bazi['day_zhi']])
+            self.assertEqual(data['harmony'], DIZHI_INTERACTIONS['liu_he'][bazi['day_zhi']])
+
+    def test_month_shensha(self):
+        """全年出现的神煞都是只看月令的一类（天德、月德等），与命盘无关"""
+        year = get_year_almanac(2026)
+        self.assertEqual(len(year), 365)
+        names = {sha['name'] for data, _ in year.values() for sha in data['shensha']}
+        self.assertTrue(names)
+        for name in names:
+            self.assertEqual(SHEN_SHA_COMPLETE[name]['calc_method'], 'month_based')
+
+    def test_etag(self):
+        """ETag 为强校验值，内容相同则相同、不同日期不同"""
+        year = get_year_almanac(2026)
+        data, etag = year['2026-03-05']
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        self.assertEqual(etag, almanac_etag(build_almanac(datetime.date(2026, 3, 5))))
+        self.assertEqual(len({tag for _, tag in year.values()}), len(year))
+
+    def test_request_builds_single_day(self):
+        """首个请求只生成当天，不整年计算；整年导出复用同一缓存"""
+        get_day_almanac.cache_clear()
+        with mock.patch.object(almanac_service, 'build_almanac', wraps=build_almanac) as build:
+            result = AlmanacService.handle_almanac_request('2031-07-09')
+            self.assertEqual(result['code'], 200)
+            self.assertEqual(build.call_count, 1)
+            year = get_year_almanac(2031)
+            self.assertEqual(build.call_count, 365)
+        self.assertIs(year['2031-07-09'][0], result['data'])
+
+    def test_validation(self):
+        for bad in ('2026-13-01', 'today', '', '1899-12-31'):
+            self.assertEqual(AlmanacService.handle_almanac_request(bad)['code'], 400)
+
+
+class TestAlmanacEndpoint(unittest.TestCase):
+    """黄历接口缓存头测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def get(self, path, headers=None):
+        try:
+            with urlopen(Request(self.base + path, headers=headers or {})) as resp:
+                return resp.status, dict(resp.headers), resp.read()
+        except HTTPError as e:
+            return e.code, dict(e.headers), e.read()
+
+    def test_cache_headers_and_304(self):
+        status, headers, body = self.get('/api/almanac/2026-03-05')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Cache-Control'], ALMANAC_CACHE_CONTROL)
+        payload = json.loads(body)
+        self.assertEqual(payload['data'], build_almanac(datetime.date(2026, 3, 5)))
+        self.assertNotIn('etag', payload)
+
+        status, headers304, body = self.get('/api/almanac/2026-03-05',
+                                            {'If-None-Match': f'"other", {headers["ETag"]}'})
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b'')
+        self.assertEqual(headers304['ETag'], headers['ETag'])
+
+        status, _, _ = self.get('/api/almanac/2026-03-06', {'If-None-Match': headers['ETag']})
+        self.assertEqual(status, 200)
+
+    def test_bad_date(self):
+        status, headers, body = self.get('/api/almanac/2026-02-30')
+        self.assertEqual(status, 400)
+        self.assertNotIn('ETag', headers)
+        self.assertFalse(json.loads(body)['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()
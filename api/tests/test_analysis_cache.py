@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+八字分析缓存单元测试
+
+验证内容：
+1. 缓存以四柱为键：经度写法不同、出生时刻不同但四柱相同均命中
+2. 缓存结果与直接分析一致
+3. 命中/未命中统计
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.core.lunar import calculate_bazi
+from api.core.bazi_engine import (
+    analyze_bazi_cached, analyze_bazi_enhanced, analyze_bazi_for_chart, bazi_pillar_key,
+    clear_analysis_cache, generate_bazi_cache_key, get_analysis_cache_stats
+)
+from api.core.analysis_table import use_analysis_table
+
+
+class TestAnalysisCache(unittest.TestCase):
+    """分析缓存测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        # 停用预计算表，统计只反映 LRU 缓存
+        cls._table_path = use_analysis_table(None)
+
+    @classmethod
+    def tearDownClass(cls):
+        use_analysis_table(cls._table_path)
+
+    def setUp(self):
+        clear_analysis_cache()
+
+    def test_longitude_spelling_shares_entry(self):
+        """经度 "120" 与 "120.0" 命中同一条缓存"""
+        for longitude in ("120", "120.0", 120, 120.0):
+            analyze_bazi_cached(
+                generate_bazi_cache_key("1990-05-15", "10:30", longitude),
+                "1990-05-15", "10:30", float(longitude)
+            )
+        stats = get_analysis_cache_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 3)
+
+    def test_same_pillars_share_entry(self):
+        """同一时辰内不同出生时刻（四柱相同）共用一条缓存"""
+        a = calculate_bazi(datetime(1990, 5, 15, 9, 10))
+        b = calculate_bazi(datetime(1990, 5, 15, 10, 50))
+        self.assertEqual(bazi_pillar_key(a), bazi_pillar_key(b))
+        analyze_bazi_for_chart(a)
+        analyze_bazi_for_chart(b)
+        stats = get_analysis_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+        self.assertGreaterEqual(stats['max_size'], 1000)
+
+    def test_matches_direct_analysis(self):
+        """缓存结果与直接分析一致"""
+        bazi = calculate_bazi(datetime(1985, 12, 3, 23, 40), 116.4)
+        direct = analyze_bazi_enhanced(bazi)
+        cached = analyze_bazi_for_chart(bazi)
+        self.assertEqual(cached['strength_result'], direct['strength'])
+        self.assertEqual(cached['yong_shen_result'], direct['yong_shen'])
+
+    def test_outer_dict_is_fresh(self):
+        """替换返回结果中的用神不影响缓存"""
+        bazi = calculate_bazi(datetime(2000, 1, 1, 12, 0))
+        first = analyze_bazi_for_chart(bazi)
+        first['yong_shen_result'] = None
+        self.assertIsNotNone(analyze_bazi_for_chart(bazi)['yong_shen_result'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+命盘分析预计算表单元测试
+
+验证内容：
+1. 记录序号与四柱一一对应
+2. 查表结果与 analyze_bazi_enhanced 完全一致
+3. 未生成的记录、非正常排盘、停用预计算表时回退实时分析，缺表只提示一次
+4. 随仓库发布的预计算表存在且与当前分析逻辑一致
+"""
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.core.constants import WU_XING_MAP
+from api.core.lunar import calculate_bazi
+from api.core.bazi_engine import analyze_bazi_enhanced, analyze_bazi_for_chart
+from api.core.analysis_table import (
+    CHART_COUNT, DEFAULT_TABLE_PATH, AnalysisTable, _bazi_for_index, build_analysis_table, chart_index_for_bazi,
+    get_analysis_table, lookup_analysis, use_analysis_table
+)
+
+# 只生成两个年柱：庚午（1990）与 癸亥（1983/2043）
+BUILT_YEARS = (6, 59)
+
+
+class TestAnalysisTable(unittest.TestCase):
+    """预计算表测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmpdir, 'analysis_table.bin')
+        cls.written = build_analysis_table(cls.path, year_indices=BUILT_YEARS)
+        cls._table_path = use_analysis_table(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        use_analysis_table(cls._table_path)
+        shutil.rmtree(cls.tmpdir)
+
+    def test_chart_index_roundtrip(self):
+        """记录序号覆盖全部合法四柱且一一对应"""
+        seen = set()
+        for index in range(0, CHART_COUNT, 37):
+            year_idx, rest = divmod(index, 12 * 60 * 12)
+            month_offset, rest = divmod(rest, 60 * 12)
+            day_idx, hour_zhi = divmod(rest, 12)
+            bazi = _bazi_for_index(year_idx, month_offset, day_idx, hour_zhi)
+            self.assertEqual(chart_index_for_bazi(bazi), index)
+            seen.add(index)
+        self.assertEqual(len(seen), len(range(0, CHART_COUNT, 37)))
+
+    def test_lookup_matches_analysis(self):
+        """已生成年柱的每条记录与实时分析完全一致"""
+        self.assertEqual(self.written, len(BUILT_YEARS) * 12 * 60 * 12)
+        for year_idx in BUILT_YEARS:
+            for month_offset in range(12):
+                for day_idx in range(60):
+                    for hour_zhi in range(12):
+                        bazi = _bazi_for_index(year_idx, month_offset, day_idx, hour_zhi)
+                        self.assertEqual(lookup_analysis(bazi), analyze_bazi_enhanced(bazi))
+
+    def test_chart_service_path(self):
+        """analyze_bazi_for_chart 走预计算表，结果与直接分析一致"""
+        bazi = calculate_bazi(datetime(1990, 5, 15, 10, 30))
+        self.assertIsNotNone(lookup_analysis(bazi))
+        direct = analyze_bazi_enhanced(bazi)
+        result = analyze_bazi_for_chart(bazi)
+        self.assertEqual(result['strength_result'], direct['strength'])
+        self.assertEqual(result['yong_shen_result'], direct['yong_shen'])
+
+    def test_results_are_independent(self):
+        """每次查表返回新对象，修改不影响后续结果"""
+        bazi = calculate_bazi(datetime(1990, 5, 15, 10, 30))
+        first = lookup_analysis(bazi)
+        first['yong_shen']['favorable'].append('木')
+        first['strength']['details']['gen']['detail'] = ''
+        self.assertEqual(lookup_analysis(bazi), analyze_bazi_enhanced(bazi))
+
+    def test_missing_record_falls_back(self):
+        """未生成的年柱返回 None，analyze_bazi_for_chart 回退实时分析"""
+        bazi = calculate_bazi(datetime(2000, 1, 1, 12, 0))
+        self.assertIsNone(lookup_analysis(bazi))
+        direct = analyze_bazi_enhanced(bazi)
+        self.assertEqual(analyze_bazi_for_chart(bazi)['yong_shen_result'], direct['yong_shen'])
+
+    def test_irregular_chart_falls_back(self):
+        """月干与五虎遁不符的命盘不查表"""
+        bazi = calculate_bazi(datetime(1990, 5, 15, 10, 30))
+        bazi['month_gan'] = '甲' if bazi['month_gan'] != '甲' else '乙'
+        self.assertIsNone(chart_index_for_bazi(bazi))
+        self.assertIsNone(lookup_analysis(bazi))
+
+    def test_disabled_and_missing_file(self):
+        """停用或文件不存在时不加载预计算表"""
+        try:
+            use_analysis_table(None)
+            self.assertIsNone(get_analysis_table())
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                use_analysis_table(os.path.join(self.tmpdir, 'missing.bin'))
+                self.assertIsNone(get_analysis_table())
+                self.assertIsNone(get_analysis_table())
+            self.assertEqual(stderr.getvalue().count('预计算表不存在'), 1)
+        finally:
+            use_analysis_table(self.path)
+        self.assertIsNotNone(get_analysis_table())
+
+
+
+class TestShippedTable(unittest.TestCase):
+    """随仓库发布的预计算表"""
+
+    def test_shipped_table_is_current(self):
+        """表文件已提交且完整；抽样记录与实时分析一致，分析逻辑变化后需重新构建"""
+        self.assertTrue(os.path.exists(DEFAULT_TABLE_PATH),
+                        '预计算表缺失：运行 python -m api.core.analysis_table 并提交生成的文件')
+        table = AnalysisTable(DEFAULT_TABLE_PATH)
+        try:
+            rng = random.Random(0)
+            for index in rng.sample(range(CHART_COUNT), 300):
+                year_idx, rest = divmod(index, 12 * 60 * 12)
+                month_offset, rest = divmod(rest, 60 * 12)
+                day_idx, hour_zhi = divmod(rest, 12)
+                bazi = _bazi_for_index(year_idx, month_offset, day_idx, hour_zhi)
+                self.assertEqual(table.lookup(index, WU_XING_MAP[bazi['day_gan']]), analyze_bazi_enhanced(bazi))
+        finally:
+            table.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+干支万年历表单元测试
+
+验证内容：
+1. 表覆盖范围与日柱基准；按年生成，单日查询只生成当年
+2. 日柱列与基准日推算一致
+3. 流年/流月/流日走查表后输出不变
+4. 子、丑月月干按五虎遁延续到次年
+"""
+
+import os
+import sys
+import unittest
+from datetime import date, datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.core import calendar_table
+from api.core.calendar_table import JIA_ZI, jia_zi_index, lookup_pillar_indices
+from api.core.lunar import (
+    calculate_bazi, calculate_liu_nian, calculate_liu_ri, calculate_liu_yue, get_pillar_indices
+)
+
+
+class TestCalendarTable(unittest.TestCase):
+    """干支表测试"""
+
+    def test_jia_zi_index(self):
+        """干支序号与六十甲子表互逆"""
+        for i, gz in enumerate(JIA_ZI):
+            self.assertEqual(jia_zi_index(i % 10, i % 12), i, gz)
+
+    def test_table_range(self):
+        """表覆盖 1900-2100，范围外返回 None"""
+        self.assertIsNone(lookup_pillar_indices(date(1899, 12, 31).toordinal()))
+        self.assertIsNone(lookup_pillar_indices(date(2101, 1, 1).toordinal()))
+        self.assertEqual(JIA_ZI[lookup_pillar_indices(date(1900, 1, 1).toordinal())[2]], '甲戌')
+        self.assertEqual(JIA_ZI[lookup_pillar_indices(date(2100, 12, 31).toordinal())[2]],
+                         JIA_ZI[calendar_table.day_index_for_ordinal(date(2100, 12, 31).toordinal())])
+
+    def test_built_per_year(self):
+        """单日查询只生成当年的表"""
+        calendar_table.get_year_table.cache_clear()
+        lookup_pillar_indices(date(2026, 3, 5).toordinal())
+        self.assertEqual(calendar_table.get_year_table.cache_info().currsize, 1)
+        self.assertEqual(len(calendar_table.get_year_table(2024)), 366 * 3)
+
+    def test_known_day_pillars(self):
+        """已知日柱"""
+        cases = [
+            (date(1984, 1, 1), '甲午'),
+            (date(2000, 1, 1), '戊午'),
+            (date(2024, 1, 1), '甲子'),
+            (date(2025, 1, 31), '庚子'),
+        ]
+        for d, expected in cases:
+            self.assertEqual(calculate_liu_ri(d.year, d.month, d.day)['gan_zhi'], expected)
+
+    def test_year_switch_at_lichun(self):
+        """年柱在立春当日切换"""
+        self.assertEqual(JIA_ZI[get_pillar_indices(2025, 2, 2)[0]], '甲辰')
+        self.assertEqual(JIA_ZI[get_pillar_indices(2025, 2, 3)[0]], '乙巳')
+        self.assertEqual(calculate_liu_nian(2025)['gan_zhi'], '乙巳')
+
+    def test_day_column_matches_arithmetic(self):
+        """日柱列与基准日推算一致（按年抽样）"""
+        for year in range(1900, 2101, 7):
+            d = date(year, 1, 1)
+            while d.year == year:
+                indices = lookup_pillar_indices(d.toordinal())
+                self.assertEqual(indices[2], calendar_table.day_index_for_ordinal(d.toordinal()))
+                d += timedelta(days=1)
+
+    def test_zi_chou_month_stems(self):
+        """子、丑月为五虎遁第 11、12 个月（甲年：丙寅起 → 丙子、丁丑）"""
+        cases = [
+            (date(2024, 12, 10), '丙子'),
+            (date(2025, 1, 1), '丙子'),
+            (date(2025, 1, 10), '丁丑'),
+            (date(2025, 2, 3), '戊寅'),
+            (date(1985, 1, 10), '丁丑'),
+        ]
+        for d, expected in cases:
+            self.assertEqual(calculate_liu_yue(d.year, d.month, d.day)['gan_zhi'], expected, d)
+
+    def test_bazi_uses_table(self):
+        """八字排盘结果"""
+        bazi = calculate_bazi(datetime(1984, 2, 19, 10, 30), 116.4)
+        self.assertEqual(bazi['year'], '甲子')
+        self.assertEqual(bazi['month'], '丙寅')
+
+
+if __name__ == '__main__':
+    unittest.main()
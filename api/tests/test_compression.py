@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+响应压缩单元测试
+
+验证内容：
+1. Accept-Encoding 协商：q 值、*、q=0 排除、未知编码
+2. 超过阈值的响应按协商结果压缩，解压后与未压缩正文相同；小响应与不接受压缩的请求不压缩
+3. 压缩后的响应带 Content-Length、保持连接；204 / 304 不带正文相关的头
+4. 压缩表示的 ETag 带编码后缀，带回后缀 ETag 同样返回 304
+"""
+
+import gzip
+import io
+import json
+import os
+import sys
+import unittest
+from email.parser import BytesHeaderParser
+from unittest import mock
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api import index
+from api.index import handler, negotiate_encoding
+
+MONTH_BODY = {'birthDate': '1990-05-15', 'birthTime': '08:30', 'year': 2026, 'month': 3}
+
+
+def send(method, path, body=None, headers=None):
+    """不经套接字调用入口，返回 (状态码, 响应头, 正文字节, handler)"""
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    h = handler.__new__(handler)
+    h.path, h.command, h.request_version = path, method, 'HTTP/1.1'
+    h.requestline, h.client_address = f'{method} {path} HTTP/1.1', ('127.0.0.1', 0)
+    h.headers = dict({'Content-Length': str(len(payload)), 'Content-Type': 'application/json'}, **(headers or {}))
+    h.rfile, h.wfile = io.BytesIO(payload), io.BytesIO()
+    h.close_connection = False
+    getattr(h, 'do_' + method)()
+    head, _, raw = h.wfile.getvalue().partition(b'\r\n\r\n')
+    status_line, _, header_block = head.partition(b'\r\n')
+    return int(status_line.split(b' ', 2)[1]), BytesHeaderParser().parsebytes(header_block), raw, h
+
+
+class TestNegotiation(unittest.TestCase):
+    """Accept-Encoding 协商测试"""
+
+    def test_negotiate(self):
+        preferred = index.SUPPORTED_ENCODINGS[0]
+        self.assertEqual(negotiate_encoding('gzip'), 'gzip')
+        self.assertEqual(negotiate_encoding('gzip, deflate, br'), preferred)
+        self.assertEqual(negotiate_encoding('x-gzip'), 'gzip')
+        self.assertEqual(negotiate_encoding('*'), preferred)
+        self.assertEqual(negotiate_encoding('br;q=0.5, gzip;q=0.8'), 'gzip')
+        self.assertEqual(negotiate_encoding('*;q=0.1, gzip;q=0'), 'br' if 'br' in index.SUPPORTED_ENCODINGS else None)
+        for value in (None, '', 'identity', 'deflate', 'gzip;q=0', 'gzip; q=bad'):
+            self.assertIsNone(negotiate_encoding(value), value)
+
+
+class TestCompression(unittest.TestCase):
+    """响应压缩测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.status, cls.plain_headers, cls.plain, _ = send('POST', '/api/fortune-month', MONTH_BODY)
+        assert cls.status == 200 and len(cls.plain) >= index.COMPRESS_MIN_BYTES
+
+    def test_gzip(self):
+        status, headers, raw, _ = send('POST', '/api/fortune-month', MONTH_BODY, {'Accept-Encoding': 'gzip'})
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(headers['Content-Length']), len(raw))
+        self.assertLess(len(raw), len(self.plain))
+        self.assertEqual(gzip.decompress(raw), self.plain)
+
+    def test_not_compressed(self):
+        """不接受压缩、正文低于阈值时原样发送"""
+        self.assertIsNone(self.plain_headers['Content-Encoding'])
+        self.assertEqual(self.plain_headers['Vary'], 'Accept-Encoding')
+        _, headers, raw, _ = send('POST', '/api/fortune-month', MONTH_BODY, {'Accept-Encoding': 'identity'})
+        self.assertIsNone(headers['Content-Encoding'])
+        self.assertEqual(raw, self.plain)
+        status, headers, raw, _ = send('GET', '/api/unknown', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(status, 404)
+        self.assertIsNone(headers['Content-Encoding'])
+        self.assertFalse(json.loads(raw)['success'])
+
+    def test_keep_alive(self):
+        """大正文同样一次压缩：带 Content-Length，不关闭连接"""
+        with mock.patch.object(index, 'COMPRESS_MIN_BYTES', 0):
+            _, headers, raw, h = send('POST', '/api/fortune-month', MONTH_BODY, {'Accept-Encoding': 'gzip'})
+        self.assertEqual(int(headers['Content-Length']), len(raw))
+        self.assertIsNone(headers['Connection'])
+        self.assertFalse(h.close_connection)
+        self.assertEqual(gzip.decompress(raw), self.plain)
+
+    def test_no_body_headers(self):
+        """204 与 304 不带 Content-Length、Content-Type"""
+        status, headers, raw, _ = send('OPTIONS', '/api/fortune')
+        self.assertEqual((status, raw), (204, b''))
+        path = '/api/almanac/2026-03-05'
+        etag = send('GET', path)[1]['ETag']
+        status304, headers304, raw304, _ = send('GET', path, headers={'If-None-Match': etag})
+        self.assertEqual((status304, raw304), (304, b''))
+        for response_headers in (headers, headers304):
+            self.assertIsNone(response_headers['Content-Length'])
+            self.assertIsNone(response_headers['Content-Type'])
+
+    def test_level(self):
+        """压缩级别只影响压缩率，解压结果相同"""
+        sizes = []
+        for level in (1, 9):
+            with mock.patch.object(index, 'GZIP_LEVEL', level):
+                _, _, raw, _ = send('POST', '/api/fortune-month', MONTH_BODY, {'Accept-Encoding': 'gzip'})
+            self.assertEqual(gzip.decompress(raw), self.plain)
+            sizes.append(len(raw))
+        self.assertLessEqual(sizes[1], sizes[0])
+
+    @unittest.skipIf(index.brotli is None, 'brotli 未安装')
+    def test_brotli(self):
+        _, headers, raw, _ = send('POST', '/api/fortune-month', MONTH_BODY, {'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(headers['Content-Encoding'], 'br')
+        self.assertEqual(index.brotli.decompress(raw), self.plain)
+
+    def test_etag_variants(self):
+        """压缩后 ETag 带 -gzip 后缀，带回后缀或原 ETag 都返回 304"""
+        path = '/api/almanac/2026-03-05'
+        _, plain_headers, _, _ = send('GET', path)
+        with mock.patch.object(index, 'COMPRESS_MIN_BYTES', 0):
+            _, headers, raw, _ = send('GET', path, headers={'Accept-Encoding': 'gzip'})
+        etag = plain_headers['ETag']
+        self.assertEqual(headers['ETag'], index.encoded_etag(etag, 'gzip'))
+        self.assertEqual(json.loads(gzip.decompress(raw))['data']['date'], '2026-03-05')
+        for tag in (etag, headers['ETag']):
+            status, headers304, raw, _ = send('GET', path, headers={'If-None-Match': tag, 'Accept-Encoding': 'gzip'})
+            self.assertEqual((status, raw), (304, b''))
+            self.assertEqual(headers304['ETag'], tag)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+运势接口条件请求单元测试
+
+验证内容：
+1. /fortune、/fortune-year、/fortune-month、/fortune-shichen 响应带强 ETag 与 Cache-Control，GET 查询参数与 POST 结果相同
+2. GET / HEAD 的 If-None-Match 命中（含 W/ 弱比较）时返回 304，不运行流水线；POST 不带缓存校验头、忽略 If-None-Match
+3. ETag 随输入、接口与 ENGINE_VERSION 变化，等价写法与缺省值得到相同 ETag；缺省日期时改为每次回源验证
+4. 输出指纹：固定输入的响应有变化而 ENGINE_VERSION 未递增时失败
+"""
+
+import datetime
+import hashlib
+import importlib
+import io
+import json
+import os
+import sys
+import unittest
+from email.parser import BytesHeaderParser
+from unittest import mock
+from urllib.parse import urlencode
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.index import SUFFIX_ROUTES, handler
+
+# 与入口分发时使用的是同一份模块，mock 才对入口生效
+fortune_service = importlib.import_module(SUFFIX_ROUTES['/fortune'].module)
+fortune_pipeline = importlib.import_module(fortune_service.FortunePipeline.__module__)
+
+BIRTH = {'birthDate': '1990-05-15', 'birthTime': '08:30'}
+REQUESTS = [
+    ('/api/fortune', dict(BIRTH, date='2026-03-05')),
+    ('/api/fortune-year', dict(BIRTH, year='2026')),
+    ('/api/fortune-month', dict(BIRTH, year='2026', month='3')),
+    ('/api/fortune-shichen', dict(BIRTH, date='2026-03-05')),
+]
+
+# ENGINE_VERSION -> REQUESTS 响应 data 的摘要；输出有意变化时递增 ENGINE_VERSION 并在此登记新指纹
+ENGINE_FINGERPRINTS = {
+    '5.1': '4b7b482b687e54e759136621b07bd3f49cfa405b5716c3e7869120823367af8a',
+    # 5.2：大运按真太阳时排；指纹自此起含 /fortune-shichen
+    '5.2': 'd65b864ddff68d9ecbb268df48ceff1a29f4ae6b9daa11411fcf53c307b98da8',
+}
+
+
+def send(method, path, body=None, headers=None):
+    """不经套接字调用入口，返回 (状态码, 响应头, 正文字节)"""
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    h = handler.__new__(handler)
+    h.path, h.command, h.request_version = path, method, 'HTTP/1.1'
+    h.requestline, h.client_address = f'{method} {path} HTTP/1.1', ('127.0.0.1', 0)
+    h.headers = dict({'Content-Length': str(len(payload)), 'Content-Type': 'application/json'}, **(headers or {}))
+    h.rfile, h.wfile = io.BytesIO(payload), io.BytesIO()
+    h._handle_request(method)
+    head, _, raw = h.wfile.getvalue().partition(b'\r\n\r\n')
+    status_line, _, header_block = head.partition(b'\r\n')
+    return int(status_line.split(b' ', 2)[1]), BytesHeaderParser().parsebytes(header_block), raw
+
+
+def get(path, params, headers=None):
+    return send('GET', f'{path}?{urlencode(params, doseq=True)}', headers=headers)
+
+
+def service_etag(path, data):
+    """直接调用接口服务取 ETag（JSON 类型的参数，如布尔与数字）"""
+    route = SUFFIX_ROUTES['/' + path.rsplit('/', 1)[1]]
+    return route.target()(data)['etag']
+
+
+class TestConditional(unittest.TestCase):
+    """运势接口 ETag 与条件请求测试"""
+
+    def test_get_matches_post(self):
+        for path, params in REQUESTS:
+            status, headers, raw = get(path, params)
+            self.assertEqual(status, 200, path)
+            self.assertEqual(headers['Cache-Control'], fortune_service.FORTUNE_CACHE_CONTROL)
+            self.assertRegex(headers['ETag'], r'^"[0-9a-f]{32}"$')
+            self.assertIn('Server-Timing', headers)
+            _, post_headers, post_raw = send('POST', path, params)
+            self.assertEqual(json.loads(raw), json.loads(post_raw), path)
+            self.assertIsNone(post_headers['ETag'])
+            self.assertEqual(post_headers['Cache-Control'], 'no-store')
+
+    def test_not_modified_skips_pipeline(self):
+        for path, params in REQUESTS:
+            _, headers, _ = get(path, params)
+            with mock.patch.object(fortune_pipeline, 'calculate_bazi') as bazi:
+                status, headers304, raw = get(path, params, {'If-None-Match': f'"stale", {headers["ETag"]}'})
+            bazi.assert_not_called()
+            self.assertEqual((status, raw), (304, b''), path)
+            self.assertEqual(headers304['ETag'], headers['ETag'])
+            self.assertEqual(headers304['Cache-Control'], headers['Cache-Control'])
+            self.assertIsNone(headers304['Server-Timing'])
+
+            status, _, raw = get(path, params, {'If-None-Match': '"stale"'})
+            self.assertEqual(status, 200)
+            self.assertTrue(json.loads(raw)['success'])
+
+    def test_weak_comparison(self):
+        path, params = REQUESTS[0]
+        etag = get(path, params)[1]['ETag']
+        status, headers, raw = get(path, params, {'If-None-Match': f'W/{etag}'})
+        self.assertEqual((status, raw), (304, b''))
+        self.assertEqual(headers['ETag'], etag)
+
+    def test_post_ignores_if_none_match(self):
+        path, params = REQUESTS[0]
+        _, headers, raw = get(path, params)
+        status, post_headers, post_raw = send('POST', path, params, {'If-None-Match': headers['ETag']})
+        self.assertEqual(status, 200)
+        self.assertEqual(post_raw, raw)
+        self.assertIsNone(post_headers['ETag'])
+
+    def test_head(self):
+        """HEAD 与 GET 响应头相同、不带正文，同样处理 If-None-Match"""
+        path, params = REQUESTS[0]
+        query = f'{path}?{urlencode(params)}'
+        _, headers, raw = get(path, params)
+        status, head_headers, head_raw = send('HEAD', query)
+        self.assertEqual((status, head_raw), (200, b''))
+        self.assertEqual(head_headers['ETag'], headers['ETag'])
+        self.assertEqual(int(head_headers['Content-Length']), len(raw))
+        status, _, head_raw = send('HEAD', query, headers={'If-None-Match': headers['ETag']})
+        self.assertEqual((status, head_raw), (304, b''))
+
+    def test_etag_inputs(self):
+        path, params = REQUESTS[0]
+        etag = get(path, params)[1]['ETag']
+        self.assertNotEqual(get(path, dict(params, date='2026-03-06'))[1]['ETag'], etag)
+        self.assertNotEqual(get(path, dict(params, fields='totalScore'))[1]['ETag'], etag)
+        self.assertNotEqual(get(path, dict(params, gender='female'))[1]['ETag'], etag)
+        self.assertNotEqual(get('/fortune', params)[1]['ETag'], get('/fortune-year', params)[1]['ETag'])
+        with mock.patch.object(fortune_service, 'ENGINE_VERSION', 'next'):
+            self.assertNotEqual(get(path, params)[1]['ETag'], etag)
+
+    def test_etag_normalized(self):
+        """等价写法、显式默认值与未知参数不改变 ETag"""
+        path, params = REQUESTS[0]
+        etag = get(path, params)[1]['ETag']
+        for extra in ({'longitude': '120'}, {'longitude': '120.0'}, {'gender': 'male'}, {'utm': 'x'}):
+            self.assertEqual(get(path, dict(params, **extra))[1]['ETag'], etag, extra)
+        self.assertEqual(get(path, dict(params, fields='totalScore,liuRi'))[1]['ETag'],
+                         get(path, dict(params, fields='liuRi,totalScore'))[1]['ETag'])
+
+        self.assertEqual(service_etag(path, dict(params, longitude=120)), etag)
+        self.assertEqual(service_etag(path, dict(params, customYongShen='木')),
+                         service_etag(path, dict(params, customYongShen=['木'])))
+
+        noon = dict(params, birthTime='12:00')
+        self.assertEqual(get(path, {k: v for k, v in noon.items() if k != 'birthTime'})[1]['ETag'],
+                         get(path, noon)[1]['ETag'])
+
+        month_path, month_params = REQUESTS[2]
+        flagged = get(month_path, dict(month_params, includeDimensions='true'))[1]['ETag']
+        self.assertEqual(service_etag(month_path, dict(month_params, includeDimensions=True)), flagged)
+        self.assertEqual(service_etag(month_path, dict(month_params, includeDimensions='true')), flagged)
+        self.assertEqual(service_etag(month_path, dict(month_params, includeDimensions='false')),
+                         get(month_path, month_params)[1]['ETag'])
+
+    def test_implicit_date(self):
+        """缺省日期按当天计算：每次回源验证，ETag 与显式传入当天日期的相同"""
+        _, headers, _ = get('/api/fortune', BIRTH)
+        self.assertEqual(headers['Cache-Control'], fortune_service.FORTUNE_CACHE_CONTROL_TODAY)
+        _, today_headers, _ = get('/api/fortune', dict(BIRTH, date=datetime.date.today().isoformat()))
+        self.assertEqual(today_headers['Cache-Control'], fortune_service.FORTUNE_CACHE_CONTROL)
+        self.assertEqual(headers['ETag'], today_headers['ETag'])
+
+    def test_errors_not_cached(self):
+        status, headers, _ = get('/api/fortune', {'date': '2026-03-05'})
+        self.assertEqual(status, 400)
+        self.assertIsNone(headers['ETag'])
+        status, headers, _ = get('/api/fortune-month', dict(BIRTH, year='2026', month='13'))
+        self.assertEqual(status, 400)
+        self.assertIsNone(headers['ETag'])
+
+    def test_engine_fingerprint(self):
+        """固定输入的输出变化必须伴随 ENGINE_VERSION 递增，否则客户端会继续用旧缓存"""
+        digest = hashlib.sha256()
+        for path, params in REQUESTS:
+            data = json.loads(get(path, params)[2])['data']
+            digest.update(json.dumps(data, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        self.assertEqual(ENGINE_FINGERPRINTS.get(fortune_service.ENGINE_VERSION), digest.hexdigest(),
+                         '运势输出已变化：请递增 core/fortune_engine.ENGINE_VERSION 并登记新指纹')
+
+
+if __name__ == '__main__':
+    unittest.main()
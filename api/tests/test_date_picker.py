@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+择日推荐单元测试
+
+验证内容：
+1. 流式 topN 堆选出的推荐与对完整时间线排序取前 N 相同
+2. 流式汇总统计与对完整时间线统计相同（含只剩 1、2 天的边界）
+3. 长区间（最长 730 天）与时间线模式 full / compact / none
+"""
+
+import datetime
+import os
+import sys
+import unittest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services.date_picker_service import DatePickerService, MAX_RANGE_DAYS
+
+BIRTH = {'birthDate': '1990-05-15', 'birthTime': '10:30', 'longitude': 116.4, 'gender': 'female'}
+
+
+def reference_summary(timeline, recommendations, failed_days):
+    """对完整时间线的参考统计（与流式统计前的实现相同）"""
+    ordered = sorted(timeline, key=lambda x: x["date"])
+    best = recommendations[0]
+    worst = min(timeline, key=lambda x: x["purposeScore"])
+    first_half = ordered[: max(1, len(ordered) // 2)]
+    second_half = ordered[len(ordered) // 2:]
+    first_avg = sum(x["purposeScore"] for x in first_half) / len(first_half)
+    second_avg = sum(x["purposeScore"] for x in second_half) / max(1, len(second_half))
+    if second_avg > first_avg + 4:
+        trend = "rising"
+    elif first_avg > second_avg + 4:
+        trend = "falling"
+    else:
+        trend = "stable"
+    return {
+        "bestDate": best["date"],
+        "bestScore": best["purposeScore"],
+        "worstDate": worst["date"],
+        "worstScore": worst["purposeScore"],
+        "trend": trend,
+        "averageConfidence": int(sum(x["confidence"] for x in timeline) / max(1, len(timeline))),
+        "failedDays": failed_days,
+    }
+
+
+def rank_key(candidate):
+    return (-candidate["purposeScore"], -candidate["totalScore"], candidate["riskWeight"], candidate["date"])
+
+
+class TestDatePicker(unittest.TestCase):
+    """择日推荐测试"""
+
+    def recommend(self, **kwargs):
+        result = DatePickerService.handle_recommend_request(dict(BIRTH, **kwargs))
+        self.assertEqual(result['code'], 200, result.get('error'))
+        return result['data']
+
+    def test_heap_matches_full_sort(self):
+        """两年窗口：堆选 topN 与完整排序一致，统计一致"""
+        for purpose, top_n in (('opening', 20), ('romance', 3), ('other', 10)):
+            data = self.recommend(startDate='2026-01-01', rangeDays=730, purpose=purpose,
+                                  topN=top_n, timelineMode='full')
+            timeline = data['timeline']
+            self.assertEqual(len(timeline), 730)
+            self.assertEqual([c['date'] for c in timeline], sorted(c['date'] for c in timeline))
+            self.assertEqual(data['recommendations'], sorted(timeline, key=rank_key)[:top_n])
+            self.assertEqual(data['summary'], reference_summary(timeline, data['recommendations'], 0))
+
+    def test_few_days_summary(self):
+        """筛选后只剩 1、2 天时统计与完整统计一致"""
+        start = datetime.date(2026, 5, 1)
+        days = [(start + datetime.timedelta(days=i)).strftime('%Y-%m-%d') for i in range(3)]
+        for keep in (1, 2):
+            data = self.recommend(startDate='2026-05-01', rangeDays=3, excludedDates=days[keep:])
+            self.assertEqual(data['scannedDays'], keep)
+            self.assertEqual(data['summary'],
+                             reference_summary(data['timeline'], data['recommendations'], 0))
+
+    def test_timeline_modes(self):
+        """长区间默认紧凑时间线；可显式指定 full / none"""
+        data = self.recommend(startDate='2026-01-01', rangeDays=365)
+        self.assertEqual(data['rangeDays'], 365)
+        self.assertEqual(len(data['timeline']), 365)
+        self.assertEqual(set(data['timeline'][0]), {'date', 'totalScore', 'purposeScore', 'riskLevel'})
+        self.assertEqual(len(data['recommendations']), 10)
+        self.assertIn('mainTheme', data['recommendations'][0])
+
+        short = self.recommend(startDate='2026-01-01', rangeDays=30)
+        self.assertIn('mainTheme', short['timeline'][0])
+
+        none = self.recommend(startDate='2026-01-01', rangeDays=365, timelineMode='none')
+        self.assertEqual(none['timeline'], [])
+        self.assertEqual(none['summary'], data['summary'])
+        self.assertEqual(none['recommendations'], data['recommendations'])
+
+    def test_range_clamped(self):
+        """区间上限 730 天"""
+        data = self.recommend(startDate='2026-01-01', rangeDays=5000, timelineMode='none')
+        self.assertEqual(data['rangeDays'], MAX_RANGE_DAYS)
+        self.assertEqual(data['scannedDays'], MAX_RANGE_DAYS)
+
+    def test_all_days_filtered(self):
+        """全部日期被筛掉时返回 400"""
+        result = DatePickerService.handle_recommend_request(
+            dict(BIRTH, startDate='2026-05-04', rangeDays=3, weekendPolicy='weekend_only'))
+        self.assertEqual(result['code'], 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
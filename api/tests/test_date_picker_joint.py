@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+多人合择单元测试
+
+验证内容：
+1. 合择的总分、六维、用途分等于各人单独择日结果按 min / mean / weighted 聚合
+2. 流年流月流日每个日期只算一次，各命盘共用
+3. 参数校验：缺出生日期、权重非正、人数超限
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services import date_picker_service
+from api.services.date_picker_service import DatePickerService, MAX_JOINT_PROFILES
+
+PROFILES = [
+    {'birthDate': '1990-05-15', 'birthTime': '10:30', 'longitude': 116.4, 'gender': 'female', 'weight': 1},
+    {'birthDate': '1988-11-02', 'birthTime': '21:15', 'longitude': 121.5, 'gender': 'male', 'weight': 3},
+]
+WINDOW = {'startDate': '2026-03-01', 'rangeDays': 45, 'purpose': 'marriage', 'timelineMode': 'full'}
+
+
+class TestJointDatePicker(unittest.TestCase):
+    """多人合择测试"""
+
+    def recommend(self, data):
+        result = DatePickerService.handle_recommend_request(data)
+        self.assertEqual(result['code'], 200, result.get('error'))
+        return result['data']
+
+    def test_aggregates_match_single_runs(self):
+        """各聚合方式与逐人单独择日的结果一致"""
+        singles = [
+            {c['date']: c for c in self.recommend(dict(profile, **WINDOW))['timeline']}
+            for profile in PROFILES
+        ]
+        weights = [p['weight'] for p in PROFILES]
+        combine = {
+            'min': min,
+            'mean': lambda values: int(round(sum(values) / len(values))),
+            'weighted': lambda values: int(round(sum(v * w for v, w in zip(values, weights)) / sum(weights))),
+        }
+        for aggregate, fn in combine.items():
+            data = self.recommend(dict(WINDOW, profiles=PROFILES, aggregate=aggregate))
+            self.assertEqual((data['mode'], data['aggregate'], data['profileCount']), ('joint', aggregate, 2))
+            self.assertEqual(len(data['timeline']), WINDOW['rangeDays'])
+            for entry in data['timeline']:
+                members = [single[entry['date']] for single in singles]
+                self.assertEqual(entry['totalScore'], fn([m['totalScore'] for m in members]))
+                self.assertEqual(entry['purposeScore'], fn([m['purposeScore'] for m in members]))
+                for key, value in entry['dimensions'].items():
+                    self.assertEqual(value, fn([m['dimensions'][key] for m in members]))
+                self.assertEqual([m['purposeScore'] for m in entry['members']],
+                                 [m['purposeScore'] for m in members])
+                self.assertEqual(entry['liu'], members[0]['liu'])
+                self.assertNotIn('mainTheme', entry)
+
+    def test_date_context_shared(self):
+        """每个日期的流年流月流日只算一次"""
+        calls = []
+        real = date_picker_service.date_pillar_indices
+
+        def spy(dates):
+            calls.extend(dates)
+            return real(dates)
+
+        with mock.patch.object(date_picker_service, 'date_pillar_indices', spy):
+            data = self.recommend(dict(WINDOW, profiles=PROFILES * 3, timelineMode='none'))
+        self.assertEqual(data['profileCount'], 6)
+        self.assertEqual(len(calls), data['scannedDays'])
+        self.assertEqual(len(set(calls)), len(calls))
+
+    def test_single_profile_list(self):
+        """profiles 只有一人时等同单人择日"""
+        joint = self.recommend(dict(WINDOW, profiles=PROFILES[:1]))
+        single = self.recommend(dict(PROFILES[0], **WINDOW))
+        self.assertNotIn('mode', joint)
+        self.assertEqual(joint, single)
+
+    def test_validation(self):
+        """缺出生日期、权重非正、人数超限返回 400"""
+        cases = [
+            [PROFILES[0], {'birthTime': '08:00'}],
+            [PROFILES[0], dict(PROFILES[1], weight=0)],
+            [PROFILES[0]] * (MAX_JOINT_PROFILES + 1),
+        ]
+        for profiles in cases:
+            result = DatePickerService.handle_recommend_request(dict(WINDOW, profiles=profiles))
+            self.assertEqual(result['code'], 400)
+        result = DatePickerService.handle_recommend_request(dict(WINDOW, profiles=cases[0]))
+        self.assertIn('第 2 人', result['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
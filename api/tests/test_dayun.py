@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+大运计算单元测试
+
+验证内容：
+1. 大运时间轴按年份二分查找
+2. 同一命盘只计算一次时间轴；经度按真太阳时校准
+3. 内置排大运与 lunar_python 结果一致，且不导入 lunar_python
+"""
+
+import os
+import random
+import subprocess
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from api.core.lunar import (
+    DaYunTimeline, adjust_time_for_longitude, calculate_dayun, get_dayun_timeline, LUNAR_PYTHON_AVAILABLE
+)
+
+
+class TestDaYunTimeline(unittest.TestCase):
+    """大运时间轴测试"""
+
+    def setUp(self):
+        self.timeline = DaYunTimeline([
+            (1998, 2007, '丙寅', 8),
+            (2008, 2017, '丁卯', 18),
+            (2018, 2027, '戊辰', 28),
+        ])
+
+    def test_find_inside_interval(self):
+        """区间内任意年份命中对应大运"""
+        self.assertEqual(self.timeline.find(1998)['gan_zhi'], '丙寅')
+        self.assertEqual(self.timeline.find(2017)['gan_zhi'], '丁卯')
+        result = self.timeline.find(2026)
+        self.assertEqual(result, {
+            'current_gan': '戊',
+            'current_zhi': '辰',
+            'gan_zhi': '戊辰',
+            'start_year': 2018,
+            'end_year': 2027,
+            'age': 28
+        })
+
+    def test_find_outside_timeline(self):
+        """起运前或超出最后一步大运返回 None"""
+        self.assertIsNone(self.timeline.find(1990))
+        self.assertIsNone(self.timeline.find(2028))
+
+
+class TestDaYunCache(unittest.TestCase):
+    """大运缓存测试"""
+
+    def test_timeline_computed_once(self):
+        """同一命盘逐年查询只计算一次时间轴"""
+        birth = datetime(1990, 5, 15, 10, 30)
+        get_dayun_timeline.cache_clear()
+        results = [calculate_dayun(birth, year, 'female', 116.4) for year in range(2000, 2060)]
+        info = get_dayun_timeline.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertTrue(all(r is not None for r in results))
+
+    def test_longitude_true_solar_time(self):
+        """经度按真太阳时校准后再排大运，与 calculate_bazi 一致"""
+        for birth in (datetime(1990, 5, 1, 3, 0), datetime(1990, 5, 15, 10, 30)):
+            for longitude in (87.6, 116.4, 126.5):
+                adjusted = adjust_time_for_longitude(birth, longitude)
+                timeline = get_dayun_timeline(birth, 'male', longitude)
+                reference = get_dayun_timeline(adjusted, 'male', 120.0)
+                self.assertEqual(list(zip(timeline.start_years, timeline.gan_zhi)),
+                                 list(zip(reference.start_years, reference.gan_zhi)))
+        birth = datetime(1990, 5, 1, 3, 0)
+        self.assertNotEqual(calculate_dayun(birth, 2001, 'male', 87.6), calculate_dayun(birth, 2001, 'male', 120.0))
+
+    def test_gender_changes_direction(self):
+        """性别不同，大运排法不同"""
+        birth = datetime(1990, 5, 15, 10, 30)
+        male = calculate_dayun(birth, 2030, 'male')
+        female = calculate_dayun(birth, 2030, 'female')
+        self.assertNotEqual(male['gan_zhi'], female['gan_zhi'])
+
+
+class TestNativeDaYun(unittest.TestCase):
+    """内置大运计算测试"""
+
+    def test_known_chart(self):
+        """1990-05-15 10:30 男命：庚午年阳男顺排，辛巳月起"""
+        timeline = get_dayun_timeline(datetime(1990, 5, 15, 10, 30), 'male', 120.0, 'native')
+        self.assertEqual(len(timeline), 9)
+        self.assertEqual(timeline.gan_zhi[:3], ('壬午', '癸未', '甲申'))
+        self.assertEqual(timeline.find(2030)['gan_zhi'], '乙酉')
+        self.assertEqual(timeline.find(2030)['start_year'], 2027)
+
+    def test_native_does_not_import_lunar_python(self):
+        """内置后端不依赖 lunar_python（在独立进程中检查，避免受其他测试影响）"""
+        code = (
+            "import sys\n"
+            "from datetime import datetime\n"
+            "from api.core.lunar import calculate_dayun\n"
+            "assert calculate_dayun(datetime(1975, 11, 2, 23, 15), 2000, 'female') is not None\n"
+            "print('lunar_python' in sys.modules)\n"
+        )
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=PROJECT_ROOT, text=True)
+        self.assertEqual(output.strip(), 'False')
+
+    @unittest.skipUnless(LUNAR_PYTHON_AVAILABLE, "需要 lunar_python")
+    def test_matches_lunar_python(self):
+        """随机命盘与 lunar_python 排出的大运完全一致"""
+        rng = random.Random(20240601)
+        for _ in range(300):
+            birth = datetime(1901, 3, 1) + timedelta(minutes=rng.randrange(199 * 365 * 1440))
+            gender = rng.choice(['male', 'female'])
+            native = get_dayun_timeline(birth, gender, 120.0, 'native')
+            reference = get_dayun_timeline(birth, gender, 120.0, 'lunar_python')
+            self.assertEqual(
+                list(zip(native.start_years, native.end_years, native.gan_zhi, native.start_ages)),
+                list(zip(reference.start_years, reference.end_years, reference.gan_zhi, reference.start_ages)),
+                f"{birth} {gender}"
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+批量评分单元测试
+
+验证内容：
+1. 批量总分与逐日调用 calculate_fortune_score_v5 完全一致
+2. 大运可整体传入或逐日传入
+3. 参数长度校验
+4. 命盘分数表按命盘缓存，查表结果与单日评分一致
+"""
+
+import os
+import sys
+import unittest
+from datetime import date, datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.core.lunar import (
+    calculate_bazi, calculate_dayun, calculate_liu_nian, calculate_liu_ri, calculate_liu_yue,
+    get_pillar_indices
+)
+from api.core.calendar_table import year_index_for
+from api.core.bazi_engine import analyze_bazi_enhanced
+from api.core.fortune_engine import (
+    _build_chart_score_table, calculate_fortune_score_v5, calculate_fortune_score_v5_batch,
+    get_chart_score_table
+)
+
+
+def _prepare_chart(birth_dt):
+    """排盘并构造评分所需的 element_analysis / yongshen"""
+    bazi = calculate_bazi(birth_dt, 120.0)
+    analysis = analyze_bazi_enhanced(bazi)
+    level = analysis['strength'].get('level', '中和')
+    element_analysis = {'pattern': {'身弱': 'Weak', '身旺': 'Strong'}.get(level, 'Neutral')}
+    return bazi, element_analysis, analysis['yong_shen']
+
+
+def _indices_for(days):
+    """日期序列 → 流年/流月/流日序号"""
+    pillars = [get_pillar_indices(d.year, d.month, d.day) for d in days]
+    return (
+        [year_index_for(d.year) for d in days],
+        [p[1] for p in pillars],
+        [p[2] for p in pillars],
+    )
+
+
+class TestFortuneBatch(unittest.TestCase):
+    """批量评分测试"""
+
+    BIRTHS = [
+        datetime(1990, 5, 15, 10, 30),
+        datetime(1985, 12, 3, 23, 40),
+        datetime(2001, 2, 4, 6, 0),
+    ]
+
+    def _scalar_scores(self, chart, days, dayuns):
+        bazi, element_analysis, yongshen = chart
+        return [
+            calculate_fortune_score_v5(
+                bazi, element_analysis, yongshen,
+                calculate_liu_nian(d.year),
+                calculate_liu_yue(d.year, d.month, d.day),
+                calculate_liu_ri(d.year, d.month, d.day),
+                dayun=dy
+            )['total_score']
+            for d, dy in zip(days, dayuns)
+        ]
+
+    def test_matches_scalar_for_a_year(self):
+        """一整年逐日总分与单日评分一致（逐日大运）"""
+        days = [date(2025, 1, 1) + timedelta(days=i) for i in range(365)]
+        for birth in self.BIRTHS:
+            chart = _prepare_chart(birth)
+            dayuns = [calculate_dayun(birth, d.year, 'male') for d in days]
+            batch = calculate_fortune_score_v5_batch(*chart, *_indices_for(days), dayun=dayuns)
+            self.assertEqual(list(batch), self._scalar_scores(chart, days, dayuns), birth)
+
+    def test_single_dayun(self):
+        """整体传入大运与逐日传入相同大运结果一致"""
+        birth = self.BIRTHS[0]
+        chart = _prepare_chart(birth)
+        days = [date(2030, 3, 1) + timedelta(days=i) for i in range(60)]
+        dayun = calculate_dayun(birth, 2030, 'female')
+        batch = calculate_fortune_score_v5_batch(*chart, *_indices_for(days), dayun=dayun)
+        self.assertEqual(list(batch), self._scalar_scores(chart, days, [dayun] * len(days)))
+
+    def test_length_mismatch(self):
+        """序列长度不一致时报错"""
+        chart = _prepare_chart(self.BIRTHS[0])
+        with self.assertRaises(ValueError):
+            calculate_fortune_score_v5_batch(*chart, [0, 1], [0, 1], [0])
+        with self.assertRaises(ValueError):
+            calculate_fortune_score_v5_batch(*chart, [0], [0], [0], dayun=[None, None])
+
+
+class TestChartScoreTable(unittest.TestCase):
+    """命盘分数表测试"""
+
+    def test_cached_per_chart(self):
+        """同一命盘多次批量评分只生成一次分数表，用神不同则另建"""
+        bazi, element_analysis, yongshen = _prepare_chart(datetime(1992, 8, 8, 8, 8))
+        days = [date(2026, 1, 1) + timedelta(days=i) for i in range(400)]
+        _build_chart_score_table.cache_clear()
+        for start in range(0, len(days), 50):
+            calculate_fortune_score_v5_batch(bazi, element_analysis, yongshen, *_indices_for(days[start:start + 50]))
+        self.assertEqual(_build_chart_score_table.cache_info().misses, 1)
+
+        custom = dict(yongshen, primary='水', favorable=['水', '木'], unfavorable=['火'])
+        self.assertIsNot(get_chart_score_table(bazi, element_analysis, custom),
+                         get_chart_score_table(bazi, element_analysis, yongshen))
+
+    def test_lookup_matches_breakdown(self):
+        """分数表各分量与单日评分明细一致"""
+        bazi, element_analysis, yongshen = _prepare_chart(datetime(1978, 10, 1, 4, 0))
+        table = get_chart_score_table(bazi, element_analysis, yongshen)
+        d = date(2027, 6, 18)
+        year_idx, month_idx, day_idx = [idx[0] for idx in _indices_for([d])]
+        result = calculate_fortune_score_v5(
+            bazi, element_analysis, yongshen,
+            calculate_liu_nian(d.year), calculate_liu_yue(d.year, d.month, d.day),
+            calculate_liu_ri(d.year, d.month, d.day)
+        )
+        breakdown = result['breakdown']
+        self.assertEqual(round(table.liunian[year_idx], 1), breakdown['liunian'])
+        self.assertEqual(round(table.liuyue[month_idx], 1), breakdown['liuyue'])
+        self.assertEqual(round(table.liuri[day_idx], 1), breakdown['liuri'])
+        self.assertAlmostEqual(
+            table.day_total[day_idx],
+            table.liuri[day_idx] + breakdown['tiangan'] + breakdown['dizhi'] + breakdown['shensha'] + breakdown['ten_god']
+        )
+        self.assertEqual(table.score(year_idx, month_idx, day_idx), result['total_score'])
+
+
+if __name__ == '__main__':
+    unittest.main()
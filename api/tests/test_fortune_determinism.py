@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+评分确定性单元测试
+
+验证内容：
+1. 扰动值落在给定区间内且分布均匀
+2. 评分不读写全局 random 状态
+3. 不同 PYTHONHASHSEED 的进程得到相同分数
+4. 多线程并发评分结果与串行一致
+"""
+
+import os
+import random
+import subprocess
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+# 添加项目根目录到路径
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from api.core.lunar import calculate_bazi, calculate_liu_nian, calculate_liu_ri, calculate_liu_yue
+from api.core.bazi_engine import analyze_bazi_enhanced
+from api.core.fortune_engine import (
+    _jitter, calculate_fortune_score_month, calculate_fortune_score_v5, calculate_fortune_score_year,
+    make_jitter_key
+)
+
+BIRTH = datetime(1990, 5, 15, 10, 30)
+
+# 子进程内按固定日期打分，输出分数序列
+CHILD_CODE = """
+from datetime import date, timedelta
+from api.tests.test_fortune_determinism import score_days
+print(score_days([date(2025, 1, 1) + timedelta(days=i) for i in range(40)]))
+"""
+
+
+def score_days(days):
+    """对固定命盘逐日计算 (日分, 月分, 年分)"""
+    bazi = calculate_bazi(BIRTH, 120.0)
+    analysis = analyze_bazi_enhanced(bazi)
+    element_analysis = {'pattern': 'Weak' if analysis['strength'].get('level') == '身弱' else 'Neutral'}
+    yongshen = analysis['yong_shen']
+    results = []
+    for d in days:
+        args = (
+            bazi, element_analysis, yongshen,
+            calculate_liu_nian(d.year),
+            calculate_liu_yue(d.year, d.month, d.day),
+            calculate_liu_ri(d.year, d.month, d.day),
+        )
+        results.append((
+            calculate_fortune_score_v5(*args)['total_score'],
+            calculate_fortune_score_month(*args),
+            calculate_fortune_score_year(*args),
+        ))
+    return results
+
+
+class TestJitter(unittest.TestCase):
+    """扰动函数测试"""
+
+    def test_range_and_spread(self):
+        """扰动值覆盖 [low, high] 全部取值且大致均匀"""
+        counts = {}
+        for i in range(5000):
+            value = _jitter(make_jitter_key(7, i), 0, -2, 2)
+            counts[value] = counts.get(value, 0) + 1
+        self.assertEqual(sorted(counts), [-2, -1, 0, 1, 2])
+        self.assertTrue(all(800 < c < 1200 for c in counts.values()), counts)
+
+    def test_key_order_matters(self):
+        """键由各部分按顺序混合"""
+        self.assertEqual(make_jitter_key(1, 2, 3), make_jitter_key(1, 2, 3))
+        self.assertNotEqual(make_jitter_key(1, 2, 3), make_jitter_key(3, 2, 1))
+
+
+class TestScoreDeterminism(unittest.TestCase):
+    """评分确定性测试"""
+
+    DAYS = [date(2025, 1, 1) + timedelta(days=i) for i in range(40)]
+
+    def test_global_random_untouched(self):
+        """评分不改变全局随机状态"""
+        random.seed(12345)
+        expected = random.random()
+        random.seed(12345)
+        score_days(self.DAYS[:5])
+        self.assertEqual(random.random(), expected)
+
+    def test_stable_across_hash_seeds(self):
+        """不同 PYTHONHASHSEED 的进程分数一致"""
+        outputs = set()
+        for hash_seed in ('0', '1', '4242'):
+            env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+            outputs.add(subprocess.check_output(
+                [sys.executable, '-c', CHILD_CODE], cwd=PROJECT_ROOT, env=env, text=True
+            ))
+        self.assertEqual(len(outputs), 1)
+        self.assertEqual(outputs.pop().strip(), str(score_days(self.DAYS)))
+
+    def test_threads_match_serial(self):
+        """多线程并发评分与串行结果一致"""
+        serial = [score_days([d]) for d in self.DAYS]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            parallel = list(pool.map(lambda d: score_days([d]), self.DAYS))
+        self.assertEqual(parallel, serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+日运字段投影单元测试
+
+验证内容：
+1. 各字段子集与完整响应的对应部分相同
+2. 未请求的阶段（宜忌、主题、维度文案、分析序列化）不执行
+3. fields 解析（列表、逗号分隔字符串）与未知字段校验
+"""
+
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services import fortune_service
+from api.services.fortune_service import FORTUNE_FIELDS, FortuneService, parse_fields
+
+BIRTH = {'birthDate': '1990-05-15', 'birthTime': '10:30', 'longitude': 116.4, 'gender': 'female',
+         'date': '2026-03-05'}
+
+
+def fortune(**extra):
+    with redirect_stdout(io.StringIO()):
+        result = FortuneService.handle_fortune_request(dict(BIRTH, **extra))
+    return result
+
+
+class TestFortuneFields(unittest.TestCase):
+    """字段投影测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.full = fortune()['data']
+
+    def test_subsets_match_full(self):
+        """单个字段与字段组合都等于完整响应的对应部分"""
+        subsets = [[name] for name in FORTUNE_FIELDS if name != 'dimensionScores']
+        subsets += [['totalScore', 'mainTheme'], ['bazi', 'liuRi', 'todoList'], ['dimensions', 'liuNian']]
+        for names in subsets:
+            data = fortune(fields=names)['data']
+            expected = {key: self.full[key] for key in ('bazi', 'analysis') if key in names}
+            expected['fortune'] = {key: value for key, value in self.full['fortune'].items() if key in names}
+            self.assertEqual(data, expected, names)
+
+    def test_dimension_scores(self):
+        """dimensionScores 只含分数，与完整维度的分数一致（带或不带完整维度）"""
+        scores = {key: value['score'] for key, value in self.full['fortune']['dimensions'].items()}
+        for names in (['dimensionScores'], ['dimensionScores', 'dimensions']):
+            self.assertEqual(fortune(fields=names)['data']['fortune']['dimensionScores'], scores)
+        self.assertNotIn('dimensionScores', self.full['fortune'])
+
+    def test_skips_unrequested_stages(self):
+        """只要总分时不生成宜忌、主题、维度"""
+        with mock.patch.object(fortune_service, 'generate_todo') as todo, \
+                mock.patch.object(fortune_service, 'generate_main_theme') as theme, \
+                mock.patch.object(fortune_service, 'calculate_dimensions_v5') as dims, \
+                mock.patch.object(fortune_service, 'calculate_fortune_score_v5') as scalar:
+            result = fortune(fields='totalScore')
+        self.assertEqual(result['data'], {'fortune': {'totalScore': self.full['fortune']['totalScore']}})
+        for stage in (todo, theme, dims, scalar):
+            stage.assert_not_called()
+
+    def test_parse_and_validate(self):
+        self.assertIsNone(parse_fields(None))
+        self.assertIsNone(parse_fields(' , '))
+        self.assertEqual(parse_fields('totalScore, liuRi'), {'totalScore', 'liuRi'})
+        self.assertEqual(parse_fields(['mainTheme']), {'mainTheme'})
+        result = fortune(fields='totalScore,score')
+        self.assertEqual(result['code'], 400)
+        self.assertIn('score', result['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
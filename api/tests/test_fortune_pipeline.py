@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+运势流水线单元测试
+
+验证内容：
+1. 各阶段只计算一次，结果复用
+2. 阶段耗时记录与 Server-Timing 格式
+3. 日运、月运、择日、人生大图景同一请求内只排盘、分析一次
+"""
+
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from unittest import mock
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services import fortune_pipeline
+from api.services.fortune_pipeline import FortunePipeline
+from api.services.fortune_service import FortuneService
+from api.services.date_picker_service import DatePickerService
+from api.services.lifemap_service import LifeMapService
+
+BIRTH = {'birthDate': '1990-05-15', 'birthTime': '10:30', 'longitude': 116.4, 'gender': 'female'}
+
+
+class TestFortunePipeline(unittest.TestCase):
+    """流水线测试"""
+
+    def _patch_stage(self, name):
+        """以 wraps 方式监视流水线模块中的阶段函数"""
+        patcher = mock.patch.object(fortune_pipeline, name, wraps=getattr(fortune_pipeline, name))
+        spy = patcher.start()
+        self.addCleanup(patcher.stop)
+        return spy
+
+    def test_stages_memoized(self):
+        """重复访问不重新计算"""
+        bazi_spy = self._patch_stage('calculate_bazi')
+        analysis_spy = self._patch_stage('analyze_bazi_for_chart')
+        dayun_spy = self._patch_stage('calculate_dayun')
+        liu_ri_spy = self._patch_stage('calculate_liu_ri')
+
+        pipeline = FortunePipeline.from_request(BIRTH)
+        self.assertIs(pipeline.bazi, pipeline.bazi)
+        self.assertIs(pipeline.analysis, pipeline.analysis)
+        self.assertIs(pipeline.element_analysis, pipeline.element_analysis)
+        target = datetime(2026, 3, 5, 12, 0)
+        self.assertIs(pipeline.date_context(target), pipeline.date_context(datetime(2026, 3, 5, 18, 0)))
+        self.assertIs(pipeline.dayun(2026), pipeline.dayun(2026))
+
+        self.assertEqual(bazi_spy.call_count, 1)
+        self.assertEqual(analysis_spy.call_count, 1)
+        self.assertEqual(dayun_spy.call_count, 1)
+        self.assertEqual(liu_ri_spy.call_count, 1)
+
+    def test_custom_yongshen_applied(self):
+        """自定义用神在分析阶段套用"""
+        pipeline = FortunePipeline.from_request(dict(BIRTH, customYongShen=['水']))
+        self.assertTrue(pipeline.yongshen.get('is_custom'))
+        self.assertEqual(pipeline.yongshen['favorable'], ['水'])
+
+    def test_timings(self):
+        """各阶段耗时按阶段名记录，输出 Server-Timing 格式"""
+        pipeline = FortunePipeline.from_request(BIRTH)
+        pipeline.element_analysis
+        pipeline.date_context(datetime(2026, 3, 5))
+        pipeline.date_context(datetime(2026, 3, 6))
+        pipeline.dayun(2026)
+        self.assertEqual(set(pipeline.timings),
+                         {'parse', 'bazi', 'analysis', 'element_analysis', 'date_context', 'dayun'})
+        self.assertTrue(all(ms >= 0 for ms in pipeline.timings.values()))
+        header = pipeline.server_timing()
+        self.assertIn('bazi;dur=', header)
+        self.assertEqual(len(header.split(', ')), 6)
+
+    def test_handlers_compute_chart_once(self):
+        """单个请求内只排盘、分析一次，大运按年只查一次"""
+        cases = [
+            (FortuneService.handle_fortune_month_request, dict(BIRTH, year=2026, month=2)),
+            (DatePickerService.handle_recommend_request, dict(BIRTH, startDate='2026-12-20', rangeDays=20)),
+            (LifeMapService.handle_trends_request, dict(BIRTH, startYear=2024, years=6)),
+        ]
+        for handle, data in cases:
+            with self.subTest(handler=handle.__qualname__):
+                with mock.patch.object(fortune_pipeline, 'calculate_bazi',
+                                       wraps=fortune_pipeline.calculate_bazi) as bazi_spy, \
+                        mock.patch.object(fortune_pipeline, 'analyze_bazi_for_chart',
+                                          wraps=fortune_pipeline.analyze_bazi_for_chart) as analysis_spy, \
+                        mock.patch.object(fortune_pipeline, 'calculate_dayun',
+                                          wraps=fortune_pipeline.calculate_dayun) as dayun_spy, \
+                        redirect_stdout(io.StringIO()):
+                    result = handle(data)
+                self.assertEqual(result['code'], 200)
+                self.assertIn('bazi;dur=', result['timings'])
+                self.assertEqual(bazi_spy.call_count, 1)
+                self.assertEqual(analysis_spy.call_count, 1)
+                years = [call.args[1] for call in dayun_spy.call_args_list]
+                self.assertEqual(len(years), len(set(years)))
+
+    def test_missing_birth_date(self):
+        """缺少出生日期仍返回 400"""
+        self.assertEqual(FortuneService.handle_fortune_request({})['code'], 400)
+        self.assertEqual(FortuneService.handle_fortune_year_request({})['code'], 400)
+        self.assertEqual(FortuneService.handle_fortune_month_request({})['code'], 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+认证 / 同步路由响应单元测试
+
+验证内容：
+1. 路由返回 (状态码, 响应体)，响应体不含 code
+2. 入口写出的状态码与正文字节，与原先 "dumps → loads → pop code" 往返后的响应体编码结果逐字节相同
+"""
+
+import importlib
+import io
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.index import PREFIX_ROUTES, handler
+from api.utils.json_utils import dumps_response
+
+# 与入口分发时使用的是同一份模块，mock 才对入口生效
+auth_routes = importlib.import_module(PREFIX_ROUTES['/api/auth'].module)
+sync_routes = importlib.import_module(PREFIX_ROUTES['/api/sync'].module)
+
+USER = {'id': 'u1', 'email': 'a@example.com', 'sync_enabled': True}
+TOKEN = {'Authorization': 'Bearer token'}
+
+
+def legacy_body(status, data):
+    """原流程：路由写入 code 后序列化，入口解析、弹出 code 再序列化"""
+    result_data = json.loads(json.dumps(dict(data, code=status), ensure_ascii=False))
+    result_data.pop('code')
+    return dumps_response(result_data)
+
+
+def send(method, path, body=None, headers=None):
+    """不经套接字调用入口，返回 (状态码, 正文字节)"""
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    h = handler.__new__(handler)
+    h.path, h.command, h.request_version = path, method, 'HTTP/1.1'
+    h.requestline, h.client_address = f'{method} {path} HTTP/1.1', ('127.0.0.1', 0)
+    h.headers = dict({'Content-Length': str(len(payload)), 'Content-Type': 'application/json'}, **(headers or {}))
+    h.rfile, h.wfile = io.BytesIO(payload), io.BytesIO()
+    h._handle_request(method)
+    head, _, raw = h.wfile.getvalue().partition(b'\r\n\r\n')
+    return int(head.split(b' ', 2)[1]), raw
+
+
+class TestRouteResponses(unittest.TestCase):
+    """认证 / 同步路由响应测试"""
+
+    def assert_unchanged(self, route, method, path, body=None, headers=None):
+        status, data = route(path, method, body or {}, headers or {})
+        self.assertNotIn('code', data)
+        expected = legacy_body(status, data)
+        self.assertEqual(send(method, path, body, headers), (status, expected), path)
+        return status, json.loads(expected)
+
+    def test_validation_errors(self):
+        handle = auth_routes.handle_auth_request
+        self.assertEqual(self.assert_unchanged(handle, 'POST', '/api/auth/send-code', {})[0], 400)
+        self.assertEqual(self.assert_unchanged(handle, 'POST', '/api/auth/login', {'email': 'a@b.c'}),
+                         (400, {'success': False, 'error': '请填写邮箱和密码'}))
+        self.assertEqual(self.assert_unchanged(handle, 'GET', '/api/user/profile')[0], 401)
+        self.assertEqual(self.assert_unchanged(handle, 'GET', '/api/auth/unknown')[0], 404)
+        self.assertEqual(self.assert_unchanged(sync_routes.handle_sync_request, 'GET', '/api/sync/status')[0], 401)
+
+    def test_service_results(self):
+        """服务返回的嵌套结构、中文与多余 code 字段按原样输出"""
+        profile = {'success': True, 'user': {'email': 'a@example.com', 'nickname': '测试', 'invites': [1, 2]},
+                   'code': 999}
+        with mock.patch.object(auth_routes.AuthService, 'get_user_by_token', return_value=USER), \
+                mock.patch.object(auth_routes.AuthService, 'get_user_profile', return_value=dict(profile)):
+            status, data = self.assert_unchanged(auth_routes.handle_auth_request, 'GET', '/api/user/profile',
+                                                 headers=TOKEN)
+        self.assertEqual(status, 200)
+        self.assertEqual(data, {k: v for k, v in profile.items() if k != 'code'})
+
+        with mock.patch.object(auth_routes.AuthService, 'login', return_value={'success': False, 'error': '密码错误'}):
+            status, _ = self.assert_unchanged(auth_routes.handle_auth_request, 'POST', '/api/auth/login',
+                                              {'email': 'a@b.c', 'password': 'x'})
+        self.assertEqual(status, 401)
+
+        with mock.patch.object(sync_routes.AuthService, 'get_user_by_token', return_value=USER), \
+                mock.patch.object(sync_routes.SyncService, 'get_sync_status',
+                                  return_value={'success': True, 'status': {'lastSync': None, 'count': 3}}):
+            status, data = self.assert_unchanged(sync_routes.handle_sync_request, 'GET', '/api/sync/status',
+                                                 headers=TOKEN)
+        self.assertEqual((status, data['status']['count']), (200, 3))
+
+    def test_internal_error(self):
+        with mock.patch.object(sync_routes, '_handle_request', side_effect=RuntimeError('boom')):
+            self.assertEqual(sync_routes.handle_sync_request('/api/sync/status', 'GET', {}, {}),
+                             (500, {'success': False, 'error': 'Internal error'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+路由表单元测试
+
+验证内容：
+1. 路由表解析结果与原 startswith / endswith 判断链一致
+2. 前缀后的路径余部
+3. 预加载导入全部路由目标
+"""
+
+import os
+import sys
+import unittest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.index import PREFIX_ROUTES, SUFFIX_ROUTES, preload_routes, resolve_route
+
+
+def legacy_route(path):
+    """原判断链：返回命中的路由名（前缀或后缀），均不命中返回 None"""
+    if path == "/" or path == "/api":
+        return "root"
+    if path.startswith("/api/auth") or path.startswith("/api/invite") or path.startswith("/api/user"):
+        return "auth"
+    if path.startswith("/api/sync"):
+        return "sync"
+    if path.startswith("/api/almanac/"):
+        return "almanac"
+    for suffix in ("/date-picker/recommend", "/lifemap/trends", "/fortune", "/fortune-year",
+                   "/fortune-month", "/fortune-shichen", "/yijing-divination", "/hepan", "/ai-chat"):
+        if path.endswith(suffix):
+            return suffix
+    return None
+
+
+def route_name(route):
+    if route is None:
+        return None
+    if route.kind == "root":
+        return "root"
+    for prefix, name in (("/api/auth", "auth"), ("/api/sync", "sync"), ("/api/almanac", "almanac")):
+        if route is PREFIX_ROUTES[prefix]:
+            return name
+    return next(suffix for suffix, candidate in SUFFIX_ROUTES.items() if candidate is route)
+
+
+class TestRouting(unittest.TestCase):
+    """路由表测试"""
+
+    PATHS = [
+        "/", "/api", "/api/", "/api/auth/login", "/api/auth/reset-password", "/api/invite/info",
+        "/api/user/profile", "/api/user/delete", "/api/sync/upload", "/api/sync/status",
+        "/api/almanac/2026-03-05", "/api/date-picker/recommend", "/api/lifemap/trends",
+        "/api/fortune", "/fortune", "/api/v2/fortune", "/api/fortune-year", "/api/fortune-month",
+        "/api/fortune-shichen", "/api/yijing-divination", "/api/hepan", "/api/ai-chat",
+        "/api/sync/fortune", "/api/unknown", "/api/fortunes", "/api/recommend", "/favicon.ico",
+    ]
+
+    def test_matches_legacy_chain(self):
+        for path in self.PATHS:
+            self.assertEqual(route_name(resolve_route(path)[0]), legacy_route(path), path)
+
+    def test_remainder(self):
+        self.assertEqual(resolve_route("/api/almanac/2026-03-05")[1], "2026-03-05")
+        self.assertEqual(resolve_route("/api/auth/login")[1], "login")
+        self.assertEqual(resolve_route("/api/fortune")[1], "")
+
+    def test_preload(self):
+        """预加载后所有路由目标已导入"""
+        preload_routes()
+        for route in list(PREFIX_ROUTES.values()) + list(SUFFIX_ROUTES.values()):
+            self.assertIsNotNone(route._target, route.module)
+            self.assertIn(route.module, sys.modules)
+            self.assertTrue(callable(route.target()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+批量区间评分单元测试
+
+验证内容：
+1. 六维分数批量计算与 calculate_dimensions_v5 的分数一致
+2. FortunePipeline.score_range 与逐日 handle_fortune_request 的总分、六维、流年流月流日一致
+3. 择日推荐基于批量评分，不再逐日进入日运接口
+4. FortunePipeline.score_years 与逐年 handle_fortune_year_request 一致，人生大图景最长 100 年，标注不在大运内的年份
+5. 月运六维矩阵与逐日日运接口的六维分数一致
+"""
+
+import datetime
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.core.calendar_table import JIA_ZI
+from api.core.fortune_engine import (
+    DIMENSION_KEYS, _calculate_shensha, calculate_dimension_scores_v5_batch, calculate_dimensions_v5
+)
+from api.core.lunar import calculate_bazi, calculate_dayun
+from api.services.fortune_pipeline import FortunePipeline
+from api.services.fortune_service import FortuneService
+from api.services.date_picker_service import DatePickerService
+from api.services.lifemap_service import LifeMapService, MAX_YEARS
+
+BIRTH = {'birthDate': '1990-05-15', 'birthTime': '10:30', 'longitude': 116.4, 'gender': 'female'}
+
+
+class TestScoreRange(unittest.TestCase):
+    """批量区间评分测试"""
+
+    def test_dimension_batch_matches_scalar(self):
+        """六十甲子流日 × 多个总分下，批量六维分数与 calculate_dimensions_v5 一致"""
+        for birth in (datetime.datetime(1990, 5, 15, 10, 30), datetime.datetime(1975, 1, 3, 23, 40)):
+            bazi = calculate_bazi(birth)
+            day_indices = [i for i in range(60) for _ in range(4)]
+            overall = [(20, 55, 88, 100)[k % 4] for k in range(len(day_indices))]
+            columns = calculate_dimension_scores_v5_batch(bazi, day_indices, overall)
+            self.assertEqual(tuple(columns), DIMENSION_KEYS)
+            for k, day_idx in enumerate(day_indices):
+                liu_ri = {'gan': JIA_ZI[day_idx][0], 'zhi': JIA_ZI[day_idx][1]}
+                expected = calculate_dimensions_v5(bazi, liu_ri, overall[k], {}, {},
+                                                   _calculate_shensha(bazi, liu_ri))
+                for key in DIMENSION_KEYS:
+                    self.assertEqual(columns[key][k], expected[key]['score'])
+
+    def test_dimension_batch_length_mismatch(self):
+        bazi = calculate_bazi(datetime.datetime(1990, 5, 15, 10, 30))
+        with self.assertRaises(ValueError):
+            calculate_dimension_scores_v5_batch(bazi, [1, 2], [50])
+
+    def test_score_range_matches_daily_handler(self):
+        """跨年区间（大运、流年切换）逐日与日运接口一致"""
+        for extra in ({}, {'customYongShen': ['火', '土']}):
+            data = dict(BIRTH, **extra)
+            dates = [datetime.date(2026, 12, 1) + datetime.timedelta(days=i) for i in range(45)]
+            results = FortunePipeline.from_request(data).score_range(dates)
+            self.assertEqual([r['date'] for r in results], dates)
+            for day in results:
+                with redirect_stdout(io.StringIO()):
+                    daily = FortuneService.handle_fortune_request(
+                        dict(data, date=day['date'].strftime('%Y-%m-%d')))['data']['fortune']
+                self.assertEqual(day['totalScore'], daily['totalScore'])
+                self.assertEqual(day['dimensions'], {k: v['score'] for k, v in daily['dimensions'].items()})
+                self.assertEqual(day['liuNian'], daily['liuNian']['gan_zhi'])
+                self.assertEqual(day['liuYue'], daily['liuYue']['gan_zhi'])
+                self.assertEqual(day['liuRi'], daily['liuRi']['gan_zhi'])
+
+    def test_date_picker_uses_bulk_scoring(self):
+        """择日推荐一次批量评分，不调用日运接口"""
+        with mock.patch.object(FortuneService, 'handle_fortune_request') as daily, \
+                mock.patch.object(FortunePipeline, 'score_range', autospec=True,
+                                  side_effect=FortunePipeline.score_range) as bulk:
+            result = DatePickerService.handle_recommend_request(
+                dict(BIRTH, startDate='2026-03-01', rangeDays=60))
+        self.assertEqual(result['code'], 200)
+        self.assertEqual(result['data']['scannedDays'], 60)
+        daily.assert_not_called()
+        self.assertEqual(bulk.call_count, 1)
+
+    def test_month_dimension_matrix(self):
+        """月运 includeDimensions：6 × 当月天数矩阵，与逐日日运六维一致；默认不返回"""
+        plain = FortuneService.handle_fortune_month_request(dict(BIRTH, year=2028, month=2))['data']
+        self.assertNotIn('dimensionMatrix', plain)
+        data = FortuneService.handle_fortune_month_request(
+            dict(BIRTH, year=2028, month=2, includeDimensions=True))['data']
+        matrix = data['dimensionMatrix']
+        self.assertEqual(matrix['keys'], list(DIMENSION_KEYS))
+        self.assertEqual([len(row) for row in matrix['scores']], [29] * 6)
+        self.assertEqual(data['dailyScores'], plain['dailyScores'])
+        for col, day in enumerate(data['dailyScores']):
+            with redirect_stdout(io.StringIO()):
+                daily = FortuneService.handle_fortune_request(dict(BIRTH, date=day['date']))['data']['fortune']
+            self.assertEqual(day['score'], daily['totalScore'])
+            for row, key in enumerate(DIMENSION_KEYS):
+                self.assertEqual(matrix['scores'][row][col], daily['dimensions'][key]['score'])
+
+
+class TestScoreYears(unittest.TestCase):
+    """批量年运评分测试"""
+
+    def test_score_years_matches_year_handler(self):
+        """百年跨度（多步大运、起运前年份）逐年与年运接口一致"""
+        for extra in ({}, {'customYongShen': ['水']}, {'gender': 'male'}):
+            data = dict(BIRTH, **extra)
+            years = list(range(1985, 1985 + MAX_YEARS))
+            results = FortunePipeline.from_request(data).score_years(years)
+            self.assertEqual([r['year'] for r in results], years)
+            for item in results:
+                yearly = FortuneService.handle_fortune_year_request(dict(data, year=item['year']))['data']
+                self.assertEqual(item['totalScore'], yearly['totalScore'])
+                self.assertEqual(item['dimensions'], {k: v['score'] for k, v in yearly['dimensions'].items()})
+                self.assertEqual(item['liuNian'], yearly['liuNian']['gan_zhi'])
+
+    def test_lifemap_batch(self):
+        """人生大图景一次批量评分，不逐年调用年运接口；years 上限 100"""
+        with mock.patch.object(FortuneService, 'handle_fortune_year_request') as yearly:
+            result = LifeMapService.handle_trends_request(dict(BIRTH, startYear=2000, years=500))
+        yearly.assert_not_called()
+        self.assertEqual(result['code'], 200)
+        self.assertEqual(result['data']['years'], MAX_YEARS)
+        self.assertEqual([p['year'] for p in result['data']['points']], list(range(2000, 2000 + MAX_YEARS)))
+
+    def test_lifemap_marks_years_without_dayun(self):
+        """超出大运时间轴的年份 daYun 为 None，其余与 calculate_dayun 一致"""
+        result = LifeMapService.handle_trends_request(dict(BIRTH, startYear=1990, years=MAX_YEARS))
+        birth_dt = datetime.datetime(1990, 5, 15, 10, 30)
+        for point in result['data']['points']:
+            dayun = calculate_dayun(birth_dt, point['year'], BIRTH['gender'], BIRTH['longitude'])
+            self.assertEqual(point['daYun'], dayun['gan_zhi'] if dayun else None)
+        self.assertIsNone(result['data']['points'][-1]['daYun'])
+        self.assertIsNotNone(result['data']['points'][40]['daYun'])
+
+
+if __name__ == '__main__':
+    unittest.main()
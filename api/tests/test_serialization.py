@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+响应序列化单元测试
+
+验证内容：
+1. 运势类响应只含 JSON 原生类型，一次编码与原 clean_for_json + json.dumps 结果一致
+   （标准库路径逐字节相同，orjson 路径解析后相同）
+2. datetime 与登记类型按 JSON_ENCODERS 编码，未登记类型报错
+"""
+
+import datetime
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.services.fortune_service import FortuneService
+from api.services.hepan_service import HepanService
+from api.utils import json_utils
+from api.utils.json_utils import clean_for_json, dumps_response, register_json_encoder
+
+BODY = {'birthDate': '1990-05-15', 'birthTime': '08:30', 'date': '2026-03-05'}
+
+
+def legacy_bytes(data):
+    return json.dumps(clean_for_json(data), ensure_ascii=False).encode('utf-8')
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+
+class TestSerialization(unittest.TestCase):
+    """响应序列化测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.payloads = [
+            FortuneService.handle_fortune_request(dict(BODY)),
+            FortuneService.handle_fortune_month_request(dict(BODY, year=2026, month=3, includeDimensions=True)),
+            FortuneService.handle_fortune_year_request(dict(BODY, year=2026)),
+            HepanService.handle_hepan_request({'personA': {'birthDate': '1990-05-15'},
+                                               'personB': {'birthDate': '1992-08-01', 'birthTime': '23:30'}}),
+        ]
+        for payload in cls.payloads:
+            assert payload['code'] == 200, payload
+
+    def test_stdlib_matches_legacy(self):
+        with mock.patch.object(json_utils, 'USE_ORJSON', False):
+            for payload in self.payloads:
+                self.assertEqual(dumps_response(payload), legacy_bytes(payload))
+
+    @unittest.skipIf(json_utils.orjson is None, 'orjson 未安装')
+    def test_orjson_matches_legacy(self):
+        with mock.patch.object(json_utils, 'USE_ORJSON', True):
+            for payload in self.payloads:
+                self.assertEqual(json.loads(dumps_response(payload)), json.loads(legacy_bytes(payload)))
+
+    def test_encoders(self):
+        stamp = datetime.datetime(2026, 3, 5, 12, 30)
+        data = {'at': stamp, 'day': stamp.date(), 'time': stamp.time(), 'n': [1, 2.5, None]}
+        expected = {'at': '2026-03-05T12:30:00', 'day': '2026-03-05', 'time': '12:30:00', 'n': [1, 2.5, None]}
+        for use_orjson in (False, True) if json_utils.orjson else (False,):
+            with mock.patch.object(json_utils, 'USE_ORJSON', use_orjson), \
+                    mock.patch.dict(json_utils.JSON_ENCODERS):
+                self.assertEqual(json.loads(dumps_response(data)), expected)
+                with self.assertRaises(TypeError):
+                    dumps_response({'p': Point(1, 2)})
+                register_json_encoder(Point, lambda p: [p.x, p.y])
+                self.assertEqual(json.loads(dumps_response({'p': Point(1, 2)})), {'p': [1, 2]})
+        self.assertNotIn(Point, json_utils.JSON_ENCODERS)
+
+
+if __name__ == '__main__':
+    unittest.main()
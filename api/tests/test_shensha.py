@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+神煞查表单元测试
+
+验证内容：
+1. 位掩码表与按配置逐条判定的结果一致（全部命盘组合 × 六十甲子）
+2. 月令神煞（天德、月德）与三合神煞（桃花、驿马等）能够触发
+3. 维度加成按配置键 dimension_boost 汇总
+"""
+
+import itertools
+import os
+import sys
+import unittest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.core.constants import TIAN_GAN, DI_ZHI, SHEN_SHA_COMPLETE
+from api.core.calendar_table import JIA_ZI
+from api.core.fortune_engine import _calculate_shensha
+
+MONTH_KEYS = ['正月', '二月', '三月', '四月', '五月', '六月',
+              '七月', '八月', '九月', '十月', '十一月', '十二月']
+
+
+def reference_shensha(bazi, liu_ri):
+    """按配置逐条判定（参照实现），返回触发的神煞名列表"""
+    names = []
+    for name, config in SHEN_SHA_COMPLETE.items():
+        method = config['calc_method']
+        table = config['table']
+        if method == 'stem_based':
+            hit = liu_ri['zhi'] in table.get(bazi['day_gan'], [])
+        elif method == 'month_based':
+            month_key = MONTH_KEYS[(DI_ZHI.index(bazi['month_zhi']) - 2) % 12]
+            hit = table[month_key] in (liu_ri['gan'], liu_ri['zhi'])
+        else:
+            hit = any(
+                zhi in group and table[group] == liu_ri['zhi']
+                for zhi in (bazi['year_zhi'], bazi['day_zhi'])
+                for group in table
+            )
+        if hit:
+            names.append(name)
+    return names
+
+
+def make_bazi(day_gan, month_zhi, year_zhi, day_zhi):
+    return {'day_gan': day_gan, 'month_zhi': month_zhi, 'year_zhi': year_zhi, 'day_zhi': day_zhi}
+
+
+class TestShenSha(unittest.TestCase):
+    """神煞测试"""
+
+    def test_matches_reference(self):
+        """日干 × 月支 × 年支 × 流日 全部组合（日支轮换取值）与参照实现一致"""
+        for (g, day_gan), month_zhi, (y, year_zhi) in itertools.product(
+                enumerate(TIAN_GAN), DI_ZHI, enumerate(DI_ZHI)):
+            day_zhi = DI_ZHI[(g + 2 * y + 4) % 12]  # 日柱干支阴阳一致，与年支错开
+            bazi = make_bazi(day_gan, month_zhi, year_zhi, day_zhi)
+            for gz in JIA_ZI:
+                liu_ri = {'gan': gz[0], 'zhi': gz[1]}
+                result = _calculate_shensha(bazi, liu_ri)
+                expected = reference_shensha(bazi, liu_ri)
+                self.assertEqual([d['name'] for d in result['details']], expected)
+                total = sum(SHEN_SHA_COMPLETE[n]['score'] for n in expected)
+                self.assertEqual(result['total_score'], max(-20, min(20, total)))
+
+    def test_month_based(self):
+        """寅月（正月）命盘遇丁日见天德、遇丙日见月德"""
+        bazi = make_bazi('甲', '寅', '子', '子')
+        self.assertIn('tiande', [d['name'] for d in _calculate_shensha(bazi, {'gan': '丁', 'zhi': '卯'})['details']])
+        self.assertIn('yuede', [d['name'] for d in _calculate_shensha(bazi, {'gan': '丙', 'zhi': '寅'})['details']])
+        # 卯月（二月）天德在申支
+        bazi = make_bazi('甲', '卯', '子', '子')
+        self.assertIn('tiande', [d['name'] for d in _calculate_shensha(bazi, {'gan': '壬', 'zhi': '申'})['details']])
+
+    def test_branch_based_and_boosts(self):
+        """申子辰见酉为桃花、见寅为驿马，维度加成生效"""
+        bazi = make_bazi('甲', '午', '子', '午')
+        taohua = _calculate_shensha(bazi, {'gan': '丁', 'zhi': '酉'})
+        self.assertIn('taohua', [d['name'] for d in taohua['details']])
+        self.assertEqual(taohua['dimension_boosts'].get('romance'), 10)
+        yima = _calculate_shensha(bazi, {'gan': '甲', 'zhi': '寅'})
+        self.assertIn('yima', [d['name'] for d in yima['details']])
+        self.assertEqual(yima['dimension_boosts'].get('travel'), 15)
+
+    def test_result_is_independent_copy(self):
+        """返回的明细可安全修改，不影响后续调用"""
+        bazi = make_bazi('甲', '寅', '子', '子')
+        first = _calculate_shensha(bazi, {'gan': '丁', 'zhi': '丑'})
+        first['details'].clear()
+        first['dimension_boosts']['x'] = 1
+        second = _calculate_shensha(bazi, {'gan': '丁', 'zhi': '丑'})
+        self.assertTrue(second['details'])
+        self.assertNotIn('x', second['dimension_boosts'])
+
+
+if __name__ == '__main__':
+    unittest.main()
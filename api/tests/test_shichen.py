@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+时辰运势单元测试
+
+验证内容：
+1. 十二时辰时柱与排盘时柱一致（日上起时法）
+2. 时柱权重为 0 时各时辰分数等于当日总分（日级分量与日运相同）
+3. 日级分量只算一次，各时辰只查表
+4. 接口参数校验
+"""
+
+import datetime
+import os
+import sys
+import unittest
+from unittest import mock
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.core import fortune_engine
+from api.core.lunar import calculate_bazi
+from api.services import fortune_pipeline
+from api.services.fortune_pipeline import FortunePipeline
+from api.services.fortune_service import FortuneService
+
+BIRTH = {'birthDate': '1990-05-15', 'birthTime': '10:30', 'longitude': 116.4, 'gender': 'female'}
+
+
+class TestShichen(unittest.TestCase):
+    """时辰评分测试"""
+
+    def test_hour_pillars_match_bazi(self):
+        """各时辰时柱与该时刻排盘的时柱相同"""
+        for day in (datetime.date(2026, 3, 5), datetime.date(2027, 11, 20)):
+            shichen = FortunePipeline.from_request(BIRTH).score_shichen(day)
+            self.assertEqual([s['zhi'] for s in shichen], list('子丑寅卯辰巳午未申酉戌亥'))
+            for item, (_, hour, _) in zip(shichen, fortune_engine.SHICHEN):
+                bazi = calculate_bazi(datetime.datetime(day.year, day.month, day.day, hour, 30), 120.0)
+                self.assertEqual(item['ganZhi'], bazi['time_gan'] + bazi['time_zhi'])
+
+    def test_zero_weight_equals_day_score(self):
+        """时柱权重为 0 时，各时辰分数等于批量日运总分（跨大运、跨年）"""
+        pipeline = FortunePipeline.from_request(dict(BIRTH, customYongShen=['金']))
+        dates = [datetime.date(2026, 12, 25) + datetime.timedelta(days=i * 3) for i in range(12)]
+        with mock.patch.object(fortune_engine, 'SHICHEN_WEIGHT', 0):
+            for day in pipeline.score_range(dates):
+                scores = {s['score'] for s in pipeline.score_shichen(day['date'])}
+                self.assertEqual(scores, {day['totalScore']})
+
+    def test_date_level_computed_once(self):
+        """一次请求中流年流月流日只求一次，十二个时辰共用"""
+        pipeline = FortunePipeline.from_request(BIRTH)
+        pipeline.analysis
+        with mock.patch.object(fortune_pipeline, 'date_pillar_indices',
+                               wraps=fortune_pipeline.date_pillar_indices) as indices:
+            shichen = pipeline.score_shichen(datetime.date(2026, 6, 1))
+        self.assertEqual(len(shichen), 12)
+        self.assertEqual(indices.call_count, 1)
+        self.assertIn('score_shichen', pipeline.timings)
+
+    def test_handler(self):
+        """接口返回十二时辰与最佳、最差时辰；缺出生日期返回 400"""
+        result = FortuneService.handle_fortune_shichen_request(dict(BIRTH, date='2026-03-05'))
+        self.assertEqual(result['code'], 200)
+        data = result['data']
+        self.assertEqual(data['date'], '2026-03-05')
+        self.assertEqual(len(data['shichen']), 12)
+        scores = {s['zhi']: s['score'] for s in data['shichen']}
+        self.assertEqual(scores[data['bestShichen']], max(scores.values()))
+        self.assertEqual(scores[data['worstShichen']], min(scores.values()))
+        self.assertEqual(FortuneService.handle_fortune_shichen_request({})['code'], 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+节气计算单元测试
+
+验证内容：
+1. 交节时刻与寿星历法参考值的偏差
+2. 节气日期在 1900-2100 年内单调递增
+3. 按日期 / 按时刻查找所处节气
+4. 交节时刻前后出生的年柱、月柱切换
+"""
+
+import os
+import sys
+import unittest
+from datetime import date, datetime
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.core.solar_terms import find_term_index, get_term_datetime, get_term_ordinals
+from api.core.lunar import calculate_bazi, get_current_solar_term, get_solar_term_for_year
+
+# 最大允许偏差（分钟）
+MAX_DEVIATION_MINUTES = 10
+
+
+class TestSolarTerms(unittest.TestCase):
+    """节气计算测试"""
+
+    def test_reference_instants(self):
+        """交节时刻（北京时间）与参考值一致"""
+        cases = [
+            (1901, 2, datetime(1901, 2, 4, 19, 40)),    # 立春
+            (1949, 14, datetime(1949, 8, 8, 5, 15)),    # 立秋
+            (1984, 2, datetime(1984, 2, 4, 23, 19)),    # 立春
+            (2000, 5, datetime(2000, 3, 20, 15, 35)),   # 春分
+            (2025, 2, datetime(2025, 2, 3, 22, 10)),    # 立春
+            (2099, 23, datetime(2099, 12, 21, 22, 4)),  # 冬至
+        ]
+        for year, term_index, expected in cases:
+            actual = get_term_datetime(year, term_index)
+            deviation = abs((actual - expected).total_seconds()) / 60
+            self.assertLessEqual(deviation, MAX_DEVIATION_MINUTES, f"{year} #{term_index}: {actual}")
+
+    def test_terms_monotonic(self):
+        """每年 24 节气依次递增，且跨年衔接"""
+        prev_last = None
+        for year in range(1900, 2101):
+            ordinals = get_term_ordinals(year)
+            self.assertEqual(len(ordinals), 24)
+            for a, b in zip(ordinals, ordinals[1:]):
+                self.assertTrue(13 <= b - a <= 17, f"{year}: {a} -> {b}")
+            if prev_last is not None:
+                self.assertTrue(13 <= ordinals[0] - prev_last <= 17)
+            prev_last = ordinals[-1]
+
+    def test_solar_term_for_year(self):
+        """节气日期接口保持 (月, 日) 格式"""
+        self.assertEqual(get_solar_term_for_year(2025, 2), (2, 3))
+        self.assertEqual(get_solar_term_for_year(1984, 2), (2, 4))
+
+    def test_find_term_index(self):
+        """按日期 / 时刻查找节气"""
+        self.assertEqual(find_term_index(date(2025, 1, 1)), 23)
+        self.assertEqual(find_term_index(date(2025, 2, 3)), 2)
+        self.assertEqual(find_term_index(datetime(2025, 2, 3, 21, 0)), 1)
+        self.assertEqual(find_term_index(datetime(2025, 2, 3, 23, 0)), 2)
+        self.assertEqual(get_current_solar_term(date(2025, 12, 31)), ('冬至', 23))
+
+    def test_bazi_switches_at_term_instant(self):
+        """立春交节时刻前后出生，年柱与月柱切换"""
+        before = calculate_bazi(datetime(2025, 2, 3, 21, 0))
+        after = calculate_bazi(datetime(2025, 2, 3, 23, 0))
+        self.assertEqual((before['year'], before['month']), ('甲辰', '丁丑'))
+        self.assertEqual((after['year'], after['month']), ('乙巳', '戊寅'))
+        self.assertEqual(before['day'], after['day'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@
 API 工具模块
 """
 
-from .json_utils import safe_json_dumps, clean_for_json
+from .json_utils import safe_json_dumps, clean_for_json, dumps_response, register_json_encoder
 from .email_sender import (
     send_verification_email,
 )
@@ -12,6 +12,8 @@ from .kv_client import VercelKV, kv
 __all__ = [
     'safe_json_dumps',
     'clean_for_json',
+    'dumps_response',
+    'register_json_encoder',
     'send_verification_email',
     'VercelKV',
     'kv',
@@ -2,10 +2,58 @@
 """
 JSON 工具函数
 处理 JSON 序列化，特别是 datetime 对象的处理
+
+响应统一由 dumps_response 一次编码：引擎输出只含 JSON 原生类型（dict / list / str / 数值 / None），
+少数例外类型在 JSON_ENCODERS 登记编码函数；装有 orjson 时走 orjson（API_ORJSON=0 可关闭）。
 """
 
 import json
 import datetime
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 为 True 时 dumps_response 使用 orjson（输出无多余空格，字段与值与标准库相同）
+USE_ORJSON = orjson is not None and os.environ.get('API_ORJSON', '1').lower() not in ('0', 'false', 'no')
+
+# 非 JSON 原生类型的编码函数：类型 -> 返回 JSON 原生值的函数
+JSON_ENCODERS = {
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+    datetime.time: datetime.time.isoformat,
+}
+
+
+def register_json_encoder(cls, encoder):
+    """登记类型的编码函数（encoder(obj) 返回 JSON 原生值），子类按 MRO 匹配"""
+    JSON_ENCODERS[cls] = encoder
+
+
+def _encode_default(obj):
+    """JSON_ENCODERS 中查找编码函数；未登记的类型直接报错，不做递归清理"""
+    for cls in type(obj).__mro__:
+        encoder = JSON_ENCODERS.get(cls)
+        if encoder is not None:
+            return encoder(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_response(data) -> bytes:
+    """
+    响应体一次编码为 UTF-8 字节
+
+    参数:
+        data: 只含 JSON 原生类型与 JSON_ENCODERS 登记类型的对象（不会被修改或复制）
+
+    返回:
+        UTF-8 编码的 JSON 字节
+    """
+    if USE_ORJSON:
+        return orjson.dumps(data, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, default=_encode_default).encode('utf-8')
 
 
 class DateTimeJSONEncoder(json.JSONEncoder):
@@ -25,7 +73,7 @@ class DateTimeJSONEncoder(json.JSONEncoder):
 
 def clean_for_json(obj):
     """
-    递归清理数据，确保所有对象都可以被 JSON 序列化
+    递归清理数据，确保所有对象都可以被 JSON 序列化（逐层复制；响应编码请用 dumps_response）
     
     参数:
         obj: 要清理的对象（可以是 dict, list, 或其他类型）
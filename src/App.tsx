@@ -8,6 +8,7 @@ import { shouldShowEntryBridge } from './utils/appEntry';
 import { useHaptics } from './utils/haptics';
 import { useSwipeGesture } from './hooks/useSwipeGesture';
 import { fetchWithRetryAndCache } from './utils/apiRetry';
+import { toFortuneQuery } from './services/api';
 import Header from './components/Header';
 import DateSelector from './components/DateSelector';
 import FortuneCard from './components/FortuneCard';
@@ -414,13 +415,10 @@ const mainCategory = getMainCategory(pathname);
       customYongShen: yongShen
     };
 
+    // GET 请求：响应带 ETag，浏览器缓存到期后以 If-None-Match 回源，未变化时只收 304
     const response = await fetchWithRetryAndCache<any>(
-      '/api/fortune',
-      {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(requestBody),
-      },
+      `/api/fortune?${toFortuneQuery(requestBody)}`,
+      undefined,
       {
         maxRetries: 3,
         delay: 1000,
@@ -387,6 +387,11 @@ export default function LifeMapContent({
                   <div className="text-sm text-slate-500">
                     {isEnglish ? 'Overall' : '综合'} {selectedPoint.overall} · {isEnglish ? 'Confidence' : '可信度'} {selectedPoint.confidence}
                   </div>
+                  <div className="text-xs text-slate-400">
+                    {selectedPoint.daYun
+                      ? `${isEnglish ? 'Decade luck' : '大运'} ${selectedPoint.daYun}`
+                      : isEnglish ? 'Outside decade luck (not included in score)' : '不在大运内（评分未计大运）'}
+                  </div>
                 </div>
                 <button onClick={() => setSelectedPoint(null)} className="p-2 rounded-lg hover:bg-slate-100">
                   <X size={18} />
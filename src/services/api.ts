@@ -21,6 +21,21 @@ const RETRY_CONFIG = {
   backoff: 1.5,
 };
 
+/**
+ * 运势类接口的 GET 查询串：数组按重复参数、null / undefined 省略
+ * （/fortune、/fortune-year、/fortune-month 以 GET 请求时带 ETag，浏览器与 CDN 可按 URL 复用结果）
+ */
+export function toFortuneQuery(params: Record<string, unknown>): string {
+  const search = new URLSearchParams();
+  for (const [key, value] of Object.entries(params)) {
+    if (value == null) continue;
+    for (const item of Array.isArray(value) ? value : [value]) {
+      search.append(key, String(item));
+    }
+  }
+  return search.toString();
+}
+
 /** 判断是否为限流/429 类错误 */
 function isRateLimitError(error: unknown): boolean {
   const msg = error instanceof Error ? error.message : String(error);
@@ -143,6 +158,11 @@ export interface FortuneMonthData {
     todoList: Array<{ type: string; content: string }>;
   };
   dailyScores: Array<{ date: string; score: number }>;
+  /** includeDimensions 时返回：scores[i][j] 为 keys[i] 维度在 dailyScores[j] 当天的分数 */
+  dimensionMatrix?: {
+    keys: string[];
+    scores: number[][];
+  };
 }
 
 export interface FortuneMonthApiResult {
@@ -162,6 +182,7 @@ export async function fetchFortuneMonth(params: {
   longitude: string;
   gender: string;
   customYongShen?: string | string[] | null;
+  includeDimensions?: boolean;
 }): Promise<FortuneMonthApiResult> {
   const body: Record<string, unknown> = {
     year: params.year,
@@ -174,12 +195,11 @@ export async function fetchFortuneMonth(params: {
   if (params.customYongShen != null) {
     body.customYongShen = params.customYongShen;
   }
+  if (params.includeDimensions) {
+    body.includeDimensions = true;
+  }
   try {
-    const res = await fetch(`${API_BASE_URL}/fortune-month`, {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify(body),
-    });
+    const res = await fetch(`${API_BASE_URL}/fortune-month?${toFortuneQuery(body)}`);
     const json = (await res.json()) as FortuneMonthApiResult;
     return json;
   } catch (e) {
@@ -188,6 +208,59 @@ export async function fetchFortuneMonth(params: {
   }
 }
 
+export interface FortuneShichenData {
+  date: string;
+  dayScore: number;
+  liuRi: string;
+  /** 子时起十二时辰 */
+  shichen: Array<{
+    zhi: string;
+    ganZhi: string;
+    timeRange: string;
+    score: number;
+    level: string;
+  }>;
+  bestShichen: string;
+  worstShichen: string;
+}
+
+export interface FortuneShichenApiResult {
+  success: boolean;
+  data?: FortuneShichenData;
+  error?: string;
+}
+
+/**
+ * 获取指定日期十二时辰的运势评分
+ */
+export async function fetchFortuneShichen(params: {
+  date: string;
+  birthDate: string;
+  birthTime: string;
+  longitude: string;
+  gender: string;
+  customYongShen?: string | string[] | null;
+}): Promise<FortuneShichenApiResult> {
+  const body: Record<string, unknown> = {
+    date: params.date,
+    birthDate: params.birthDate,
+    birthTime: params.birthTime,
+    longitude: params.longitude,
+    gender: params.gender,
+  };
+  if (params.customYongShen != null) {
+    body.customYongShen = params.customYongShen;
+  }
+  try {
+    const res = await fetch(`${API_BASE_URL}/fortune-shichen?${toFortuneQuery(body)}`);
+    const json = (await res.json()) as FortuneShichenApiResult;
+    return json;
+  } catch (e) {
+    console.error('fetchFortuneShichen failed:', e);
+    return { success: false, error: '网络错误' };
+  }
+}
+
 export interface YijingDivinationData {
   question: string;
   category: string;
@@ -220,11 +293,7 @@ export async function fetchFortuneYear(params: {
   };
   if (params.customYongShen != null) body.customYongShen = params.customYongShen;
   try {
-    const res = await fetch(`${API_BASE_URL}/fortune-year`, {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify(body),
-    });
+    const res = await fetch(`${API_BASE_URL}/fortune-year?${toFortuneQuery(body)}`);
     return await res.json();
   } catch (e) {
     console.error('fetchFortuneYear failed:', e);
@@ -11,6 +11,21 @@ export type DatePickerPurpose =
 
 export type WeekendPolicy = 'all' | 'weekend_only' | 'workday_only';
 
+/** full: 完整候选；compact: 仅日期与分数（rangeDays > 60 时默认）；none: 不返回时间线 */
+export type TimelineMode = 'full' | 'compact' | 'none';
+
+/** 多人合择的聚合方式：min 取最低、mean 平均、weighted 按 weight 加权平均 */
+export type JointAggregate = 'min' | 'mean' | 'weighted';
+
+export interface DatePickerProfile {
+  birthDate: string;
+  birthTime?: string;
+  longitude?: string | number;
+  gender?: string;
+  customYongShen?: string | string[] | null;
+  weight?: number;
+}
+
 export interface DatePickerRequest {
   birthDate: string;
   birthTime: string;
@@ -23,6 +38,10 @@ export interface DatePickerRequest {
   startDate?: string;
   weekendPolicy?: WeekendPolicy;
   excludedDates?: string[];
+  timelineMode?: TimelineMode;
+  /** 两人及以上时为合择，忽略顶层出生信息 */
+  profiles?: DatePickerProfile[];
+  aggregate?: JointAggregate;
 }
 
 export interface DatePickerRecommendation {
@@ -50,6 +69,20 @@ export interface DatePickerRecommendation {
     yue?: string;
     ri?: string;
   };
+  /** 合择时各人分数（合择不返回 mainTheme） */
+  members?: Array<{
+    index: number;
+    totalScore: number;
+    purposeScore: number;
+    riskLevel: 'low' | 'medium' | 'high';
+  }>;
+}
+
+export interface DatePickerTimelineEntry {
+  date: string;
+  totalScore: number;
+  purposeScore: number;
+  riskLevel: 'low' | 'medium' | 'high';
 }
 
 export interface DatePickerResponseData {
@@ -61,7 +94,11 @@ export interface DatePickerResponseData {
   failedDays: number;
   recommendedCount: number;
   recommendations: DatePickerRecommendation[];
+  /** timelineMode 为 compact 时条目为 DatePickerTimelineEntry */
   timeline: DatePickerRecommendation[];
+  mode?: 'joint';
+  aggregate?: JointAggregate;
+  profileCount?: number;
   summary: {
     bestDate: string;
     bestScore: number;
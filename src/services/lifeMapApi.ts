@@ -3,6 +3,8 @@ import { fetchWithRetry } from '../utils/apiRetry';
 export interface LifeMapTrendPoint {
   year: number;
   ganZhi: string;
+  /** 所在大运干支；起运前或超出大运时间轴的年份为 null（评分不含大运） */
+  daYun: string | null;
   overall: number;
   career: number;
   wealth: number;
@@ -40,7 +42,6 @@ export interface LifeMapSummary {
   confidence: number;
   peakYear: number;
   troughYear: number;
-  failedYears: number[];
   milestoneCount: number;
 }
 
@@ -51,7 +52,6 @@ export interface LifeMapData {
   milestones: LifeMapMilestone[];
   summary: LifeMapSummary;
   strategy: LifeMapStrategyItem[];
-  failedYears: number[];
 }
 
 export interface LifeMapRequest {
@@ -61,6 +61,7 @@ export interface LifeMapRequest {
   gender?: string;
   customYongShen?: string | string[] | null;
   startYear?: number;
+  /** 5–100 年，默认 10 */
   years?: number;
 }
 